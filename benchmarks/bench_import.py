@@ -0,0 +1,110 @@
+"""Startup benchmark for RealtorAgentToolSpec: import time, resident memory and first-call latency.
+
+Every run starts a fresh interpreter that imports src.base, builds a spec against the local fake
+Realtor API and answers one listing search and one detail lookup, so nothing is warm from an
+earlier run. Reports the median over the runs, and whether pandas was imported along the way:
+
+    python -m benchmarks.bench_import --runs 5 --format python
+    python -m benchmarks.bench_import --max-import-ms 3000 --max-rss-mb 250 --require-no-pandas
+
+With a budget flag the benchmark exits non-zero when the budget is exceeded, so it can guard the
+startup budget in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from typing import Any, Dict, List
+
+from benchmarks.fake_realtor import FakeRealtorProcess, property_ids_for_postal_code
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+POSTAL_CODE = "33020"
+
+# runs in the child interpreter; prints one JSON line of measurements
+PROBE = """
+import json, resource, sys, time
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+base_url, output_format, postal_code, property_id = sys.argv[1:5]
+started = time.perf_counter()
+from src.base import RealtorAgentToolSpec
+imported = time.perf_counter()
+result = {"import_ms": (imported - started) * 1000, "import_rss_mb": rss_mb(), "pandas_after_import": "pandas" in sys.modules}
+spec = RealtorAgentToolSpec("benchmark", base_url=base_url, output_format=output_format, rate_limit=1000.0)
+spec.get_listings_by_postal_code(postal_code, max_results=50)
+spec.get_listing_details_by_property_id(property_id)
+result.update(first_calls_ms=(time.perf_counter() - imported) * 1000, rss_mb=rss_mb(), pandas_after_calls="pandas" in sys.modules)
+print(json.dumps(result))
+"""
+
+
+def probe(base_url: str, output_format: str) -> Dict[str, Any]:
+    property_id = property_ids_for_postal_code(POSTAL_CODE, 1)[0]
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, base_url, output_format, POSTAL_CODE, property_id],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "runs": len(runs),
+        "import_ms": statistics.median(run["import_ms"] for run in runs),
+        "first_calls_ms": statistics.median(run["first_calls_ms"] for run in runs),
+        "import_rss_mb": max(run["import_rss_mb"] for run in runs),
+        "rss_mb": max(run["rss_mb"] for run in runs),
+        "pandas_after_import": any(run["pandas_after_import"] for run in runs),
+        "pandas_after_calls": any(run["pandas_after_calls"] for run in runs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to start")
+    parser.add_argument("--format", dest="output_format", default="python", help="output_format of the spec")
+    parser.add_argument("--max-import-ms", type=float, help="fail when the median import of src.base takes longer")
+    parser.add_argument("--max-rss-mb", type=float, help="fail when peak RSS after the first calls is higher")
+    parser.add_argument("--require-no-pandas", action="store_true", help="fail when the import or the first calls load pandas")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    server = FakeRealtorProcess()
+    try:
+        runs = [probe(server.base_url, args.output_format) for _ in range(args.runs)]
+    finally:
+        server.stop()
+    summary = summarize(runs)
+    summary["output_format"] = args.output_format
+    print(f"output_format:       {args.output_format}")
+    print(f"import src.base:     {summary['import_ms']:.0f} ms median, {summary['import_rss_mb']:.1f} MB peak RSS")
+    print(f"first two calls:     {summary['first_calls_ms']:.0f} ms median, {summary['rss_mb']:.1f} MB peak RSS")
+    print(f"pandas imported:     {summary['pandas_after_import']} after import, {summary['pandas_after_calls']} after the calls")
+
+    failures = []
+    if args.max_import_ms is not None and summary["import_ms"] > args.max_import_ms:
+        failures.append(f"import took {summary['import_ms']:.0f} ms, budget {args.max_import_ms:.0f} ms")
+    if args.max_rss_mb is not None and summary["rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {summary['rss_mb']:.1f} MB, budget {args.max_rss_mb:.1f} MB")
+    if args.require_no_pandas and summary["pandas_after_calls"]:
+        failures.append("pandas was imported")
+    summary["failures"] = failures
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    for failure in failures:
+        print(f"over budget: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
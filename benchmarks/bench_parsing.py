@@ -0,0 +1,150 @@
+"""Micro-benchmark of response parsing: stdlib json plus full json_normalize against the current path.
+
+The baseline reproduces what the tools did before field extraction: json.loads on the body, then
+pd.json_normalize over the whole subtree. The current path decodes with src.jsoncodec and runs
+the tool's own parse helper. Payloads come from fixtures recorded by benchmarks.fake_realtor, or
+from the synthetic generator when no fixture directory is given:
+
+    python -m benchmarks.bench_parsing
+    python -m benchmarks.bench_parsing --fixtures fixtures/ --repeat 7
+"""
+import argparse
+import glob
+import json
+import os
+import timeit
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from benchmarks.fake_realtor import SyntheticRealtor, property_ids_for_postal_code
+from src import autocomplete, detail, listing
+from src.jsoncodec import BACKEND, loads
+from src.projection import LISTING_FIELDS, project
+
+
+def _listing_page(body: dict) -> Any:
+    results, _ = listing._page_from_response(body)
+    return project(results, None, LISTING_FIELDS)
+
+
+def _home(body: dict) -> dict:
+    return body["data"]["home"]
+
+
+# path -> [(case, baseline parse of the decoded body, current parse of the decoded body)]
+CASES: Dict[str, List[Tuple[str, Callable[[dict], Any], Callable[[dict], Any]]]] = {
+    "/locations/v2/auto-complete": [
+        ("get_property_id", lambda body: pd.json_normalize(body["autocomplete"]), autocomplete._property_id_from_response),
+    ],
+    "/properties/v3/list": [
+        ("get_listings_by_postal_code", lambda body: pd.json_normalize(body["data"]["home_search"]["results"]), _listing_page),
+    ],
+    "/properties/v3/list-similar-homes": [
+        ("get_similar_listings_by_property_id", lambda body: pd.json_normalize(body["data"]["home"]["related_homes"]["results"]),
+         listing._similar_listings_from_response),
+    ],
+    "/properties/v3/detail": [
+        ("get_listing_details_by_property_id", lambda body: pd.json_normalize(_home(body)),
+         lambda body: detail._listing_details_from_home(detail._home_from_response(body))),
+        ("get_nearby_school_info_by_property_id", lambda body: pd.json_normalize(_home(body)["nearby_schools"]["schools"]),
+         lambda body: detail._nearby_schools_from_home(detail._home_from_response(body))),
+        ("get_home_details_by_property_id", lambda body: pd.json_normalize(_home(body)["details"]),
+         lambda body: detail._home_details_from_home(detail._home_from_response(body))),
+        ("get_property_address_by_property_id", lambda body: _home(body)["location"]["address"],
+         lambda body: detail._address_from_home(detail._home_from_response(body))),
+    ],
+    "/properties/v3/get-surroundings": [
+        ("get_listing_surroundings_detail_by_property_id",
+         lambda body: pd.json_normalize(body["data"]["home"]["local"]["noise"]["noise_categories"]), detail._surroundings_from_response),
+    ],
+    "/properties/v3/get-commute-time": [
+        ("get_drive_commute_time_from_listing", lambda body: body["data"]["home"]["commute_time"]["duration"]["text"],
+         detail._commute_time_from_response),
+    ],
+}
+
+
+def synthetic_payloads(page_size: int) -> Dict[str, bytes]:
+    synthetic = SyntheticRealtor()
+    property_id = property_ids_for_postal_code("33020", 1)[0]
+    requests = {
+        "/locations/v2/auto-complete": ({"input": "100 N 26th Ave, Hollywood, FL 33020"}, {}),
+        "/properties/v3/list": ({}, {"postal_code": "33020", "limit": page_size, "offset": 0}),
+        "/properties/v3/list-similar-homes": ({"property_id": property_id, "limit": "10"}, {}),
+        "/properties/v3/detail": ({"property_id": property_id}, {}),
+        "/properties/v3/get-surroundings": ({"property_id": property_id}, {}),
+        "/properties/v3/get-commute-time": ({"property_id": property_id, "destination_address": "1 E Broward Blvd"}, {}),
+    }
+    payloads = {}
+    for path, (params, payload) in requests.items():
+        _, body = synthetic.response(path, params, payload)
+        payloads[path] = json.dumps(body).encode("utf-8")
+    return payloads
+
+
+def recorded_payloads(fixtures_dir: str) -> Dict[str, bytes]:
+    """Largest recorded body per endpoint from a benchmarks.fake_realtor fixture directory."""
+    payloads = {}
+    for fixture_path in glob.glob(os.path.join(fixtures_dir, "*.json")):
+        with open(fixture_path) as f:
+            fixture = json.load(f)
+        body = json.dumps(fixture["body"]).encode("utf-8")
+        if fixture["status"] == 200 and len(body) > len(payloads.get(fixture["path"], b"")):
+            payloads[fixture["path"]] = body
+    return payloads
+
+
+def best_of(fn: Callable[[], Any], repeat: int, min_time: float = 0.2) -> float:
+    """Best per-call time in seconds over repeat runs of an auto-sized loop."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of responses recorded by benchmarks.fake_realtor --record-to")
+    parser.add_argument("--page-size", type=int, default=200, help="rows in the synthetic listing page")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    payloads = recorded_payloads(args.fixtures) if args.fixtures else synthetic_payloads(args.page_size)
+    print(f"JSON backend: {BACKEND}")
+    header = f"{'case':<50}{'KB':>8}{'baseline us':>13}{'current us':>12}{'speedup':>9}{'decode':>9}"
+    print(header)
+    print("-" * len(header))
+    results = []
+    for path, cases in CASES.items():
+        raw = payloads.get(path)
+        if raw is None:
+            print(f"skipping {path}: no payload")
+            continue
+        decode_baseline = best_of(lambda: json.loads(raw), args.repeat)
+        decode_current = best_of(lambda: loads(raw), args.repeat)
+        for name, baseline, current in cases:
+            baseline_seconds = best_of(lambda: baseline(json.loads(raw)), args.repeat)
+            current_seconds = best_of(lambda: current(loads(raw)), args.repeat)
+            result = {
+                "case": name,
+                "path": path,
+                "bytes": len(raw),
+                "baseline_us": baseline_seconds * 1e6,
+                "current_us": current_seconds * 1e6,
+                "speedup": baseline_seconds / current_seconds,
+                "decode_speedup": decode_baseline / decode_current,
+            }
+            results.append(result)
+            print(f"{name:<50}{len(raw) / 1024:>8.1f}{result['baseline_us']:>13.0f}{result['current_us']:>12.0f}"
+                  f"{result['speedup']:>8.1f}x{result['decode_speedup']:>8.1f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
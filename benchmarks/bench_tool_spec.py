@@ -0,0 +1,276 @@
+"""Latency and throughput benchmark for RealtorAgentToolSpec against the local fake Realtor API.
+
+Drives every spec function and a few multi-tool agent scenarios at several concurrency levels and
+reports p50/p95/p99 latency, upstream requests per tool call, bytes transferred and peak memory:
+
+    python -m benchmarks.bench_tool_spec --calls 200 --concurrency 1,8,32 --latency 0.03
+    python -m benchmarks.bench_tool_spec --async --only get_listings_by_postal_code
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fake_realtor import FakeRealtorProcess, SyntheticRealtor, property_ids_for_postal_code
+from src.base import RealtorAgentToolSpec
+
+
+POSTAL_CODES = ["33020", "33021", "33019"]
+DESTINATIONS = ["1 E Broward Blvd, Fort Lauderdale, FL 33301", "3000 NW 12th Ave, Miami, FL 33127"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class ArgumentFactory:
+    """Builds plausible arguments for a spec function from its parameter names."""
+
+    def __init__(self, synthetic: SyntheticRealtor, id_pool: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.synthetic = synthetic
+        self.property_ids = [pid for code in POSTAL_CODES for pid in property_ids_for_postal_code(code, id_pool)]
+
+    def address(self) -> str:
+        address = self.synthetic.listing(self.rng.choice(self.property_ids))["location"]["address"]
+        return f"{address['line']}, {address['city']}, {address['state_code']} {address['postal_code']}"
+
+    def value(self, name: str) -> Any:
+        if name == "property_id":
+            return self.rng.choice(self.property_ids)
+        if name == "property_ids":
+            return self.rng.sample(self.property_ids, 5)
+        if name == "postal_code":
+            return self.rng.choice(POSTAL_CODES)
+        if name == "postal_codes":
+            return list(POSTAL_CODES)
+        if name == "address":
+            return self.address()
+        if name == "address_or_property_id":
+            return self.rng.choice([self.address(), self.rng.choice(self.property_ids)])
+        if name == "destination_address":
+            return self.rng.choice(DESTINATIONS)
+        if name == "destination_addresses":
+            return list(DESTINATIONS)
+        raise KeyError(name)
+
+    def kwargs_for(self, fn: Callable) -> Optional[Callable[[], Dict[str, Any]]]:
+        """Return a factory of keyword arguments for fn, or None if a required parameter is unknown."""
+        required = [
+            p.name for p in inspect.signature(fn).parameters.values()
+            if p.default is inspect.Parameter.empty and p.kind is p.POSITIONAL_OR_KEYWORD
+        ]
+        try:
+            for name in required:
+                self.value(name)
+        except KeyError:
+            return None
+        return lambda: {name: self.value(name) for name in required}
+
+
+def scenario_addresses_and_descriptions(spec: RealtorAgentToolSpec, args: ArgumentFactory) -> int:
+    """Demo prompt: addresses and listing descriptions of 5 properties for sale in a ZIP."""
+    listings = spec.get_listings_by_postal_code(args.value("postal_code"))
+    calls = 1
+    for property_id in listings["property_id"].head(5):
+        spec.get_property_address_by_property_id(property_id)
+        spec.get_listing_description_by_property_id(property_id)
+        calls += 2
+    return calls
+
+
+def scenario_school_comparison(spec: RealtorAgentToolSpec, args: ArgumentFactory) -> int:
+    """Resolve an address, then ask about its schools, history and address."""
+    property_id = spec.get_property_id(args.address())
+    spec.get_nearby_school_info_by_property_id(property_id)
+    spec.get_property_history_by_property_id(property_id)
+    spec.get_property_address_by_property_id(property_id)
+    return 4
+
+
+def scenario_commute_ranking(spec: RealtorAgentToolSpec, args: ArgumentFactory) -> int:
+    """Rank the newest listings in a ZIP by drive time to two workplaces."""
+    listings = spec.get_listings_by_postal_code(args.value("postal_code"), max_results=20)
+    calls = 1
+    for property_id in listings["property_id"].head(5):
+        for destination in DESTINATIONS:
+            spec.get_drive_commute_time_from_listing(property_id, destination)
+            calls += 1
+    return calls
+
+
+def scenario_commute_matrix(spec: RealtorAgentToolSpec, args: ArgumentFactory) -> int:
+    """The commute ranking above, as one matrix call over the same listings and workplaces."""
+    listings = spec.get_listings_by_postal_code(args.value("postal_code"), max_results=20)
+    spec.get_commute_time_matrix(list(listings["property_id"].head(5)), DESTINATIONS)
+    return 2
+
+
+def scenario_closest_listing(spec: RealtorAgentToolSpec, args: ArgumentFactory) -> int:
+    """Demo prompt: the closest property for sale to an address, then its details."""
+    nearest = spec.get_nearest_listings(args.address(), k=1)
+    for property_id in nearest["property_id"]:
+        spec.get_listing_details_by_property_id(property_id)
+    return 1 + len(nearest)
+
+
+SCENARIOS = {
+    "scenario:addresses_and_descriptions": scenario_addresses_and_descriptions,
+    "scenario:school_comparison": scenario_school_comparison,
+    "scenario:commute_ranking": scenario_commute_ranking,
+    "scenario:commute_matrix": scenario_commute_matrix,
+    "scenario:closest_listing": scenario_closest_listing,
+}
+
+
+def _spec_function_names(use_async: bool) -> List[str]:
+    names = []
+    for entry in RealtorAgentToolSpec.spec_functions:
+        if isinstance(entry, tuple):
+            names.append(entry[1] if use_async else entry[0])
+        else:
+            names.append(entry)
+    return names
+
+
+def run_case(make_spec: Callable[[], RealtorAgentToolSpec], server: FakeRealtorProcess, work: Callable, calls: int,
+             concurrency: int, use_async: bool) -> Dict[str, Any]:
+    """Run work(spec) calls times at the given concurrency and collect latency, request and memory figures."""
+    spec = make_spec()
+    server.reset_stats()
+    latencies = []
+    tool_calls = 0
+    errors = 0
+
+    def timed(outcome_calls: Any, started: float) -> None:
+        nonlocal tool_calls
+        latencies.append(time.perf_counter() - started)
+        tool_calls += outcome_calls if isinstance(outcome_calls, int) else 1
+
+    tracemalloc.start()
+    wall_started = time.perf_counter()
+    if use_async:
+        async def drive() -> None:
+            nonlocal errors
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one() -> None:
+                nonlocal errors
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        timed(await work(spec), started)
+                    except Exception:
+                        errors += 1
+            await asyncio.gather(*(one() for _ in range(calls)))
+            await spec.aclose()
+        asyncio.run(drive())
+    else:
+        def one() -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            try:
+                timed(work(spec), started)
+            except Exception:
+                errors += 1
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(one) for _ in range(calls)]:
+                future.result()
+    wall = time.perf_counter() - wall_started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = server.snapshot()
+    upstream = sum(stats["requests"].values())
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": (statistics.fmean(latencies) * 1000) if latencies else float("nan"),
+        "throughput_per_s": len(latencies) / wall if wall else float("nan"),
+        "requests_per_tool_call": upstream / tool_calls if tool_calls else float("nan"),
+        "bytes_transferred": stats["bytes_sent"],
+        "peak_memory_mb": peak / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100, help="calls per tool and concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+    parser.add_argument("--latency", type=float, default=0.02, help="injected server latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="client-side requests per second")
+    parser.add_argument("--id-pool", type=int, default=40, help="distinct property ids per postal code")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="drive the async tool functions")
+    parser.add_argument("--only", help="comma-separated tool or scenario names to run")
+    parser.add_argument("--no-scenarios", action="store_true")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    synthetic = SyntheticRealtor()
+    server = FakeRealtorProcess(latency=args.latency, latency_jitter=args.latency_jitter,
+                                error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    base_url = server.base_url
+    levels = [int(level) for level in args.concurrency.split(",")]
+    only = set(args.only.split(",")) if args.only else None
+
+    def make_spec() -> RealtorAgentToolSpec:
+        return RealtorAgentToolSpec("benchmark", base_url=base_url, pool_size=max(levels), max_retries=5,
+                                    rate_limit=args.rate_limit, rate_burst=max(1, int(args.rate_limit)))
+
+    cases = []
+    factory = ArgumentFactory(synthetic, args.id_pool)
+    probe = make_spec()
+    for name in _spec_function_names(args.use_async):
+        kwargs_factory = factory.kwargs_for(getattr(probe, name))
+        if kwargs_factory is None:
+            print(f"skipping {name}: no argument factory for its required parameters")
+            continue
+        cases.append((name, (lambda n, k: lambda spec: getattr(spec, n)(**k()))(name, kwargs_factory)))
+    # scenarios are written against the sync tools, so they only run without --async
+    if not args.no_scenarios and not args.use_async:
+        for name, scenario in SCENARIOS.items():
+            cases.append((name, (lambda s: lambda spec: s(spec, factory))(scenario)))
+
+    results = []
+    header = f"{'case':<52}{'conc':>5}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'req/call':>9}{'KB':>10}{'peak MB':>9}{'err':>5}"
+    print(header)
+    print("-" * len(header))
+    try:
+        for name, work in cases:
+            if only and name not in only:
+                continue
+            for level in levels:
+                result = run_case(make_spec, server, work, args.calls, level, args.use_async)
+                result["case"] = name
+                results.append(result)
+                print(f"{name:<52}{level:>5}{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['p99_ms']:>9.1f}"
+                      f"{result['throughput_per_s']:>9.1f}{result['requests_per_tool_call']:>9.2f}"
+                      f"{result['bytes_transferred'] / 1024:>10.0f}{result['peak_memory_mb']:>9.1f}{result['errors']:>5}")
+    finally:
+        server.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+"""Local stand-in for the Realtor RapidAPI endpoints used by src/.
+
+Serves deterministic synthetic payloads, replays fixtures recorded from the live API, or records
+them by proxying to RapidAPI. Latency, 5xx errors and 429 throttling can be injected so transport
+and cache changes can be measured without a key:
+
+    python -m benchmarks.fake_realtor --port 8765 --latency 0.05 --throttle-rate 0.02
+    python -m benchmarks.fake_realtor --record-to fixtures/ --api-key $REALTOR_API_KEY
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import re
+import threading
+import time
+
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from src.response_cache import request_key
+from src.transport import REALTOR_BASE_URL, REALTOR_HOST
+
+
+ENDPOINTS = (
+    "/locations/v2/auto-complete",
+    "/properties/v3/list",
+    "/properties/v3/list-similar-homes",
+    "/properties/v3/detail",
+    "/properties/v3/get-photos",
+    "/properties/v3/get-surroundings",
+    "/properties/v3/get-commute-time",
+)
+
+_STREETS = ("N 26th Ave", "Hollywood Blvd", "Johnson St", "Taft St", "Polk St", "Van Buren St", "Adams St", "Monroe St")
+_SUFFIX_WORDS = ("Oak", "Palm", "Harbor", "Lake", "Sunset", "Coral")
+_TYPES = ("single_family", "condos", "townhomes", "multi_family", "land")
+_CITIES = ("Hollywood", "Dania Beach", "Hallandale Beach", "Pembroke Pines")
+
+
+def _seed(*parts: Any) -> int:
+    return int(hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()[:12], 16)
+
+
+def postal_code_origin(postal_code: str) -> Tuple[float, float]:
+    """Deterministic centre point for a postal code; numerically close ZIPs land close together."""
+    number = int(postal_code) if postal_code.isdigit() else _seed(postal_code) % 100000
+    return 25.5 + (number % 1000) * 0.004, -80.6 + ((number // 1000) % 100) * 0.01
+
+
+SOLD_INDEX_OFFSET = 50000
+
+
+def property_ids_for_postal_code(postal_code: str, count: int, sold: bool = False) -> list:
+    """Ids of a postal code's synthetic listings; sold ones get their own index range."""
+    offset = SOLD_INDEX_OFFSET if sold else 0
+    return [f"{postal_code}{offset + i:05d}" for i in range(count)]
+
+
+class SyntheticRealtor:
+    """Generates stable, realistically shaped Realtor payloads from property ids and postal codes."""
+
+    def __init__(self, listings_per_postal_code: int = 300, photos_per_listing: int = 30, history_events: int = 8):
+        self.listings_per_postal_code = listings_per_postal_code
+        self.photos_per_listing = photos_per_listing
+        self.history_events = history_events
+
+    def _photos(self, property_id: str, count: int) -> list:
+        return [
+            {
+                "href": f"https://ap.rdcpix.com/{_seed(property_id, i):x}l-m{i}od-w480_h360.jpg",
+                "tags": [{"label": random.Random(_seed(property_id, i)).choice(["kitchen", "exterior", "bedroom", "bathroom"]), "probability": 0.9}],
+            }
+            for i in range(count)
+        ]
+
+    def listing(self, property_id: str) -> dict:
+        rng = random.Random(_seed(property_id))
+        postal_code = property_id[:5]
+        index = int(property_id[5:] or 0)
+        lat, lon = postal_code_origin(postal_code)
+        beds = rng.randint(1, 6)
+        sqft = rng.randint(600, 4500)
+        price = int(sqft * rng.uniform(180, 650)) // 1000 * 1000
+        property_type = rng.choice(_TYPES)
+        list_day = 1 + index % 28
+        sold = index >= SOLD_INDEX_OFFSET
+        list_month = 1 + index % 9
+        if sold:
+            last_sold_price = int(price * rng.uniform(0.9, 1.02))
+            last_sold_date = f"2026-{min(9, list_month + 1):02d}-{list_day:02d}"
+        else:
+            last_sold_price = int(price * rng.uniform(0.5, 0.95))
+            last_sold_date = f"{rng.randint(1995, 2023)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+        return {
+            "property_id": property_id,
+            "listing_id": str(_seed("listing", property_id) % 10**10),
+            "status": "sold" if sold else "for_sale",
+            "list_price": price,
+            "list_date": f"2026-{list_month:02d}-{list_day:02d}T12:00:00Z",
+            "price_reduced_amount": rng.choice([None, None, 5000, 10000, 25000]),
+            "last_sold_price": last_sold_price,
+            "last_sold_date": last_sold_date,
+            "href": f"https://www.realtor.com/realestateandhomes-detail/{property_id}",
+            "primary_photo": {"href": f"https://ap.rdcpix.com/{_seed(property_id, 'p'):x}l-m0od-w480_h360.jpg"},
+            "photos": self._photos(property_id, 2),
+            "flags": {
+                "is_new_listing": rng.random() < 0.2,
+                "is_price_reduced": rng.random() < 0.3,
+                "is_foreclosure": None,
+                "is_pending": None,
+                "is_contingent": None,
+                "is_coming_soon": None,
+                "is_new_construction": rng.random() < 0.05,
+            },
+            "description": {
+                "beds": beds,
+                "baths": rng.randint(1, max(1, beds)),
+                "baths_full": rng.randint(1, max(1, beds)),
+                "baths_half": rng.randint(0, 1),
+                "sqft": sqft,
+                "lot_sqft": rng.randint(2000, 15000),
+                "year_built": rng.randint(1940, 2025),
+                "type": property_type,
+                "sub_type": None,
+                "garage": rng.choice([None, 1, 2]),
+                "stories": rng.choice([1, 1, 2]),
+                "pool": rng.random() < 0.3,
+                "name": None,
+                "text": " ".join(rng.choice(_SUFFIX_WORDS) for _ in range(60)),
+            },
+            "location": {
+                "address": {
+                    "line": f"{100 + index * 7} {_STREETS[index % len(_STREETS)]}",
+                    "city": _CITIES[int(postal_code) % len(_CITIES)] if postal_code.isdigit() else _CITIES[0],
+                    "state_code": "FL",
+                    "postal_code": postal_code,
+                    "coordinate": {"lat": round(lat + rng.uniform(-0.02, 0.02), 6), "lon": round(lon + rng.uniform(-0.02, 0.02), 6)},
+                },
+                "county": {"name": "Broward", "fips_code": "12011"},
+            },
+            "tags": rng.sample(["central_air", "pool", "garage_1_or_more", "waterfront", "updated_kitchen", "hardwood_floors"], 3),
+            "branding": [{"name": "Synthetic Realty", "type": "Office"}],
+        }
+
+    def detail(self, property_id: str) -> dict:
+        rng = random.Random(_seed("detail", property_id))
+        home = self.listing(property_id)
+        lat = home["location"]["address"]["coordinate"]["lat"]
+        lon = home["location"]["address"]["coordinate"]["lon"]
+        area = property_id[:4]
+        home["photos"] = self._photos(property_id, self.photos_per_listing)
+        home["nearby_schools"] = {"schools": [
+            {
+                "id": f"07{area}{i:04d}",
+                "name": f"{_SUFFIX_WORDS[i % len(_SUFFIX_WORDS)]} {['Elementary', 'Middle', 'High'][i % 3]} School",
+                "rating": (_seed(area, i) % 10) + 1,
+                "parent_rating": (_seed(area, i, "p") % 5) + 1,
+                "education_levels": [["elementary"], ["middle"], ["high"]][i % 3],
+                "grades": [["K", "1", "2", "3", "4", "5"], ["6", "7", "8"], ["9", "10", "11", "12"]][i % 3],
+                "funding_type": "public",
+                "student_count": 400 + (_seed(area, i) % 1500),
+                "distance_in_miles": round(rng.uniform(0.2, 4.0), 1),
+                "coordinate": {"lat": round(lat + (i - 3) * 0.004, 6), "lon": round(lon - (i - 3) * 0.004, 6)},
+            }
+            for i in range(6)
+        ]}
+        history = []
+        price = home["last_sold_price"]
+        for i in range(self.history_events):
+            event = ["Listed", "Price Changed", "Sold", "Listing removed"][i % 4]
+            history.append({
+                "date": f"{2026 - i}-0{1 + i % 9}-15",
+                "event_name": event,
+                "price": int(price * (1 - 0.03 * i)),
+                "source_name": "Synthetic MLS",
+                "listing": {"list_price": price, "description": {"beds": home["description"]["beds"]}},
+            })
+        home["property_history"] = history
+        home["details"] = [
+            {"category": category, "text": [f"{category} feature {j}: {rng.choice(_SUFFIX_WORDS)}" for j in range(8)]}
+            for category in ("Heating and Cooling", "Exterior and Lot Features", "Land Info", "Homeowners Association",
+                             "Other Property Info", "Building and Construction", "Utilities")
+        ]
+        home["tax_history"] = [{"year": 2025 - i, "tax": int(price * 0.018), "assessment": {"total": price}} for i in range(10)]
+        return home
+
+    def response(self, path: str, params: Dict[str, Any], payload: Dict[str, Any]) -> Tuple[int, Any]:
+        if path == "/locations/v2/auto-complete":
+            text = params.get("input", "")
+            match = re.search(r"\b(\d{5})\b", text)
+            postal_code = match.group(1) if match else "33020"
+            ids = property_ids_for_postal_code(postal_code, self.listings_per_postal_code)
+            property_id = ids[_seed(" ".join(text.lower().split())) % len(ids)]
+            address = self.listing(property_id)["location"]["address"]
+            return 200, {"autocomplete": [
+                {"area_type": "city", "city": address["city"], "state_code": "FL", "_id": f"city:{address['city']}"},
+                {"area_type": "address", "mpr_id": property_id, "line": address["line"], "city": address["city"],
+                 "state_code": "FL", "postal_code": postal_code, "_id": f"addr:{property_id}"},
+            ]}
+        if path == "/properties/v3/list":
+            postal_code = str(payload.get("postal_code", "33020"))
+            limit, offset = int(payload.get("limit", 200)), int(payload.get("offset", 0))
+            sold = payload.get("status") == ["sold"]
+            ids = property_ids_for_postal_code(postal_code, self.listings_per_postal_code, sold)
+            results = [self.listing(i) for i in ids[offset:offset + limit]]
+            return 200, {"data": {"home_search": {"count": len(results), "total": len(ids), "results": results}}}
+        property_id = params.get("property_id", "")
+        if not property_id[:5].isdigit():
+            return 400, {"message": "invalid property_id"}
+        if path == "/properties/v3/list-similar-homes":
+            ids = property_ids_for_postal_code(property_id[:5], self.listings_per_postal_code)
+            start = _seed("similar", property_id) % max(1, len(ids) - 10)
+            results = [self.listing(i) for i in ids[start:start + int(params.get("limit", 10))] if i != property_id]
+            return 200, {"data": {"home": {"related_homes": {"count": len(results), "results": results}}}}
+        if path == "/properties/v3/detail":
+            return 200, {"data": {"home": self.detail(property_id)}}
+        if path == "/properties/v3/get-photos":
+            return 200, {"data": {"home_search": {"results": [{"photos": self._photos(property_id, self.photos_per_listing)}]}}}
+        if path == "/properties/v3/get-surroundings":
+            rng = random.Random(_seed("noise", property_id))
+            return 200, {"data": {"home": {"local": {
+                "noise": {"score": rng.randint(40, 95), "noise_categories": [
+                    {"type": kind, "text": rng.choice(["Low", "Medium", "High"])} for kind in ("airport", "traffic", "local", "score")
+                ]},
+                "flood": {"flood_factor_score": rng.randint(1, 10), "fema_zone": ["X"]},
+            }}}}
+        if path == "/properties/v3/get-commute-time":
+            rng = random.Random(_seed("commute", property_id, " ".join(params.get("destination_address", "").lower().split())))
+            meters = rng.randint(1500, 60000)
+            seconds = int(meters / rng.uniform(9, 20))
+            return 200, {"data": {"home": {"commute_time": {
+                "distance": {"text": f"{meters / 1609.34:.1f} mi", "value": meters},
+                "duration": {"text": f"{max(1, seconds // 60)} mins", "value": seconds},
+            }}}}
+        return 404, {"message": f"unknown endpoint {path}"}
+
+
+class FakeRealtorServer:
+    """Threaded HTTP stand-in for the Realtor API with injectable latency, errors and throttling."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.0,
+        fixtures_dir: Optional[str] = None,
+        record: bool = False,
+        api_key: Optional[str] = None,
+        synthetic: Optional[SyntheticRealtor] = None,
+        seed: int = 0
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.api_key = api_key
+        self.synthetic = synthetic or SyntheticRealtor()
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.bytes_sent = 0
+        self._rng = random.Random(seed)
+        self._scripted = deque()
+        self._lock = threading.Lock()
+        if record and not (fixtures_dir and api_key):
+            raise ValueError("recording needs both fixtures_dir and api_key")
+        if fixtures_dir:
+            os.makedirs(fixtures_dir, exist_ok=True)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeRealtorServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the request, status and byte counters."""
+        with self._lock:
+            return {"requests": dict(self.requests), "statuses": dict(self.statuses), "bytes_sent": self.bytes_sent}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.statuses.clear()
+            self.bytes_sent = 0
+
+    def _fixture_path(self, method: str, path: str, params: dict, payload: dict) -> str:
+        return os.path.join(self.fixtures_dir, request_key(method, path, params, payload) + ".json")
+
+    def _upstream(self, method: str, path: str, params: dict, payload: dict) -> Tuple[int, Any]:
+        import requests
+
+        response = requests.request(
+            method, REALTOR_BASE_URL + path, params=params or None, json=payload or None, timeout=(3.05, 30),
+            headers={"X-RapidAPI-Key": self.api_key, "X-RapidAPI-Host": REALTOR_HOST}
+        )
+        return response.status_code, response.json()
+
+    def resolve(self, method: str, path: str, params: dict, payload: dict) -> Tuple[int, Any]:
+        """Produce the status and body for a request: fixture, recording or synthetic payload."""
+        if self.fixtures_dir:
+            fixture_path = self._fixture_path(method, path, params, payload)
+            if os.path.exists(fixture_path):
+                with open(fixture_path) as f:
+                    fixture = json.load(f)
+                return fixture["status"], fixture["body"]
+            if self.record:
+                status, body = self._upstream(method, path, params, payload)
+                if status == 200:
+                    with open(fixture_path, "w") as f:
+                        json.dump({"method": method, "path": path, "params": params, "payload": payload,
+                                   "status": status, "body": body}, f)
+                return status, body
+        return self.synthetic.response(path, params, payload)
+
+    def inject(self, status: Optional[int] = None, delay: float = 0.0, count: int = 1) -> None:
+        """Script the next count requests: wait delay seconds, then answer with status instead of the payload.
+
+        Scripted faults are used up before the random ones, so tests can fail exactly the requests they mean to.
+        """
+        with self._lock:
+            self._scripted.extend([(status, delay)] * count)
+
+    def _fault(self) -> Optional[int]:
+        with self._lock:
+            if self._scripted:
+                status, delay = self._scripted.popleft()
+                roll = None
+            else:
+                status, roll = None, self._rng.random()
+                delay = self.latency + self._rng.uniform(0, self.latency_jitter) if self.latency_jitter else self.latency
+        if delay:
+            time.sleep(delay)
+        if roll is None:
+            return status
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _control(self, path: str) -> bool:
+                """Serve the /__stats and /__reset control endpoints used by out-of-process benchmarks."""
+                if path == "/__reset":
+                    server.reset_stats()
+                elif path != "/__stats":
+                    return False
+                data = json.dumps(server.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                return True
+
+            def _handle(self, method: str) -> None:
+                url = urlsplit(self.path)
+                if self._control(url.path):
+                    return
+                params = dict(parse_qsl(url.query))
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length)) if length else {}
+                status = server._fault()
+                headers = {}
+                if status == 429:
+                    body = {"message": "Too many requests"}
+                    headers["Retry-After"] = str(server.retry_after)
+                elif status is not None:
+                    body = {"message": "Service unavailable"}
+                else:
+                    status, body = server.resolve(method, url.path, params, payload)
+                data = json.dumps(body, separators=(",", ":")).encode()
+                with server._lock:
+                    server.requests[url.path] += 1
+                    server.statuses[status] += 1
+                    server.bytes_sent += len(data)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                self._handle("GET")
+
+            def do_POST(self) -> None:
+                self._handle("POST")
+
+        return Handler
+
+
+def _serve(ready, port, kwargs) -> None:
+    server = FakeRealtorServer(port=port, **kwargs)
+    ready.put(server.base_url)
+    server._server.serve_forever()
+
+
+class FakeRealtorProcess:
+    """Runs a FakeRealtorServer in a child process so it does not skew client-side timings or memory."""
+
+    def __init__(self, port: int = 0, **kwargs):
+        context = multiprocessing.get_context("spawn")
+        ready = context.Queue()
+        self.process = context.Process(target=_serve, args=(ready, port, kwargs), daemon=True)
+        self.process.start()
+        self.base_url = ready.get(timeout=30)
+
+    def snapshot(self) -> Dict[str, Any]:
+        import requests
+
+        return requests.get(self.base_url + "/__stats", timeout=5).json()
+
+    def reset_stats(self) -> None:
+        import requests
+
+        requests.post(self.base_url + "/__reset", timeout=5)
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.join(timeout=5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="extra uniform random latency, in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fixtures", help="directory of recorded responses to replay")
+    parser.add_argument("--record-to", help="proxy to RapidAPI and record responses into this directory")
+    parser.add_argument("--api-key", default=os.environ.get("REALTOR_API_KEY"))
+    args = parser.parse_args()
+
+    server = FakeRealtorServer(
+        host=args.host, port=args.port, latency=args.latency, latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        fixtures_dir=args.record_to or args.fixtures, record=bool(args.record_to), api_key=args.api_key
+    )
+    print(f"fake Realtor API listening on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,51 @@
-import requests
-import pandas as pd
+from typing import Optional
 
-from typing import Dict, Match
+from .resolver import AddressIndex
+from .transport import RealtorTransport
 
 
-def get_property_id(api_key: Dict[str, str], address: str) -> str:
-    """Given a property address that consists of alphanumeric characters, returns a property id"""
+AUTOCOMPLETE_PATH = "/locations/v2/auto-complete"
+
+
+def _property_id_from_response(response_json: Optional[dict]) -> str:
+    """Pick the property id of the first address match out of an autocomplete response."""
+    if response_json is None:
+        return ''
+
+    for row in response_json.get('autocomplete') or []:
+        if row.get('area_type') == 'address' and row.get('mpr_id') is not None:
+            return str(row['mpr_id'])
+    return ''
+
+
+def get_property_id(transport: RealtorTransport, address: str, address_index: Optional[AddressIndex] = None) -> str:
+    """Given a property address that consists of alphanumeric characters, returns a property id.
+    Addresses already in the address index resolve without a network call."""
     
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/locations/v2/auto-complete"
+    if address_index is not None:
+        property_id = address_index.lookup(address)
+        if property_id:
+            return property_id
+
     querystring = {"input":address, "limit":"10"}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return ''
+    response_json = transport.get_json(AUTOCOMPLETE_PATH, params=querystring)
+    property_id = _property_id_from_response(response_json)
+    if address_index is not None and property_id:
+        address_index.add(address, property_id)
+    return property_id
 
-    location_metadata_df = pd.json_normalize(response.json()['autocomplete'])
-    property_id = str(location_metadata_df[location_metadata_df['area_type'].eq('address')]['mpr_id'].values[0])
+
+async def aget_property_id(transport: RealtorTransport, address: str, address_index: Optional[AddressIndex] = None) -> str:
+    """Async counterpart of get_property_id."""
     
-    return property_id
\ No newline at end of file
+    if address_index is not None:
+        property_id = address_index.lookup(address)
+        if property_id:
+            return property_id
+
+    querystring = {"input":address, "limit":"10"}
+    response_json = await transport.aget_json(AUTOCOMPLETE_PATH, params=querystring)
+    property_id = _property_id_from_response(response_json)
+    if address_index is not None and property_id:
+        address_index.add(address, property_id)
+    return property_id
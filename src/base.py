@@ -1,85 +1,664 @@
-from typing import List, Optional, Any, Dict, Match
-from . import autocomplete, listing, detail
-import pandas as pd
-from datetime import datetime, timedelta
+import functools
+
+from typing import TYPE_CHECKING, List, Optional, Any, AsyncIterator, Dict, Iterator, Match, Union
+from . import autocomplete, listing, detail, schools
+from .cache import TTLCache
+from .governor import RateGovernor
+from .instrumentation import Instrumentation, instrumented
+from .listing_store import ListingStore, aquery_listings, query_listings
+from .prefetch import Prefetcher
+from .projection import OUTPUT_FORMATS, render
+from .resilience import CircuitBreaker
+from .resolver import AddressIndex, watch_transport
+from .response_cache import ResponseCache
+from .transport import REALTOR_BASE_URL, RealtorTransport
 from llama_index.core.tools.tool_spec.base import BaseToolSpec
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .market import MarketStats
+    from .similarity import SimilarityEngine
+    from .spatial import ListingLocator
+
 
 class RealtorAgentToolSpec(BaseToolSpec):
     spec_functions = [
-        "get_property_id",
-        "get_listings_by_postal_code",
-        "get_similar_listings_by_property_id",
-        "get_listing_details_by_property_id",
-        "get_nearby_school_info_by_property_id",
-        "get_property_address_by_property_id",
-        "get_property_history_by_property_id",
-        "get_home_details_by_property_id",
-        "get_listing_photos_by_property_id",
-        "get_listing_surroundings_detail_by_property_id",
-        "get_drive_commute_time_from_listing"
+        ("get_property_id", "aget_property_id"),
+        ("get_listings_by_postal_code", "aget_listings_by_postal_code"),
+        ("search_listings_by_postal_codes", "asearch_listings_by_postal_codes"),
+        ("get_similar_listings_by_property_id", "aget_similar_listings_by_property_id"),
+        ("get_listing_details_by_property_id", "aget_listing_details_by_property_id"),
+        ("get_nearby_school_info_by_property_id", "aget_nearby_school_info_by_property_id"),
+        ("get_nearby_schools_by_property_ids", "aget_nearby_schools_by_property_ids"),
+        ("get_property_address_by_property_id", "aget_property_address_by_property_id"),
+        ("get_property_history_by_property_id", "aget_property_history_by_property_id"),
+        ("get_listing_description_by_property_id", "aget_listing_description_by_property_id"),
+        ("get_listing_details_by_property_ids", "aget_listing_details_by_property_ids"),
+        ("get_property_addresses_by_property_ids", "aget_property_addresses_by_property_ids"),
+        ("get_listing_descriptions_by_property_ids", "aget_listing_descriptions_by_property_ids"),
+        ("get_home_details_by_property_id", "aget_home_details_by_property_id"),
+        ("get_listing_photos_by_property_id", "aget_listing_photos_by_property_id"),
+        ("get_listing_surroundings_detail_by_property_id", "aget_listing_surroundings_detail_by_property_id"),
+        ("get_drive_commute_time_from_listing", "aget_drive_commute_time_from_listing"),
+        ("get_commute_time_matrix", "aget_commute_time_matrix"),
+        ("query_listings", "aquery_listings"),
+        ("get_nearest_listings", "aget_nearest_listings"),
+        ("get_listings_within_radius", "aget_listings_within_radius"),
+        ("get_similar_listings_by_property_ids", "aget_similar_listings_by_property_ids"),
+        ("get_market_stats_by_postal_code", "aget_market_stats_by_postal_code")
     ]
 
     def __init__(
         self,
-        realtor_api_key: str
+        realtor_api_key: str,
+        detail_cache_size: int = 256,
+        detail_cache_ttl: float = 900.0,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 20.0,
+        max_retries: int = 3,
+        max_concurrency: int = 8,
+        cache_path: Optional[str] = None,
+        cache_ttls: Optional[Dict[str, float]] = None,
+        cache_max_bytes: int = 256 * 1024 * 1024,
+        offline: bool = False,
+        base_url: str = REALTOR_BASE_URL,
+        rate_limit: float = 5.0,
+        rate_burst: int = 10,
+        monthly_quota: Optional[int] = None,
+        quota_state_path: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        output_format: str = "dataframe",
+        output_budget: int = 6000,
+        listing_store_path: str = ":memory:",
+        listing_max_age: float = 900.0,
+        listing_full_refresh_age: float = 86400.0,
+        similarity_weights: Optional[Dict[str, float]] = None,
+        commute_cache_size: int = 4096,
+        commute_cache_ttl: float = 7 * 86400.0,
+        coalesce_requests: bool = True,
+        call_deadline: Optional[float] = 30.0,
+        hedge_requests: bool = False,
+        circuit_failure_threshold: int = 5,
+        circuit_reset_timeout: float = 30.0,
+        serve_stale: bool = True,
+        prefetch_top_n: int = 0,
+        prefetch_budget: int = 300,
+        market_history_fetches: int = 20,
+        school_index_max_age: float = 7 * 86400.0
     ):
-        self._api_key = {
-            "REALTOR_API_KEY": realtor_api_key,
-        }
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+        self._output_format = output_format
+        # only the dataframe format hands DataFrames to the caller; the others build pandas-free Rows
+        self._table_kind = "dataframe" if output_format == "dataframe" else "rows"
+        self._output_budget = output_budget
+        response_cache = None
+        if cache_path is not None:
+            response_cache = ResponseCache(cache_path, ttls=cache_ttls, max_bytes=cache_max_bytes)
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._call_deadline = call_deadline
+        self._transport = RealtorTransport(
+            realtor_api_key,
+            base_url=base_url,
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_retries=max_retries,
+            response_cache=response_cache,
+            offline=offline,
+            governor=RateGovernor(rate=rate_limit, burst=rate_burst, monthly_quota=monthly_quota, state_path=quota_state_path),
+            instrumentation=self._instrumentation,
+            coalesce=coalesce_requests,
+            hedge=hedge_requests,
+            circuit_breaker=CircuitBreaker(failure_threshold=circuit_failure_threshold, reset_timeout=circuit_reset_timeout),
+            serve_stale=serve_stale
+        )
+        self._detail_cache = TTLCache(maxsize=detail_cache_size, ttl=detail_cache_ttl)
+        self._photos_cache = TTLCache(maxsize=detail_cache_size, ttl=detail_cache_ttl)
+        self._surroundings_cache = TTLCache(maxsize=detail_cache_size, ttl=detail_cache_ttl)
+        self._commute_cache = TTLCache(maxsize=commute_cache_size, ttl=commute_cache_ttl)
+        self._max_concurrency = max_concurrency
+        self._address_index = AddressIndex()
+        watch_transport(self._address_index, self._transport)
+        self._listing_store = ListingStore(listing_store_path, max_age=listing_max_age, full_refresh_age=listing_full_refresh_age)
+        self._listing_store.watch(self._transport)
+        self._school_index = schools.SchoolIndex(max_age=school_index_max_age)
+        self._school_index.watch(self._transport)
+        self._similarity_weights = similarity_weights
+        self._market_history_fetches = market_history_fetches
+        self._prefetcher = None
+        if prefetch_top_n > 0:
+            caches = {"detail": self._detail_cache, "photos": self._photos_cache, "surroundings": self._surroundings_cache}
+            self._prefetcher = Prefetcher(self._transport, caches, top_n=prefetch_top_n, budget=prefetch_budget)
+            self._instrumentation.add_hook(self._prefetcher)
+
+    # the spatial, similarity and market tools are imported and built on first use, so a spec
+    # that never calls them does not pay for them at startup
+    @functools.cached_property
+    def _listing_locator(self) -> "ListingLocator":
+        from .spatial import ListingLocator
+
+        return ListingLocator(self._listing_store)
+
+    @functools.cached_property
+    def _similarity(self) -> "SimilarityEngine":
+        from .similarity import SimilarityEngine
+
+        return SimilarityEngine(self._listing_store, weights=self._similarity_weights)
+
+    @functools.cached_property
+    def _market(self) -> "MarketStats":
+        from .market import MarketStats
+
+        return MarketStats(self._listing_store)
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections of the async HTTP client and stops any queued prefetches."""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+        await self._transport.aclose()
+
+    def detail_cache_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and occupancy of the shared property detail cache."""
+        return self._detail_cache.stats()
+
+    def commute_cache_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and occupancy of the per-pair commute time cache."""
+        return self._commute_cache.stats()
+
+    def rate_limit_stats(self) -> Dict[str, float]:
+        """Returns remaining rate-limit tokens, monthly quota use and queueing counters."""
+        return self._transport.governor.remaining()
+
+    def address_index_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and size of the local address-to-property-id index."""
+        return self._address_index.stats()
+
+    def school_index_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the number of schools and properties in the shared school index."""
+        return self._school_index.stats()
+
+    def response_cache_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and size of the persistent response cache, if one is configured."""
+        if self._transport.response_cache is None:
+            return {}
+        return self._transport.response_cache.stats()
+
+    def listing_store_stats(self) -> Dict[str, int]:
+        """Returns the number of stored listings and of postal codes synced into the local listing store."""
+        return self._listing_store.stats()
+
+    def prefetch_stats(self) -> Dict[str, float]:
+        """Returns prefetch counters and the share of prefetched entries later used, if prefetching is enabled."""
+        if self._prefetcher is None:
+            return {}
+        return self._prefetcher.stats()
+
+    def circuit_breaker_stats(self) -> Dict[str, str]:
+        """Returns the circuit state (closed, open or half_open) of each endpoint that has failed recently."""
+        return self._transport.circuit_breaker.stats()
 
+    def _output(self, result: Any) -> Any:
+        """Render a tool result in the spec's output_format: as is, compact text, plain Python or an Arrow table."""
+        return render(result, self._output_format, self._output_budget)
+
+    def _search_output(self, result: Any) -> Any:
+        """_output for listing search results, whose top property ids are first queued for prefetching."""
+        if self._prefetcher is not None:
+            self._prefetcher.schedule(result)
+        return self._output(result)
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """Per-tool and per-endpoint timings, payload sizes, cache hits and error counters."""
+        return self._instrumentation
+
+    def add_instrumentation_hook(self, hook: Any) -> None:
+        """Registers an InstrumentationHook, or a callable that receives every finished ToolCall."""
+        self._instrumentation.add_hook(hook)
+
+    def metrics_text(self) -> str:
+        """Returns the instrumentation counters in the Prometheus text exposition format."""
+        return self._instrumentation.prometheus_text()
+
+    @instrumented
     def get_property_id(self, address: str) -> str:
         """Given a property address that consists of alphanumeric characters, returns the property id."""
-        return autocomplete.get_property_id(self._api_key, address)
+        return autocomplete.get_property_id(self._transport, address, self._address_index)
+
+    @instrumented
+    async def aget_property_id(self, address: str) -> str:
+        """Async counterpart of get_property_id."""
+        return await autocomplete.aget_property_id(self._transport, address, self._address_index)
+
+    @instrumented
+    def get_listings_by_postal_code(self, postal_code: str, max_results: int = 200, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a postal code, returns a dataframe of properties for sale and their characteristics.
+        Returns at most max_results of the most recently listed properties.
+        fields optionally lists the dotted column paths to return, such as ['list_price', 'description.beds'];
+        pass ['*'] for every column."""
+        return self._search_output(listing.get_listings_by_postal_code(self._transport, postal_code, max_results, fields))
+
+    @instrumented
+    async def aget_listings_by_postal_code(self, postal_code: str, max_results: int = 200, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_listings_by_postal_code."""
+        return self._search_output(await listing.aget_listings_by_postal_code(self._transport, postal_code, max_results, fields))
+
+    @instrumented
+    def search_listings_by_postal_codes(self, postal_codes: List[str], status: Optional[List[str]] = None, max_results: int = 200, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a list of postal codes, returns one dataframe of properties across all of them, up to max_results rows.
+        status filters the listing status and may include 'for_sale', 'ready_to_build', 'for_rent', 'sold',
+        'off_market', 'new_community' and 'other'; it defaults to properties for sale.
+        fields optionally lists the dotted column paths to return, such as ['list_price', 'description.beds'];
+        pass ['*'] for every column."""
+        return self._search_output(listing.search_listings(self._transport, postal_codes, status or listing.DEFAULT_STATUS, max_results=max_results, max_concurrency=self._max_concurrency, fields=fields))
+
+    @instrumented
+    async def asearch_listings_by_postal_codes(self, postal_codes: List[str], status: Optional[List[str]] = None, max_results: int = 200, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of search_listings_by_postal_codes."""
+        return self._search_output(await listing.asearch_listings(self._transport, postal_codes, status or listing.DEFAULT_STATUS, max_results=max_results, max_concurrency=self._max_concurrency, fields=fields))
 
-    def get_listings_by_postal_code(self, postal_code: str) -> pd.DataFrame:
-        """Given a postal code, returns a dataframe of properties for sale and their characteristics."""
-        return listing.get_listings_by_postal_code(self._api_key, postal_code)
+    def iter_listing_pages(self, postal_codes: List[str], status: Optional[List[str]] = None, page_size: int = 50, max_results: Optional[int] = None, fields: Optional[List[str]] = None) -> Iterator["pd.DataFrame"]:
+        """Yields pages of listings for the given postal codes as they are fetched."""
+        return listing.iter_listing_pages(self._transport, postal_codes, status or listing.DEFAULT_STATUS, page_size, max_results, self._max_concurrency, fields)
 
-    def get_similar_listings_by_property_id(self, property_id: str) -> pd.DataFrame:
-        """Given a property id, returns a dataframe of similar properties and their characteristics."""
-        return listing.get_similar_listings_by_property_id(self._api_key, property_id)
+    def aiter_listing_pages(self, postal_codes: List[str], status: Optional[List[str]] = None, page_size: int = 50, max_results: Optional[int] = None, fields: Optional[List[str]] = None) -> AsyncIterator["pd.DataFrame"]:
+        """Async counterpart of iter_listing_pages."""
+        return listing.aiter_listing_pages(self._transport, postal_codes, status or listing.DEFAULT_STATUS, page_size, max_results, self._max_concurrency, fields)
 
-    def get_listing_details_by_property_id(self, property_id: str) -> pd.DataFrame:
-        """Given a property id, returns a dataframe of the property's characteristics."""
-        return detail.get_listing_details_by_property_id(self._api_key, property_id)
+    @instrumented
+    def get_similar_listings_by_property_id(self, property_id: str, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a property id, returns a dataframe of similar properties and their characteristics.
+        fields optionally lists the dotted column paths to return, such as ['list_price', 'description.beds'];
+        pass ['*'] for every column."""
+        return self._search_output(listing.get_similar_listings_by_property_id(self._transport, property_id, fields))
 
-    def get_nearby_school_info_by_property_id(self, property_id: str) -> pd.DataFrame:
-        """Given a property id, returns a dataframe of the property's characteristics."""
-        return detail.get_nearby_school_info_by_property_id(self._api_key, property_id)
+    @instrumented
+    async def aget_similar_listings_by_property_id(self, property_id: str, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_similar_listings_by_property_id."""
+        return self._search_output(await listing.aget_similar_listings_by_property_id(self._transport, property_id, fields))
 
-    def get_property_address_by_property_id(self, property_id: str) -> dict:
+    @instrumented
+    def get_listing_details_by_property_id(self, property_id: str, refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a property id, returns a dataframe of the property's characteristics.
+        Set refresh to True to bypass previously fetched detail data.
+        fields optionally lists the dotted column paths to return, such as ['list_price', 'description.beds'];
+        pass ['*'] for every column."""
+        return self._output(detail.get_listing_details_by_property_id(self._transport, property_id, self._detail_cache, refresh, fields))
+
+    @instrumented
+    async def aget_listing_details_by_property_id(self, property_id: str, refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_listing_details_by_property_id."""
+        return self._output(await detail.aget_listing_details_by_property_id(self._transport, property_id, self._detail_cache, refresh, fields))
+
+    @instrumented
+    def get_nearby_school_info_by_property_id(self, property_id: str, refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a property id, returns a dataframe of the schools near the property, one row per school with
+        its 'name', 'rating', 'parent_rating', 'education_levels', 'grades', 'funding_type', 'student_count'
+        and 'distance_in_miles'.
+        Set refresh to True to bypass previously fetched detail data.
+        fields optionally lists the dotted column paths to return, such as ['name', 'rating'];
+        pass ['*'] for every column."""
+        return self._output(detail.get_nearby_school_info_by_property_id(self._transport, property_id, self._detail_cache, refresh, fields))
+
+    @instrumented
+    async def aget_nearby_school_info_by_property_id(self, property_id: str, refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_nearby_school_info_by_property_id."""
+        return self._output(await detail.aget_nearby_school_info_by_property_id(self._transport, property_id, self._detail_cache, refresh, fields))
+
+    @instrumented
+    def get_nearby_schools_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Given a list of property ids, returns the schools near all of them without repeating shared schools:
+        'schools' is one table with a row per distinct school (rating, parent_rating, grades, funding_type,
+        student_count, location, how many of the properties list it and the nearest distance in miles), and
+        'property_schools' maps each property id to its [school_id, distance_in_miles] pairs. Ids whose detail
+        could not be fetched are listed under 'unavailable'. Prefer this over calling
+        get_nearby_school_info_by_property_id for each property. Set refresh to True to bypass indexed schools."""
+        return self._output(schools.get_nearby_schools_by_property_ids(self._school_index, self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    async def aget_nearby_schools_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_nearby_schools_by_property_ids."""
+        return self._output(await schools.aget_nearby_schools_by_property_ids(self._school_index, self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    def get_property_address_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
         """Given a property id, returns a dictionary of the property's address including
-           street, city, and postal code information.."""
-        return detail.get_property_address_by_property_id(self._api_key, property_id)
+        street, city, and postal code information.
+        Set refresh to True to bypass previously fetched detail data."""
+        return self._output(detail.get_property_address_by_property_id(self._transport, property_id, self._detail_cache, refresh))
+
+    @instrumented
+    async def aget_property_address_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_property_address_by_property_id."""
+        return self._output(await detail.aget_property_address_by_property_id(self._transport, property_id, self._detail_cache, refresh))
 
-    def get_property_history_by_property_id(self, property_id: str) -> dict:
-        """Given a property id, returns a dictionary of the property's buy/sell history,
-        including 'date', 'event_name', and 'price'."""
-        return detail.get_property_history_by_property_id(self._api_key, property_id)
+    @instrumented
+    def get_property_history_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
+        """Given a property id, returns a dictionary of the property's most recent buy/sell history event,
+        including 'date', 'event_name', and 'price'.
+        Set refresh to True to bypass previously fetched detail data."""
+        return self._output(detail.get_property_history_by_property_id(self._transport, property_id, self._detail_cache, refresh))
 
-    def get_listing_description_by_property_id(self, property_id: str) -> dict:
+    @instrumented
+    async def aget_property_history_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_property_history_by_property_id."""
+        return self._output(await detail.aget_property_history_by_property_id(self._transport, property_id, self._detail_cache, refresh))
+
+    @instrumented
+    def get_listing_description_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
         """Given a property id, returns a dictionary of the property's listing description,
         including 'baths', 'baths_min', 'baths_max', 'heating', 'cooling', 'beds', 'beds_min', 'beds_max', 'garage', 
         'garage_min', 'garage_max', 'pool', 'sqft', 'sqft_min', 'sqft_max', 'styles', 'lot_sqft', 'units', 'stories', 'type', 
-        'sub_type', 'listing description', 'year_built', 'name'."""
-        return detail.get_property_listing_description_by_property_id(self._api_key, property_id) 
+        'sub_type', 'listing description', 'year_built', 'name'.
+        Set refresh to True to bypass previously fetched detail data."""
+        return self._output(detail.get_listing_description_by_property_id(self._transport, property_id, self._detail_cache, refresh))
+
+    @instrumented
+    async def aget_listing_description_by_property_id(self, property_id: str, refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_listing_description_by_property_id."""
+        return self._output(await detail.aget_listing_description_by_property_id(self._transport, property_id, self._detail_cache, refresh))
 
-    def get_home_details_by_property_id(self, property_id: str) -> pd.DataFrame:
+    @instrumented
+    def get_listing_details_by_property_ids(self, property_ids: List[str], refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Given a list of property ids, returns one dataframe of all the properties' characteristics,
+        with a 'property_id' column and a 'status' column ('ok', 'not_found' or 'error') per property.
+        Prefer this over calling get_listing_details_by_property_id once per property.
+        fields optionally lists the dotted column paths to return, such as ['list_price', 'description.beds'];
+        pass ['*'] for every column."""
+        return self._output(detail.get_listing_details_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency, fields))
+
+    @instrumented
+    async def aget_listing_details_by_property_ids(self, property_ids: List[str], refresh: bool = False, fields: Optional[List[str]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_listing_details_by_property_ids."""
+        return self._output(await detail.aget_listing_details_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency, fields))
+
+    @instrumented
+    def get_property_addresses_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Given a list of property ids, returns a dictionary keyed by property id where each value has a
+        'status' ('ok', 'not_found' or 'error') and the address under 'result' or the reason under 'error'.
+        Prefer this over calling get_property_address_by_property_id once per property."""
+        return self._output(detail.get_property_addresses_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    async def aget_property_addresses_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_property_addresses_by_property_ids."""
+        return self._output(await detail.aget_property_addresses_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    def get_listing_descriptions_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Given a list of property ids, returns a dictionary keyed by property id where each value has a
+        'status' ('ok', 'not_found' or 'error') and the listing description under 'result' or the reason under 'error'.
+        Prefer this over calling get_listing_description_by_property_id once per property."""
+        return self._output(detail.get_listing_descriptions_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    async def aget_listing_descriptions_by_property_ids(self, property_ids: List[str], refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_listing_descriptions_by_property_ids."""
+        return self._output(await detail.aget_listing_descriptions_by_property_ids(self._transport, property_ids, self._detail_cache, refresh, self._max_concurrency))
+
+    @instrumented
+    def get_home_details_by_property_id(self, property_id: str, refresh: bool = False) -> Union["pd.DataFrame", str]:
         """Given a property id, returns a dataframe of the property's characteristics about
         'Heating and Cooling', 'Exterior and Lot Features', 'Land Info','Homeowners Association',
         'Multi-Unit Info','Rental Info','Other Property Info','Building and Construction',
-        'Utilities'."""
-        return detail.get_home_details_by_property_id(self._api_key, property_id)
+        'Utilities'.
+        Set refresh to True to bypass previously fetched detail data."""
+        return self._output(detail.get_home_details_by_property_id(self._transport, property_id, self._detail_cache, refresh))
+
+    @instrumented
+    async def aget_home_details_by_property_id(self, property_id: str, refresh: bool = False) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_home_details_by_property_id."""
+        return self._output(await detail.aget_home_details_by_property_id(self._transport, property_id, self._detail_cache, refresh))
 
-    def get_listing_photos_by_property_id(self, property_id: str) -> list:
+    @instrumented
+    def get_listing_photos_by_property_id(self, property_id: str) -> Union[list, str]:
         """Given a property id, returns a list of photo links for the property."""
-        return detail.get_listing_photos_by_property_id(self._api_key, property_id)
+        return self._output(detail.get_listing_photos_by_property_id(self._transport, property_id, self._photos_cache))
+
+    @instrumented
+    async def aget_listing_photos_by_property_id(self, property_id: str) -> Union[list, str]:
+        """Async counterpart of get_listing_photos_by_property_id."""
+        return self._output(await detail.aget_listing_photos_by_property_id(self._transport, property_id, self._photos_cache))
 
-    def get_listing_surroundings_detail_by_property_id(self, property_id: str) -> pd.DataFrame:
-        """Given a property id, returns a dataframe of details on the area surrounding the property"""
-        return detail.get_listing_surroundings_detail_by_property_id(self._api_key, property_id)
+    @instrumented
+    def get_listing_surroundings_detail_by_property_id(self, property_id: str) -> Union["pd.DataFrame", str]:
+        """Given a property id, returns a dataframe of details on the area surrounding the property."""
+        return self._output(detail.get_listing_surroundings_detail_by_property_id(self._transport, property_id, self._surroundings_cache))
 
+    @instrumented
+    async def aget_listing_surroundings_detail_by_property_id(self, property_id: str) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_listing_surroundings_detail_by_property_id."""
+        return self._output(await detail.aget_listing_surroundings_detail_by_property_id(self._transport, property_id, self._surroundings_cache))
+
+    @instrumented
     def get_drive_commute_time_from_listing(self, property_id: str, destination_address:str) -> str:
         """Given a property id and destination address, returns a string describing the driving commute time"""
-        return detail.get_drive_commute_time_from_listing(self._api_key, property_id, destination_address)
\ No newline at end of file
+        return detail.get_drive_commute_time_from_listing(self._transport, property_id, destination_address)
+
+    @instrumented
+    async def aget_drive_commute_time_from_listing(self, property_id: str, destination_address:str) -> str:
+        """Async counterpart of get_drive_commute_time_from_listing."""
+        return await detail.aget_drive_commute_time_from_listing(self._transport, property_id, destination_address)
+
+    @instrumented
+    def get_commute_time_matrix(self, property_ids: List[str], destination_addresses: List[str], mode: str = "driving") -> Union["pd.DataFrame", str]:
+        """Given a list of property ids and a list of destination addresses, returns one dataframe row per
+        property and destination with 'duration_minutes', 'distance_miles' and a 'status' ('ok', 'not_found' or 'error').
+        mode is the transportation type and defaults to 'driving'.
+        Prefer this over calling get_drive_commute_time_from_listing once per property and destination."""
+        return self._output(detail.get_commute_time_matrix(self._transport, property_ids, destination_addresses, mode, self._commute_cache, self._max_concurrency))
+
+    @instrumented
+    async def aget_commute_time_matrix(self, property_ids: List[str], destination_addresses: List[str], mode: str = "driving") -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_commute_time_matrix."""
+        return self._output(await detail.aget_commute_time_matrix(self._transport, property_ids, destination_addresses, mode, self._commute_cache, self._max_concurrency))
+
+
+    @instrumented
+    def query_listings(
+        self,
+        postal_codes: List[str],
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        max_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        max_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        listed_after: Optional[str] = None,
+        status: Optional[List[str]] = None,
+        sort_by: str = "list_date",
+        descending: bool = True,
+        limit: int = 20
+    ) -> Union["pd.DataFrame", str]:
+        """Given a list of postal codes and filters, returns a dataframe of the matching properties, up to limit rows.
+        Filters are inclusive: price in dollars, beds, baths, sqft, property_types such as
+        ['single_family', 'condos', 'townhomes'], has_pool, and listed_after as a 'YYYY-MM-DD' date.
+        sort_by may be 'list_date', 'list_price', 'beds', 'baths', 'sqft', 'lot_sqft', 'year_built' or 'price_reduced_amount'.
+        Prefer this over filtering the output of search_listings_by_postal_codes."""
+        return self._search_output(query_listings(
+            self._listing_store, self._transport, postal_codes, status or listing.DEFAULT_STATUS, self._max_concurrency,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, max_beds=max_beds, min_baths=min_baths,
+            min_sqft=min_sqft, max_sqft=max_sqft, property_types=property_types, has_pool=has_pool,
+            listed_after=listed_after, sort_by=sort_by, descending=descending, limit=limit
+        ))
+
+    @instrumented
+    async def aquery_listings(
+        self,
+        postal_codes: List[str],
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        max_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        max_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        listed_after: Optional[str] = None,
+        status: Optional[List[str]] = None,
+        sort_by: str = "list_date",
+        descending: bool = True,
+        limit: int = 20
+    ) -> Union["pd.DataFrame", str]:
+        """Async counterpart of query_listings."""
+        return self._search_output(await aquery_listings(
+            self._listing_store, self._transport, postal_codes, status or listing.DEFAULT_STATUS, self._max_concurrency,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, max_beds=max_beds, min_baths=min_baths,
+            min_sqft=min_sqft, max_sqft=max_sqft, property_types=property_types, has_pool=has_pool,
+            listed_after=listed_after, sort_by=sort_by, descending=descending, limit=limit
+        ))
+
+    @instrumented
+    def get_nearest_listings(
+        self,
+        address_or_property_id: str,
+        k: int = 5,
+        max_distance_miles: float = 5.0,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        search_nearby_postal_codes: bool = False
+    ) -> Union["pd.DataFrame", str]:
+        """Given an address or property id, returns a dataframe of the k closest properties for sale within
+        max_distance_miles, nearest first, with a 'distance_miles' column. Filters are inclusive: price in dollars,
+        beds, baths, sqft, property_types such as ['single_family', 'condos'] and has_pool.
+        Set search_nearby_postal_codes to True to also search numerically adjacent postal codes when the distance
+        reaches well past the property's own postal code; adjacent codes are a heuristic, not true geographic
+        neighbours, and each one costs an extra listing search."""
+        from . import spatial
+
+        return self._search_output(spatial.listings_near(
+            self._listing_locator, self._transport, address_or_property_id, max_distance_miles, k,
+            self._detail_cache, self._address_index, listing.DEFAULT_STATUS, self._max_concurrency, search_nearby_postal_codes,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, min_baths=min_baths,
+            min_sqft=min_sqft, property_types=property_types, has_pool=has_pool
+        ))
+
+    @instrumented
+    async def aget_nearest_listings(
+        self,
+        address_or_property_id: str,
+        k: int = 5,
+        max_distance_miles: float = 5.0,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        search_nearby_postal_codes: bool = False
+    ) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_nearest_listings."""
+        from . import spatial
+
+        return self._search_output(await spatial.alistings_near(
+            self._listing_locator, self._transport, address_or_property_id, max_distance_miles, k,
+            self._detail_cache, self._address_index, listing.DEFAULT_STATUS, self._max_concurrency, search_nearby_postal_codes,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, min_baths=min_baths,
+            min_sqft=min_sqft, property_types=property_types, has_pool=has_pool
+        ))
+
+    @instrumented
+    def get_listings_within_radius(
+        self,
+        address_or_property_id: str,
+        radius_miles: float = 1.0,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        limit: int = 50,
+        search_nearby_postal_codes: bool = False
+    ) -> Union["pd.DataFrame", str]:
+        """Given an address or property id, returns a dataframe of properties for sale within radius_miles,
+        nearest first and up to limit rows, with a 'distance_miles' column. Filters are inclusive: price in dollars,
+        beds, baths, sqft, property_types such as ['single_family', 'condos'] and has_pool.
+        Set search_nearby_postal_codes to True to also search numerically adjacent postal codes when the radius
+        reaches well past the property's own postal code; adjacent codes are a heuristic, not true geographic
+        neighbours, and each one costs an extra listing search."""
+        from . import spatial
+
+        return self._search_output(spatial.listings_near(
+            self._listing_locator, self._transport, address_or_property_id, radius_miles, limit,
+            self._detail_cache, self._address_index, listing.DEFAULT_STATUS, self._max_concurrency, search_nearby_postal_codes,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, min_baths=min_baths,
+            min_sqft=min_sqft, property_types=property_types, has_pool=has_pool
+        ))
+
+    @instrumented
+    async def aget_listings_within_radius(
+        self,
+        address_or_property_id: str,
+        radius_miles: float = 1.0,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        min_sqft: Optional[int] = None,
+        property_types: Optional[List[str]] = None,
+        has_pool: Optional[bool] = None,
+        limit: int = 50,
+        search_nearby_postal_codes: bool = False
+    ) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_listings_within_radius."""
+        from . import spatial
+
+        return self._search_output(await spatial.alistings_near(
+            self._listing_locator, self._transport, address_or_property_id, radius_miles, limit,
+            self._detail_cache, self._address_index, listing.DEFAULT_STATUS, self._max_concurrency, search_nearby_postal_codes,
+            min_price=min_price, max_price=max_price, min_beds=min_beds, min_baths=min_baths,
+            min_sqft=min_sqft, property_types=property_types, has_pool=has_pool
+        ))
+
+    @instrumented
+    def get_similar_listings_by_property_ids(self, property_ids: List[str], k: int = 10, include_remote: bool = False, weights: Optional[Dict[str, float]] = None) -> Union["pd.DataFrame", str]:
+        """Given a list of property ids, returns one dataframe of the k most similar properties for sale per property,
+        with 'seed_property_id' and 'similarity_distance' columns, most similar first. Unlike
+        get_similar_listings_by_property_id it is not capped at 10 results and answers many properties at once.
+        weights optionally re-weights 'price', 'beds', 'baths', 'sqft', 'lot_sqft', 'year_built',
+        'property_type' and 'location' (default 1.0 or less each; 0 ignores a feature).
+        Set include_remote to True to merge in the remote similar-homes results; the 'source' column says
+        whether a row came from 'local', 'remote' or 'both'."""
+        from . import similarity
+
+        return self._search_output(similarity.get_similar_listings_by_property_ids(self._similarity, self._transport, property_ids, k, weights, include_remote, self._detail_cache, self._max_concurrency))
+
+    @instrumented
+    async def aget_similar_listings_by_property_ids(self, property_ids: List[str], k: int = 10, include_remote: bool = False, weights: Optional[Dict[str, float]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_similar_listings_by_property_ids."""
+        from . import similarity
+
+        return self._search_output(await similarity.aget_similar_listings_by_property_ids(self._similarity, self._transport, property_ids, k, weights, include_remote, self._detail_cache, self._max_concurrency))
+
+    @instrumented
+    def get_market_stats_by_postal_code(self, postal_code: str, windows: Optional[List[int]] = None) -> Union["pd.DataFrame", str]:
+        """Given a postal code, returns a small dataframe of market statistics, one row per trailing window of
+        days (30, 90 and 365 unless windows says otherwise): listing count, list price and price per sqft
+        quartiles, days on market and the share of listings with a price cut, plus sales, sale price per sqft,
+        the percent difference from list to sale price and price cuts from sold listings and property histories. The *_change_pct
+        columns compare the window with the window before it. Prefer this over computing from raw listings."""
+        from . import market
+
+        return self._output(market.get_market_stats(self._market, self._transport, postal_code, windows, self._detail_cache, self._market_history_fetches, self._max_concurrency))
+
+    @instrumented
+    async def aget_market_stats_by_postal_code(self, postal_code: str, windows: Optional[List[int]] = None) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_market_stats_by_postal_code."""
+        from . import market
+
+        return self._output(await market.aget_market_stats(self._market, self._transport, postal_code, windows, self._detail_cache, self._market_history_fetches, self._max_concurrency))
@@ -0,0 +1,57 @@
+import asyncio
+import contextvars
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+
+def unique_ids(ids: Iterable[str]) -> List[str]:
+    """Return the ids as strings with duplicates removed, keeping first-seen order."""
+    return list(dict.fromkeys(str(i) for i in ids))
+
+
+def _outcome(result: Any) -> Dict[str, Any]:
+    if result is None or (hasattr(result, "__len__") and len(result) == 0):
+        return {"status": "not_found", "result": result}
+    return {"status": "ok", "result": result}
+
+
+def _failure(exc: Exception) -> Dict[str, Any]:
+    return {"status": "error", "error": str(exc)}
+
+
+def fan_out(fn: Callable[[str], Any], ids: Iterable[str], max_concurrency: int = 8) -> Dict[str, Dict[str, Any]]:
+    """Call fn once per distinct id on a bounded thread pool.
+
+    Returns a dict keyed by id whose values carry a 'status' of 'ok', 'not_found' or 'error'
+    together with either the 'result' or the 'error' message, so one failing id never sinks the batch.
+    """
+    ids = unique_ids(ids)
+    outcomes = {}
+    if not ids:
+        return outcomes
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(ids)))) as executor:
+        # each worker runs in a copy of the caller's context so priority and tool-call tracking carry over
+        futures = {i: executor.submit(contextvars.copy_context().run, fn, i) for i in ids}
+        for i, future in futures.items():
+            try:
+                outcomes[i] = _outcome(future.result())
+            except Exception as exc:
+                outcomes[i] = _failure(exc)
+    return outcomes
+
+
+async def afan_out(afn: Callable[[str], Awaitable[Any]], ids: Iterable[str], max_concurrency: int = 8) -> Dict[str, Dict[str, Any]]:
+    """Async counterpart of fan_out, bounding in-flight coroutines with a semaphore."""
+    ids = unique_ids(ids)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(i: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return _outcome(await afn(i))
+            except Exception as exc:
+                return _failure(exc)
+
+    results = await asyncio.gather(*(run(i) for i in ids))
+    return dict(zip(ids, results))
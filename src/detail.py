@@ -1,49 +1,117 @@
-import requests
-import pandas as pd
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from typing import Dict
+from .batch import afan_out, fan_out
+from .cache import TTLCache
+from .instrumentation import record_cache_hit
+from .projection import DETAIL_FIELDS, HOME_DETAIL_FIELDS, SCHOOL_FIELDS, SURROUNDINGS_FIELDS, Table, empty_table, project, table_from_records, table_kind
+from .resolver import canonicalize_address
+from .transport import RealtorTransport
 
 
-def get_listing_details_by_property_id(api_key: Dict[str, str], property_id:str) -> pd.DataFrame:
-    """Get property detail information."""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
+DETAIL_PATH = "/properties/v3/detail"
+PHOTOS_PATH = "/properties/v3/get-photos"
+SURROUNDINGS_PATH = "/properties/v3/get-surroundings"
+COMMUTE_TIME_PATH = "/properties/v3/get-commute-time"
+
+
+def _home_from_response(response_json: Optional[dict]) -> dict:
+    if response_json is None:
+        return {}
+    return response_json['data']['home'] or {}
+
+
+def get_property_detail(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
+    """Get the full property detail document, fetched once and shared through the detail cache."""
+
+    if detail_cache is not None and not refresh:
+        home = detail_cache.get(property_id)
+        if home is not None:
+            record_cache_hit("detail")
+            return home
+
     querystring = {"property_id":property_id}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    listing_details_df = pd.DataFrame()
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return listing_details_df
-    
-    listing_details_df = pd.json_normalize(response.json()['data']['home'])
-    
-    return listing_details_df
-
-
-def get_nearby_school_info_by_property_id(api_key: Dict[str, str], property_id:str) -> pd.DataFrame:
-    """Get nearby school detail information."""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
+    home = _home_from_response(transport.get_json(DETAIL_PATH, params=querystring, refresh=refresh))
+    if detail_cache is not None and home:
+        detail_cache.set(property_id, home)
+
+    return home
+
+
+async def aget_property_detail(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
+    """Async counterpart of get_property_detail."""
+
+    if detail_cache is not None and not refresh:
+        home = detail_cache.get(property_id)
+        if home is not None:
+            record_cache_hit("detail")
+            return home
+
     querystring = {"property_id":property_id}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    nearby_schools_df = pd.DataFrame()
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return nearby_schools_df
-    
-    nearby_schools_df = pd.json_normalize(response.json()['data']['home']['nearby_schools']['schools'])
-    
-    return nearby_schools_df
-
-def get_home_details_by_property_id(api_key: Dict[str, str], property_id:str) -> pd.DataFrame:
+    home = _home_from_response(await transport.aget_json(DETAIL_PATH, params=querystring, refresh=refresh))
+    if detail_cache is not None and home:
+        detail_cache.set(property_id, home)
+
+    return home
+
+
+def _listing_details_from_home(home: dict, fields: Optional[Sequence[str]] = None) -> Table:
+    if not home:
+        return empty_table()
+    return project([home], fields, DETAIL_FIELDS)
+
+
+def _nearby_schools_from_home(home: dict, fields: Optional[Sequence[str]] = None) -> Table:
+    if not home:
+        return empty_table()
+    return project(home['nearby_schools']['schools'], fields, SCHOOL_FIELDS)
+
+
+def _home_details_from_home(home: dict) -> Table:
+    if not home:
+        return empty_table()
+    return project(home['details'], None, HOME_DETAIL_FIELDS)
+
+
+def _address_from_home(home: dict) -> dict:
+    if not home:
+        return {}
+    return home['location']['address']
+
+
+def _history_from_home(home: dict) -> dict:
+    if not home or not home.get('property_history'):
+        return {}
+    return {k:v for k, v in home['property_history'][0].items() if k != 'listing'}
+
+
+def _description_from_home(home: dict) -> dict:
+    if not home:
+        return {}
+    return {k:v for k, v in home['description'].items() if v}
+
+
+def get_listing_details_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False, fields: Optional[Sequence[str]] = None) -> Table:
+    """Get property detail information."""
+    return _listing_details_from_home(get_property_detail(transport, property_id, detail_cache, refresh), fields)
+
+
+async def aget_listing_details_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of get_listing_details_by_property_id."""
+    return _listing_details_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh), fields)
+
+
+def get_nearby_school_info_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False, fields: Optional[Sequence[str]] = None) -> Table:
+    """Get nearby school detail information."""
+    return _nearby_schools_from_home(get_property_detail(transport, property_id, detail_cache, refresh), fields)
+
+
+async def aget_nearby_school_info_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of get_nearby_school_info_by_property_id."""
+    return _nearby_schools_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh), fields)
+
+
+def get_home_details_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> Table:
     """Get details home details about 'Heating and Cooling',
                                      'Exterior and Lot Features',
                                      'Land Info',
@@ -53,140 +121,307 @@ def get_home_details_by_property_id(api_key: Dict[str, str], property_id:str) ->
                                      'Other Property Info',
                                      'Building and Construction',
                                      'Utilities'."""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
-    querystring = {"property_id":property_id}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    home_details_df = pd.DataFrame()
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return home_details_df
-    
-    home_details_df = pd.json_normalize(response.json()['data']['home']['details'])
-    return home_details_df
-
-
-def get_property_address_by_property_id(api_key: Dict[str, str], property_id:str) -> dict:
+    return _home_details_from_home(get_property_detail(transport, property_id, detail_cache, refresh))
+
+
+async def aget_home_details_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> Table:
+    """Async counterpart of get_home_details_by_property_id."""
+    return _home_details_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh))
+
+
+def get_property_address_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
     """Get property address street, city, and postal code information."""
+    return _address_from_home(get_property_detail(transport, property_id, detail_cache, refresh))
 
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
-    querystring = {"property_id":property_id}
-    headers = {
-        "X-RapidAPI-Key": REALTOR_API_KEY,
-        "X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    address_dict = {}
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return address_dict
-    
-    address_dict = response.json()['data']['home']['location']['address']
-
-    return address_dict
-
-def get_property_history_by_property_id(api_key: Dict[str, str], property_id:str) -> dict:
+
+async def aget_property_address_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
+    """Async counterpart of get_property_address_by_property_id."""
+    return _address_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh))
+
+
+def get_property_history_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
     """Get property buy/sell history, including 'date', 'event_name', and 'price'."""
+    return _history_from_home(get_property_detail(transport, property_id, detail_cache, refresh))
 
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
-    querystring = {"property_id":property_id}
-    headers = {
-        "X-RapidAPI-Key": REALTOR_API_KEY,
-        "X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    property_history_dict = {}
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return address_dict
-    
-    property_history_dict = {k:v for k, v in response.json()['data']['home']['property_history'][0].items() if k != 'listing'}
 
-    return property_history_dict
+async def aget_property_history_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
+    """Async counterpart of get_property_history_by_property_id."""
+    return _history_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh))
 
 
-def get_listing_description_by_property_id(api_key: Dict[str, str], property_id:str) -> dict:
+def get_listing_description_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
     """Get property listing description, including 'baths', 'baths_min', 'baths_max', 'heating', 'cooling', 'beds', 'beds_min', 'beds_max', 'garage', 'garage_min', 'garage_max', 'pool', 'sqft', 'sqft_min', 'sqft_max', 'styles', 'lot_sqft', 'units', 'stories', 'type', 'sub_type', 'listing description', 'year_built', 'name'."""
+    return _description_from_home(get_property_detail(transport, property_id, detail_cache, refresh))
 
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/detail"
-    querystring = {"property_id":property_id}
-    headers = {
-        "X-RapidAPI-Key": REALTOR_API_KEY,
-        "X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    property_listing_desc_dict = {}
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
-        return address_dict
-    
-    property_listing_desc_dict = {k:v for k, v in response.json()['data']['home']['description'].items() if v if not None}
-
-    return property_listing_desc_dict
-
-def get_listing_photos_by_property_id(api_key: Dict[str, str], property_id:str) -> list:
-    """Get photos of a property."""
 
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/get-photos"
-    querystring = {"property_id":property_id}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
+async def aget_listing_description_by_property_id(transport: RealtorTransport, property_id:str, detail_cache: Optional[TTLCache] = None, refresh: bool = False) -> dict:
+    """Async counterpart of get_listing_description_by_property_id."""
+    return _description_from_home(await aget_property_detail(transport, property_id, detail_cache, refresh))
+
+
+def _listing_details_from_outcomes(outcomes: Dict[str, dict], fields: Optional[Sequence[str]] = None) -> Table:
+    """Stack per-property detail documents into one table with a status row for every id."""
+    rows = []
+    with table_kind("rows"):
+        for property_id, outcome in outcomes.items():
+            if outcome['status'] == 'ok':
+                projected = project([outcome['result']], fields, DETAIL_FIELDS)[0]
+            else:
+                projected = {'error': outcome.get('error')}
+            # the outcome status replaces the listing status of the detail document
+            row = {'property_id': property_id, 'status': outcome['status']}
+            row.update((k, v) for k, v in projected.items() if k not in row)
+            rows.append(row)
+    columns = list(dict.fromkeys(key for row in rows for key in row)) or ['property_id', 'status']
+    return table_from_records(rows, columns)
+
+
+def _project_outcomes(outcomes: Dict[str, dict], projection) -> Dict[str, dict]:
+    """Apply a detail projection to every successful outcome, keyed by property id."""
+    projected = {}
+    for property_id, outcome in outcomes.items():
+        if outcome['status'] == 'ok':
+            projected[property_id] = {'status': 'ok', 'result': projection(outcome['result'])}
+        else:
+            projected[property_id] = outcome
+    return projected
+
+
+def get_listing_details_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8, fields: Optional[Sequence[str]] = None) -> Table:
+    """Get property detail information for many properties at once, fetched concurrently."""
+    fetch = partial(get_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _listing_details_from_outcomes(fan_out(fetch, property_ids, max_concurrency), fields)
+
+
+async def aget_listing_details_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of get_listing_details_by_property_ids."""
+    fetch = partial(aget_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _listing_details_from_outcomes(await afan_out(fetch, property_ids, max_concurrency), fields)
+
+
+def get_property_addresses_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8) -> Dict[str, dict]:
+    """Get addresses for many properties at once, keyed by property id with a per-id status."""
+    fetch = partial(get_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _project_outcomes(fan_out(fetch, property_ids, max_concurrency), _address_from_home)
+
+
+async def aget_property_addresses_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8) -> Dict[str, dict]:
+    """Async counterpart of get_property_addresses_by_property_ids."""
+    fetch = partial(aget_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _project_outcomes(await afan_out(fetch, property_ids, max_concurrency), _address_from_home)
+
+
+def get_listing_descriptions_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8) -> Dict[str, dict]:
+    """Get listing descriptions for many properties at once, keyed by property id with a per-id status."""
+    fetch = partial(get_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _project_outcomes(fan_out(fetch, property_ids, max_concurrency), _description_from_home)
+
+
+async def aget_listing_descriptions_by_property_ids(transport: RealtorTransport, property_ids: List[str], detail_cache: Optional[TTLCache] = None, refresh: bool = False, max_concurrency: int = 8) -> Dict[str, dict]:
+    """Async counterpart of get_listing_descriptions_by_property_ids."""
+    fetch = partial(aget_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _project_outcomes(await afan_out(fetch, property_ids, max_concurrency), _description_from_home)
+
+
+def _photos_from_response(response_json: Optional[dict]) -> list:
     listing_photos = []
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
+    if response_json is None:
         return listing_photos
-    
-    listing_photos = [photo['href'] for photo in response.json()['data']['home_search']['results'][0]['photos']]
-    
+
+    listing_photos = [photo['href'] for photo in response_json['data']['home_search']['results'][0]['photos']]
+
     return listing_photos
 
 
-def get_listing_surroundings_detail_by_property_id(api_key: Dict[str, str], property_id:str) -> pd.DataFrame:
-    """Get surroundings data around a property"""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/get-surroundings"
+def get_property_media(transport: RealtorTransport, path: str, property_id: str, cache: Optional[TTLCache] = None, cache_name: str = "media") -> Optional[dict]:
+    """Fetch the photos or surroundings response of a property, through cache when one is given."""
+    if cache is not None:
+        response_json = cache.get(property_id)
+        if response_json is not None:
+            record_cache_hit(cache_name)
+            return response_json
     querystring = {"property_id":property_id}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    listing_surroundings_detail_df = pd.DataFrame()
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
+    response_json = transport.get_json(path, params=querystring)
+    if cache is not None and response_json is not None:
+        cache.set(property_id, response_json)
+    return response_json
+
+
+async def aget_property_media(transport: RealtorTransport, path: str, property_id: str, cache: Optional[TTLCache] = None, cache_name: str = "media") -> Optional[dict]:
+    """Async counterpart of get_property_media."""
+    if cache is not None:
+        response_json = cache.get(property_id)
+        if response_json is not None:
+            record_cache_hit(cache_name)
+            return response_json
+    querystring = {"property_id":property_id}
+    response_json = await transport.aget_json(path, params=querystring)
+    if cache is not None and response_json is not None:
+        cache.set(property_id, response_json)
+    return response_json
+
+
+def get_listing_photos_by_property_id(transport: RealtorTransport, property_id:str, photos_cache: Optional[TTLCache] = None) -> list:
+    """Get photos of a property."""
+
+    return _photos_from_response(get_property_media(transport, PHOTOS_PATH, property_id, photos_cache, "photos"))
+
+
+async def aget_listing_photos_by_property_id(transport: RealtorTransport, property_id:str, photos_cache: Optional[TTLCache] = None) -> list:
+    """Async counterpart of get_listing_photos_by_property_id."""
+
+    return _photos_from_response(await aget_property_media(transport, PHOTOS_PATH, property_id, photos_cache, "photos"))
+
+
+def _surroundings_from_response(response_json: Optional[dict]) -> Table:
+    listing_surroundings_detail_df = empty_table()
+    if response_json is None:
         return listing_surroundings_detail_df
-    
-    listing_surroundings_detail_df = pd.json_normalize(response.json()['data']['home']['local']['noise']['noise_categories'])
-    
+
+    listing_surroundings_detail_df = project(response_json['data']['home']['local']['noise']['noise_categories'], None, SURROUNDINGS_FIELDS)
+
     return listing_surroundings_detail_df
 
 
-def get_drive_commute_time_from_listing(api_key: Dict[str, str], property_id:str, destination_address:str) -> str:
-    """Get commute time to travel to a location."""
+def get_listing_surroundings_detail_by_property_id(transport: RealtorTransport, property_id:str, surroundings_cache: Optional[TTLCache] = None) -> Table:
+    """Get surroundings data around a property"""
 
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/get-commute-time"
-    querystring = {"destination_address":destination_address,"property_id":property_id,"transportation_type":"driving"}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
+    return _surroundings_from_response(get_property_media(transport, SURROUNDINGS_PATH, property_id, surroundings_cache, "surroundings"))
+
+
+async def aget_listing_surroundings_detail_by_property_id(transport: RealtorTransport, property_id:str, surroundings_cache: Optional[TTLCache] = None) -> Table:
+    """Async counterpart of get_listing_surroundings_detail_by_property_id."""
+
+    return _surroundings_from_response(await aget_property_media(transport, SURROUNDINGS_PATH, property_id, surroundings_cache, "surroundings"))
+
+
+def _commute_time_from_response(response_json: Optional[dict]) -> str:
+    if response_json is None:
         return 'commute time unknown'
-    
-    commute_time = response.json()['data']['home']['commute_time']['duration']['text']
-    
+
+    commute_time = response_json['data']['home']['commute_time']['duration']['text']
+
     return commute_time
 
 
+def get_drive_commute_time_from_listing(transport: RealtorTransport, property_id:str, destination_address:str) -> str:
+    """Get commute time to travel to a location."""
+
+    querystring = {"destination_address":destination_address,"property_id":property_id,"transportation_type":"driving"}
+    return _commute_time_from_response(transport.get_json(COMMUTE_TIME_PATH, params=querystring))
+
+
+async def aget_drive_commute_time_from_listing(transport: RealtorTransport, property_id:str, destination_address:str) -> str:
+    """Async counterpart of get_drive_commute_time_from_listing."""
+
+    querystring = {"destination_address":destination_address,"property_id":property_id,"transportation_type":"driving"}
+    return _commute_time_from_response(await transport.aget_json(COMMUTE_TIME_PATH, params=querystring))
+
+
+COMMUTE_MATRIX_COLUMNS = ["property_id", "destination_address", "duration_minutes", "distance_miles", "status"]
+METERS_PER_MILE = 1609.344
+
+
+def _commute_from_response(response_json: Optional[dict]) -> Tuple[Optional[float], Optional[float]]:
+    """Return the commute (duration in seconds, distance in meters), either of which may be unknown."""
+    if response_json is None:
+        return None, None
+    commute_time = ((response_json['data']['home'] or {}).get('commute_time')) or {}
+    duration = (commute_time.get('duration') or {}).get('value')
+    distance = (commute_time.get('distance') or {}).get('value')
+    return duration, distance
+
+
+def _commute_querystring(property_id: str, destination: str, mode: str) -> dict:
+    return {"destination_address":destination,"property_id":property_id,"transportation_type":mode}
+
+
+def _commute_destination_key(destination: str) -> str:
+    return canonicalize_address(destination) or destination
+
+
+def _commute_pairs(property_ids: List[str], destination_addresses: List[str]) -> Tuple[List[Tuple[str, str]], Dict[str, str]]:
+    """Distinct (property id, destination) pairs, and each destination's canonical form.
+
+    Spelling variants of one address share a canonical form, so they share a request and a cache entry;
+    the request carries the first spelling the caller gave, not the canonical form.
+    """
+    canonical = {destination: _commute_destination_key(destination) for destination in destination_addresses}
+    pairs = {}
+    for property_id in property_ids:
+        for destination in destination_addresses:
+            pairs.setdefault((str(property_id), canonical[destination]), (str(property_id), destination))
+    return list(pairs.values()), canonical
+
+
+def _commute_matrix(
+    property_ids: List[str],
+    destination_addresses: List[str],
+    canonical: Dict[str, str],
+    pairs: List[Tuple[str, str]],
+    outcomes: Dict[str, dict]
+) -> Table:
+    by_pair = {(property_id, canonical[destination]): outcomes[str(i)] for i, (property_id, destination) in enumerate(pairs)}
+    rows = []
+    for property_id in dict.fromkeys(str(p) for p in property_ids):
+        for destination in dict.fromkeys(destination_addresses):
+            outcome = by_pair[(property_id, canonical[destination])]
+            duration, distance = outcome.get("result") or (None, None)
+            status = outcome["status"] if outcome["status"] == "error" or (duration is not None or distance is not None) else "not_found"
+            rows.append((
+                property_id, destination,
+                round(duration / 60.0, 1) if duration is not None else None,
+                round(distance / METERS_PER_MILE, 2) if distance is not None else None,
+                status,
+            ))
+    return table_from_records([dict(zip(COMMUTE_MATRIX_COLUMNS, row)) for row in rows], COMMUTE_MATRIX_COLUMNS)
+
+
+def get_commute_time(transport: RealtorTransport, property_id: str, destination: str, mode: str = "driving", commute_cache: Optional[TTLCache] = None) -> Tuple[Optional[float], Optional[float]]:
+    """Get the (seconds, meters) commute from a property to a destination, cached under the destination's canonical form."""
+
+    key = (property_id, _commute_destination_key(destination), mode)
+    if commute_cache is not None:
+        commute = commute_cache.get(key)
+        if commute is not None:
+            record_cache_hit("commute")
+            return commute
+
+    commute = _commute_from_response(transport.get_json(COMMUTE_TIME_PATH, params=_commute_querystring(property_id, destination, mode)))
+    if commute_cache is not None and commute != (None, None):
+        commute_cache.set(key, commute)
+
+    return commute
+
+
+async def aget_commute_time(transport: RealtorTransport, property_id: str, destination: str, mode: str = "driving", commute_cache: Optional[TTLCache] = None) -> Tuple[Optional[float], Optional[float]]:
+    """Async counterpart of get_commute_time."""
+
+    key = (property_id, _commute_destination_key(destination), mode)
+    if commute_cache is not None:
+        commute = commute_cache.get(key)
+        if commute is not None:
+            record_cache_hit("commute")
+            return commute
+
+    commute = _commute_from_response(await transport.aget_json(COMMUTE_TIME_PATH, params=_commute_querystring(property_id, destination, mode)))
+    if commute_cache is not None and commute != (None, None):
+        commute_cache.set(key, commute)
+
+    return commute
+
+
+def get_commute_time_matrix(transport: RealtorTransport, property_ids: List[str], destination_addresses: List[str], mode: str = "driving", commute_cache: Optional[TTLCache] = None, max_concurrency: int = 8) -> Table:
+    """Get one row per (property, destination) with the commute in minutes and miles, fetching distinct pairs concurrently."""
+
+    pairs, canonical = _commute_pairs(property_ids, destination_addresses)
+    outcomes = fan_out(lambda i: get_commute_time(transport, *pairs[int(i)], mode, commute_cache), [str(i) for i in range(len(pairs))], max_concurrency)
+    return _commute_matrix(property_ids, destination_addresses, canonical, pairs, outcomes)
+
 
+async def aget_commute_time_matrix(transport: RealtorTransport, property_ids: List[str], destination_addresses: List[str], mode: str = "driving", commute_cache: Optional[TTLCache] = None, max_concurrency: int = 8) -> Table:
+    """Async counterpart of get_commute_time_matrix."""
 
+    pairs, canonical = _commute_pairs(property_ids, destination_addresses)
+    outcomes = await afan_out(lambda i: aget_commute_time(transport, *pairs[int(i)], mode, commute_cache), [str(i) for i in range(len(pairs))], max_concurrency)
+    return _commute_matrix(property_ids, destination_addresses, canonical, pairs, outcomes)
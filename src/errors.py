@@ -0,0 +1,40 @@
+from typing import Optional
+
+
+class APIError(Exception):
+    """Raised when an HTTP API endpoint is still failing after every retry."""
+
+    service = "HTTP"
+
+    def __init__(self, path: str, status_code: Optional[int] = None, reason: str = ""):
+        self.path = path
+        self.status_code = status_code
+        self.reason = reason
+        detail = f"HTTP {status_code}" if status_code is not None else reason
+        if status_code is not None and reason:
+            detail = f"{detail} {reason}"
+        super().__init__(f"{self.service} API request to {path} failed: {detail}")
+
+
+class RealtorAPIError(APIError):
+    """Raised when a Realtor endpoint is still failing after every retry."""
+
+    service = "Realtor"
+
+
+class FredAPIError(APIError):
+    """Raised when a FRED endpoint is still failing after every retry."""
+
+    service = "FRED"
+
+
+class RateLimitError(APIError):
+    """Raised when a request could not get a rate-limit token in time or the monthly quota is spent."""
+
+
+class DeadlineExceededError(APIError):
+    """Raised when a tool call's deadline leaves no time to send, wait for or retry a request."""
+
+
+class CircuitOpenError(APIError):
+    """Raised without sending a request while an endpoint's circuit breaker is open."""
@@ -0,0 +1,273 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .cache import TTLCache
+from .fred_store import DAY, FRED_BASE_URL, HOUR, SEARCH_PATH, FredTransport, SeriesStore
+from .governor import RateGovernor
+from .instrumentation import Instrumentation, instrumented, record_cache_hit
+from .projection import FRED_SERIES_FIELDS, OUTPUT_FORMATS, Table, empty_table, project, render, table
+from .resilience import CircuitBreaker
+from .response_cache import ResponseCache
+from llama_index.core.tools.tool_spec.base import BaseToolSpec
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+SERIES_COLUMNS = ("date", "value", "change", "percent_change")
+
+
+def _series_id(series_id: str) -> str:
+    return str(series_id).strip().upper()
+
+
+def _note_sync(result: Dict[str, Any]) -> None:
+    if result["mode"] is None:
+        record_cache_hit("fred_store")
+
+
+def _rounded(values: np.ndarray, digits: int) -> List[Optional[float]]:
+    return [None if v != v else round(float(v), digits) for v in values]
+
+
+def _series_table(dates: List[str], values: List[Optional[float]], limit: Optional[int]) -> Table:
+    """Tabulate observations with the change and percent change from the previous observation.
+
+    Changes are computed over the whole range before the last limit rows are kept, so the first
+    row shown still has its change from the observation before it.
+    """
+    if not dates:
+        return empty_table(SERIES_COLUMNS)
+    current = np.array([np.nan if v is None else v for v in values], dtype=float)
+    previous = np.concatenate([[np.nan], current[:-1]])
+    change = current - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_change = np.where(previous != 0, change / previous * 100, np.nan)
+    rows = slice(-limit if limit else None, None)
+    return table({
+        "date": dates[rows],
+        "value": values[rows],
+        "change": _rounded(change[rows], 6),
+        "percent_change": _rounded(percent_change[rows], 3),
+    })
+
+
+def _series_change(series_id: str, dates: List[str], values: List[Optional[float]], metadata: Optional[dict]) -> Dict[str, Any]:
+    """Change between the first and last observation with a value, or {} when there is none."""
+    points = [(day, value) for day, value in zip(dates, values) if value is not None]
+    if not points:
+        return {}
+    (start_date, start_value), (end_date, end_value) = points[0], points[-1]
+    change = end_value - start_value
+    metadata = metadata or {}
+    return {
+        "series_id": series_id,
+        "title": metadata.get("title"),
+        "units": metadata.get("units"),
+        "start_date": start_date,
+        "start_value": start_value,
+        "end_date": end_date,
+        "end_value": end_value,
+        "change": round(change, 6),
+        "percent_change": round(change / start_value * 100, 3) if start_value else None,
+        "direction": "increased" if change > 0 else "decreased" if change < 0 else "unchanged",
+    }
+
+
+def get_series(
+    store: SeriesStore,
+    transport: FredTransport,
+    series_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = 10,
+    refresh: bool = False
+) -> Table:
+    """Bring a series up to date in the store, then return its observations between the dates."""
+    series_id = _series_id(series_id)
+    _note_sync(store.refresh(transport, series_id, refresh))
+    return _series_table(*store.observations(series_id, start_date, end_date), limit)
+
+
+async def aget_series(
+    store: SeriesStore,
+    transport: FredTransport,
+    series_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: Optional[int] = 10,
+    refresh: bool = False
+) -> Table:
+    """Async counterpart of get_series."""
+    series_id = _series_id(series_id)
+    _note_sync(await store.arefresh(transport, series_id, refresh))
+    return _series_table(*store.observations(series_id, start_date, end_date), limit)
+
+
+def get_series_change(store: SeriesStore, transport: FredTransport, series_id: str, start_date: str, end_date: str, refresh: bool = False) -> Dict[str, Any]:
+    """Bring a series up to date in the store, then compare its first and last observations between the dates."""
+    series_id = _series_id(series_id)
+    _note_sync(store.refresh(transport, series_id, refresh))
+    return _series_change(series_id, *store.observations(series_id, start_date, end_date), store.series(series_id))
+
+
+async def aget_series_change(store: SeriesStore, transport: FredTransport, series_id: str, start_date: str, end_date: str, refresh: bool = False) -> Dict[str, Any]:
+    """Async counterpart of get_series_change."""
+    series_id = _series_id(series_id)
+    _note_sync(await store.arefresh(transport, series_id, refresh))
+    return _series_change(series_id, *store.observations(series_id, start_date, end_date), store.series(series_id))
+
+
+def _search_key(search_text: str, limit: int) -> Tuple[str, int]:
+    return " ".join(str(search_text).lower().split()), int(limit)
+
+
+def search_series(transport: FredTransport, search_text: str, limit: int = 10, search_cache: Optional[TTLCache] = None, fields: Optional[Sequence[str]] = None) -> Table:
+    """Search FRED for series matching the text, most relevant first, memoized in search_cache."""
+    key = _search_key(search_text, limit)
+    records = search_cache.get(key) if search_cache is not None else None
+    if records is not None:
+        record_cache_hit("fred_search")
+    else:
+        response_json = transport.get_json(SEARCH_PATH, params={"search_text": key[0], "limit": key[1]})
+        records = (response_json or {}).get("seriess") or []
+        if search_cache is not None and response_json is not None:
+            search_cache.set(key, records)
+    return project(records, fields, FRED_SERIES_FIELDS)
+
+
+async def asearch_series(transport: FredTransport, search_text: str, limit: int = 10, search_cache: Optional[TTLCache] = None, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of search_series."""
+    key = _search_key(search_text, limit)
+    records = search_cache.get(key) if search_cache is not None else None
+    if records is not None:
+        record_cache_hit("fred_search")
+    else:
+        response_json = await transport.aget_json(SEARCH_PATH, params={"search_text": key[0], "limit": key[1]})
+        records = (response_json or {}).get("seriess") or []
+        if search_cache is not None and response_json is not None:
+            search_cache.set(key, records)
+    return project(records, fields, FRED_SERIES_FIELDS)
+
+
+class FredToolSpec(BaseToolSpec):
+    """Economic data from FRED, answered from a local series store that is synced incrementally.
+
+    A series is downloaded in full once and then only its newer observations are fetched, at most
+    every series_max_age seconds, so date ranges and changes are computed locally. Search results
+    are memoized for search_cache_ttl seconds.
+    """
+
+    spec_functions = [
+        ("search_fred_series", "asearch_fred_series"),
+        ("get_fred_series", "aget_fred_series"),
+        ("get_fred_series_change", "aget_fred_series_change")
+    ]
+
+    def __init__(
+        self,
+        fred_api_key: str,
+        store_path: str = ":memory:",
+        series_max_age: float = 6 * HOUR,
+        series_full_refresh_age: float = 7 * DAY,
+        search_cache_size: int = 256,
+        search_cache_ttl: float = DAY,
+        pool_size: int = 4,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 20.0,
+        max_retries: int = 3,
+        cache_path: Optional[str] = None,
+        base_url: str = FRED_BASE_URL,
+        rate_limit: float = 2.0,
+        rate_burst: int = 10,
+        instrumentation: Optional[Instrumentation] = None,
+        output_format: str = "dataframe",
+        output_budget: int = 6000,
+        call_deadline: Optional[float] = 30.0
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {OUTPUT_FORMATS}, got {output_format!r}")
+        self._output_format = output_format
+        self._table_kind = "dataframe" if output_format == "dataframe" else "rows"
+        self._output_budget = output_budget
+        self._instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._call_deadline = call_deadline
+        self._transport = FredTransport(
+            fred_api_key,
+            base_url=base_url,
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            max_retries=max_retries,
+            response_cache=ResponseCache(cache_path) if cache_path is not None else None,
+            governor=RateGovernor(rate=rate_limit, burst=rate_burst),
+            instrumentation=self._instrumentation,
+            circuit_breaker=CircuitBreaker()
+        )
+        self._store = SeriesStore(store_path, max_age=series_max_age, full_refresh_age=series_full_refresh_age)
+        self._store.watch(self._transport)
+        self._search_cache = TTLCache(maxsize=search_cache_size, ttl=search_cache_ttl)
+
+    async def aclose(self) -> None:
+        """Closes the pooled connections of the async HTTP client."""
+        await self._transport.aclose()
+
+    def series_store_stats(self) -> Dict[str, int]:
+        """Returns the number of stored observations and of series synced into the local series store."""
+        return self._store.stats()
+
+    def search_cache_stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and occupancy of the memoized series search results."""
+        return self._search_cache.stats()
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """Per-tool and per-endpoint timings, payload sizes, cache hits and error counters."""
+        return self._instrumentation
+
+    def metrics_text(self) -> str:
+        """Returns the instrumentation counters in the Prometheus text exposition format, prefixed 'fred'."""
+        return self._instrumentation.prometheus_text(prefix="fred")
+
+    def _output(self, result: Any) -> Any:
+        """Render a tool result in the spec's output_format: as is, compact text, plain Python or an Arrow table."""
+        return render(result, self._output_format, self._output_budget)
+
+    @instrumented
+    def search_fred_series(self, search_text: str, limit: int = 10) -> Union["pd.DataFrame", str]:
+        """Given a description of economic data such as 'us 10 year treasury rate', returns a dataframe of
+        matching FRED series, most relevant first, with their id, title, frequency, units and date range.
+        Pass a series id to get_fred_series or get_fred_series_change."""
+        return self._output(search_series(self._transport, search_text, limit, self._search_cache))
+
+    @instrumented
+    async def asearch_fred_series(self, search_text: str, limit: int = 10) -> Union["pd.DataFrame", str]:
+        """Async counterpart of search_fred_series."""
+        return self._output(await asearch_series(self._transport, search_text, limit, self._search_cache))
+
+    @instrumented
+    def get_fred_series(self, series_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: Optional[int] = 10, refresh: bool = False) -> Union["pd.DataFrame", str]:
+        """Given a FRED series id such as 'GDP' or 'DGS10', returns a dataframe of its observations with the
+        'change' and 'percent_change' from the previous observation, oldest first. start_date and end_date
+        ('YYYY-MM-DD', inclusive) select a date range; limit keeps the latest rows of it (None keeps all).
+        Set refresh to True to download the whole series again."""
+        return self._output(get_series(self._store, self._transport, series_id, start_date, end_date, limit, refresh))
+
+    @instrumented
+    async def aget_fred_series(self, series_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None, limit: Optional[int] = 10, refresh: bool = False) -> Union["pd.DataFrame", str]:
+        """Async counterpart of get_fred_series."""
+        return self._output(await aget_series(self._store, self._transport, series_id, start_date, end_date, limit, refresh))
+
+    @instrumented
+    def get_fred_series_change(self, series_id: str, start_date: str, end_date: str, refresh: bool = False) -> Union[dict, str]:
+        """Given a FRED series id and a date range ('YYYY-MM-DD', inclusive), returns a dictionary of how the
+        series changed, as 'key: value' lines with the compact output formats: its first and last values in the
+        range, the change, the percent change and whether it 'increased', 'decreased' or was 'unchanged'.
+        Returns nothing when the range has no observations."""
+        return self._output(get_series_change(self._store, self._transport, series_id, start_date, end_date, refresh))
+
+    @instrumented
+    async def aget_fred_series_change(self, series_id: str, start_date: str, end_date: str, refresh: bool = False) -> Union[dict, str]:
+        """Async counterpart of get_fred_series_change."""
+        return self._output(await aget_series_change(self._store, self._transport, series_id, start_date, end_date, refresh))
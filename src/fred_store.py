@@ -0,0 +1,276 @@
+import os
+import sqlite3
+import threading
+import time
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .errors import FredAPIError
+from .transport import HTTPTransport
+
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+FRED_BASE_URL = "https://api.stlouisfed.org"
+SERIES_PATH = "/fred/series"
+OBSERVATIONS_PATH = "/fred/series/observations"
+SEARCH_PATH = "/fred/series/search"
+
+# FRED's largest observations page
+MAX_PAGE_SIZE = 100000
+
+# stored metadata column -> field of a FRED series record
+SERIES_COLUMNS = {
+    "series_id": "id",
+    "title": "title",
+    "frequency": "frequency_short",
+    "units": "units_short",
+    "seasonal_adjustment": "seasonal_adjustment_short",
+    "observation_start": "observation_start",
+    "observation_end": "observation_end",
+    "last_updated": "last_updated",
+    "popularity": "popularity",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fred_series (
+    series_id TEXT PRIMARY KEY,
+    title TEXT,
+    frequency TEXT,
+    units TEXT,
+    seasonal_adjustment TEXT,
+    observation_start TEXT,
+    observation_end TEXT,
+    last_updated TEXT,
+    popularity INTEGER
+);
+CREATE TABLE IF NOT EXISTS fred_observations (
+    series_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (series_id, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fred_series_syncs (
+    series_id TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    full_synced_at REAL NOT NULL,
+    newest_date TEXT
+);
+"""
+
+
+def _value(text: Any) -> Optional[float]:
+    """FRED sends observation values as strings, with '.' for a missing value."""
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _observations_from_response(response_json: Optional[dict]) -> Tuple[List[Tuple[str, Optional[float]]], int]:
+    """Return the (date, value) pairs of an observations page and the total observation count."""
+    if response_json is None:
+        return [], 0
+    observations = [(o["date"], _value(o.get("value"))) for o in response_json.get("observations") or [] if o.get("date")]
+    return observations, int(response_json.get("count") or 0)
+
+
+def _series_from_response(response_json: Optional[dict]) -> List[dict]:
+    if response_json is None:
+        return []
+    return response_json.get("seriess") or []
+
+
+def _day_after(iso_date: str) -> str:
+    return (date.fromisoformat(iso_date) + timedelta(days=1)).isoformat()
+
+
+class FredTransport(HTTPTransport):
+    """HTTPTransport for the FRED API; failures raise FredAPIError.
+
+    FRED takes the key as a query parameter; default_params keep it out of the cache keys, so keys can be rotated.
+    """
+
+    error_class = FredAPIError
+
+    def __init__(self, api_key: str, base_url: str = FRED_BASE_URL, **kwargs: Any):
+        kwargs.setdefault("default_params", {"api_key": api_key, "file_type": "json"})
+        super().__init__(base_url, **kwargs)
+
+
+class SeriesStore:
+    """Local SQLite store of FRED series observations and metadata, synced incrementally.
+
+    refresh fetches a series in full the first time and once full_synced_at is older than
+    full_refresh_age, replacing what was stored so that revised values are picked up. In between,
+    once synced_at is older than max_age, only observations dated after the newest stored one are
+    fetched. Series metadata is upserted from every series and search response seen by a watched
+    transport. One connection is shared behind a lock; path=':memory:' keeps the store in process memory.
+    """
+
+    def __init__(self, path: str = ":memory:", max_age: float = 6 * HOUR, full_refresh_age: float = 7 * DAY, page_size: int = MAX_PAGE_SIZE):
+        self.path = path
+        self.max_age = max_age
+        self.full_refresh_age = full_refresh_age
+        self.page_size = min(page_size, MAX_PAGE_SIZE)
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._watched: Set[int] = set()
+        self._insert_series = (
+            f"INSERT OR REPLACE INTO fred_series ({', '.join(SERIES_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in SERIES_COLUMNS)})"
+        )
+
+    def add_series(self, records: Iterable[dict]) -> int:
+        """Upsert series metadata records from a series or search response. Returns the number written."""
+        rows = [tuple(record.get(field) for field in SERIES_COLUMNS.values()) for record in records or [] if record and record.get("id")]
+        if rows:
+            with self._lock:
+                self._connection.executemany(self._insert_series, rows)
+        return len(rows)
+
+    def watch(self, transport: FredTransport) -> None:
+        """Upsert the metadata of every series that passes through transport's series and search endpoints."""
+        if id(transport) in self._watched:
+            return
+        self._watched.add(id(transport))
+        for path in (SERIES_PATH, SEARCH_PATH):
+            transport.add_response_listener(path, lambda response_json: self.add_series(_series_from_response(response_json)))
+
+    def series(self, series_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored metadata of a series, or None if it has not been seen."""
+        with self._lock:
+            row = self._connection.execute(f"SELECT {', '.join(SERIES_COLUMNS)} FROM fred_series WHERE series_id = ?", (series_id,)).fetchone()
+        return dict(zip(SERIES_COLUMNS, row)) if row is not None else None
+
+    def refresh_mode(self, series_id: str) -> Optional[str]:
+        """Return 'full', 'incremental' or None when the series is fresh enough to read."""
+        state = self._sync_state(series_id)
+        now = time.time()
+        if state is None or now - state[1] >= self.full_refresh_age:
+            return "full"
+        if now - state[0] >= self.max_age:
+            return "incremental"
+        return None
+
+    def _sync_state(self, series_id: str) -> Optional[Tuple[float, float, Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT synced_at, full_synced_at, newest_date FROM fred_series_syncs WHERE series_id = ?", (series_id,)
+            ).fetchone()
+
+    def _plan(self, series_id: str, refresh: bool) -> Tuple[Optional[str], Optional[str]]:
+        """Return the sync mode and the first observation date to fetch."""
+        mode = "full" if refresh else self.refresh_mode(series_id)
+        if mode != "incremental":
+            return mode, None
+        newest = self._sync_state(series_id)[2]
+        return mode, _day_after(newest) if newest else None
+
+    def _params(self, series_id: str, start: Optional[str], offset: int) -> Dict[str, Any]:
+        params = {"series_id": series_id, "sort_order": "asc", "limit": self.page_size, "offset": offset}
+        if start is not None:
+            params["observation_start"] = start
+        return params
+
+    def _finish_sync(self, series_id: str, mode: str, started: float, observations: List[Tuple[str, Optional[float]]]) -> int:
+        """Write the fetched observations and record the sync; a full sync replaces the stored series."""
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                if mode == "full":
+                    self._connection.execute("DELETE FROM fred_observations WHERE series_id = ?", (series_id,))
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO fred_observations (series_id, date, value) VALUES (?, ?, ?)",
+                    [(series_id, day, value) for day, value in observations]
+                )
+                previous = self._connection.execute("SELECT full_synced_at FROM fred_series_syncs WHERE series_id = ?", (series_id,)).fetchone()
+                newest = self._connection.execute("SELECT MAX(date) FROM fred_observations WHERE series_id = ?", (series_id,)).fetchone()[0]
+                full_synced_at = started if mode == "full" or previous is None else previous[0]
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO fred_series_syncs (series_id, synced_at, full_synced_at, newest_date) VALUES (?, ?, ?, ?)",
+                    (series_id, started, full_synced_at, newest)
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return len(observations)
+
+    def refresh(self, transport: FredTransport, series_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """Bring one series up to date, or fetch it in full with refresh=True.
+
+        Returns the sync mode (None when the series was fresh) and the number of observations
+        fetched. A series FRED does not know is left unsynced, so it is asked for again next time.
+        """
+        mode, start = self._plan(series_id, refresh)
+        if mode is None:
+            return {"mode": None, "fetched": 0}
+        started = time.time()
+        if mode == "full" and self.series(series_id) is None:
+            transport.get_json(SERIES_PATH, params={"series_id": series_id})
+        observations: List[Tuple[str, Optional[float]]] = []
+        while True:
+            # the store is the cache for observations, so the response cache is bypassed
+            response_json = transport.get_json(OBSERVATIONS_PATH, params=self._params(series_id, start, len(observations)), refresh=True)
+            if response_json is None and not observations:
+                return {"mode": mode, "fetched": 0, "found": False}
+            page, count = _observations_from_response(response_json)
+            observations.extend(page)
+            if not page or len(observations) >= count:
+                break
+        return {"mode": mode, "fetched": self._finish_sync(series_id, mode, started, observations)}
+
+    async def arefresh(self, transport: FredTransport, series_id: str, refresh: bool = False) -> Dict[str, Any]:
+        """Async counterpart of refresh."""
+        mode, start = self._plan(series_id, refresh)
+        if mode is None:
+            return {"mode": None, "fetched": 0}
+        started = time.time()
+        if mode == "full" and self.series(series_id) is None:
+            await transport.aget_json(SERIES_PATH, params={"series_id": series_id})
+        observations: List[Tuple[str, Optional[float]]] = []
+        while True:
+            response_json = await transport.aget_json(OBSERVATIONS_PATH, params=self._params(series_id, start, len(observations)), refresh=True)
+            if response_json is None and not observations:
+                return {"mode": mode, "fetched": 0, "found": False}
+            page, count = _observations_from_response(response_json)
+            observations.extend(page)
+            if not page or len(observations) >= count:
+                break
+        return {"mode": mode, "fetched": self._finish_sync(series_id, mode, started, observations)}
+
+    def observations(self, series_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple[List[str], List[Optional[float]]]:
+        """Return the dates and values of a stored series between start_date and end_date inclusive, oldest first."""
+        sql = "SELECT date, value FROM fred_observations WHERE series_id = ?"
+        params: List[Any] = [series_id]
+        if start_date:
+            sql += " AND date >= ?"
+            params.append(start_date)
+        if end_date:
+            sql += " AND date <= ?"
+            params.append(end_date)
+        with self._lock:
+            rows = self._connection.execute(sql + " ORDER BY date", params).fetchall()
+        if not rows:
+            return [], []
+        dates, values = zip(*rows)
+        return list(dates), list(values)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            observations = self._connection.execute("SELECT COUNT(*) FROM fred_observations").fetchone()[0]
+            series = self._connection.execute("SELECT COUNT(*) FROM fred_series_syncs").fetchone()[0]
+        return {"observations": observations, "synced_series": series}
+
+    def close(self) -> None:
+        self._connection.close()
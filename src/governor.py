@@ -0,0 +1,245 @@
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from .errors import RateLimitError
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("realtor_request_priority", default=INTERACTIVE)
+
+
+@contextlib.contextmanager
+def background_priority() -> Iterator[None]:
+    """Run the enclosed Realtor calls in the background lane, behind interactive agent calls."""
+    token = _priority.set(BACKGROUND)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def _month(now: float) -> str:
+    return time.strftime("%Y-%m", time.gmtime(now))
+
+
+class _LocalState:
+    """Bucket state shared by the threads of one process."""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def transact(self, fn: Callable[[Dict[str, Any]], Any]) -> Any:
+        with self._lock:
+            return fn(self._state)
+
+
+class _FileState:
+    """Bucket state kept in a small JSON file under an exclusive flock, shared by every process on a host."""
+
+    def __init__(self, path: str):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def transact(self, fn: Callable[[Dict[str, Any]], Any]) -> Any:
+        with self._lock, open(self.path, "a+") as f:
+            self._fcntl.flock(f, self._fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw else {}
+                result = fn(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                return result
+            finally:
+                self._fcntl.flock(f, self._fcntl.LOCK_UN)
+
+
+class RateGovernor:
+    """Token-bucket rate governor for every outbound Realtor call.
+
+    Each request needs a token from its endpoint bucket and from the global bucket; endpoints
+    without an entry in endpoint_limits get the global rate and burst. Background
+    requests may only spend tokens while the buckets stay above a reserved share of their burst
+    capacity, so interactive agent calls always have headroom. Callers queue for up to max_wait
+    seconds before a RateLimitError is raised. With state_path set, bucket levels and the monthly
+    counter live in a locked file shared by all worker processes on the host.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        endpoint_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+        monthly_quota: Optional[int] = None,
+        state_path: Optional[str] = None,
+        max_wait: float = 10.0,
+        background_reserve: float = 0.5,
+        background_monthly_reserve: float = 0.1
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.endpoint_limits = dict(endpoint_limits or {})
+        self.monthly_quota = monthly_quota
+        self.max_wait = max_wait
+        self.background_reserve = background_reserve
+        self.background_monthly_reserve = background_monthly_reserve
+        self._state = _FileState(state_path) if state_path else _LocalState()
+        self._stats_lock = threading.Lock()
+        self.granted = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        self.rejected = 0
+
+    def _limits(self, bucket: str) -> Tuple[float, int]:
+        if bucket == "global":
+            return self.rate, self.burst
+        return self.endpoint_limits.get(bucket, (self.rate, self.burst))
+
+    def _refill(self, state: Dict[str, Any], bucket: str, now: float) -> float:
+        rate, burst = self._limits(bucket)
+        tokens, updated = state.get(bucket, (float(burst), now))
+        tokens = min(float(burst), tokens + max(0.0, now - updated) * rate)
+        state[bucket] = (tokens, now)
+        return tokens
+
+    def _try_take(self, path: str, priority: str) -> float:
+        """Take one token from the endpoint and global buckets; return 0 on success or seconds to wait."""
+        now = time.time()
+
+        def take(state: Dict[str, Any]) -> float:
+            month = _month(now)
+            if state.get("month") != month:
+                state["month"], state["used"] = month, 0
+            if self.monthly_quota is not None:
+                floor = 0 if priority == INTERACTIVE else self.monthly_quota * self.background_monthly_reserve
+                if self.monthly_quota - state["used"] <= floor:
+                    return float("inf")
+
+            wait = 0.0
+            buckets = ("global", path)
+            for bucket in buckets:
+                rate, burst = self._limits(bucket)
+                floor = 1.0 if priority == INTERACTIVE else min(float(burst), 1.0 + burst * self.background_reserve)
+                tokens = self._refill(state, bucket, now)
+                if tokens < floor:
+                    wait = max(wait, (floor - tokens) / rate)
+            if wait:
+                return wait
+            for bucket in buckets:
+                tokens, updated = state[bucket]
+                state[bucket] = (tokens - 1.0, updated)
+            state["used"] += 1
+            return 0.0
+
+        return self._state.transact(take)
+
+    def _record(self, waited: float, granted: bool) -> None:
+        with self._stats_lock:
+            if granted:
+                self.granted += 1
+            else:
+                self.rejected += 1
+            if waited:
+                self.waited += 1
+                self.wait_seconds += waited
+
+    def acquire(self, path: str, priority: Optional[str] = None, max_wait: Optional[float] = None) -> None:
+        """Block until a token for path is available, or raise RateLimitError after max_wait.
+
+        A max_wait argument, such as the time left before a deadline, can only shorten the governor's own.
+        """
+        priority = priority or current_priority()
+        max_wait = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            wait = self._try_take(path, priority)
+            if not wait:
+                self._record(waited, True)
+                return
+            if wait == float("inf") or waited + wait > max_wait:
+                self._record(waited, False)
+                raise RateLimitError(path, reason=self._rejection_reason(wait, max_wait))
+            time.sleep(wait)
+            waited = time.monotonic() - started
+
+    async def aacquire(self, path: str, priority: Optional[str] = None, max_wait: Optional[float] = None) -> None:
+        """Async counterpart of acquire."""
+        priority = priority or current_priority()
+        max_wait = self.max_wait if max_wait is None else min(self.max_wait, max_wait)
+        started = time.monotonic()
+        waited = 0.0
+        while True:
+            wait = self._try_take(path, priority)
+            if not wait:
+                self._record(waited, True)
+                return
+            if wait == float("inf") or waited + wait > max_wait:
+                self._record(waited, False)
+                raise RateLimitError(path, reason=self._rejection_reason(wait, max_wait))
+            await asyncio.sleep(wait)
+            waited = time.monotonic() - started
+
+    def try_acquire(self, path: str, priority: Optional[str] = None) -> bool:
+        """Take a token for path only if one is available right now, for optional requests such as hedges."""
+        if self._try_take(path, priority or current_priority()):
+            return False
+        self._record(0.0, True)
+        return True
+
+    def _rejection_reason(self, wait: float, max_wait: float) -> str:
+        if wait == float("inf"):
+            return "monthly RapidAPI quota exhausted"
+        return f"no rate-limit token within {max_wait:.1f}s"
+
+    def throttled(self, path: str, retry_after: float) -> None:
+        """Drain the buckets after a 429 so every thread and process backs off for retry_after seconds."""
+        now = time.time()
+
+        def drain(state: Dict[str, Any]) -> None:
+            for bucket in ("global", path):
+                rate, _ = self._limits(bucket)
+                tokens = self._refill(state, bucket, now)
+                state[bucket] = (min(tokens, -retry_after * rate), now)
+
+        self._state.transact(drain)
+
+    def remaining(self) -> Dict[str, float]:
+        """Current token levels, monthly budget and queueing counters."""
+        now = time.time()
+
+        def read(state: Dict[str, Any]) -> Dict[str, float]:
+            metrics = {"tokens:global": self._refill(state, "global", now)}
+            for bucket in [key for key in state if key.startswith("/")]:
+                metrics[f"tokens:{bucket}"] = self._refill(state, bucket, now)
+            used = state.get("used", 0) if state.get("month") == _month(now) else 0
+            metrics["monthly_used"] = used
+            if self.monthly_quota is not None:
+                metrics["monthly_remaining"] = self.monthly_quota - used
+            return metrics
+
+        metrics = self._state.transact(read)
+        with self._stats_lock:
+            metrics.update(granted=self.granted, waited=self.waited, wait_seconds=self.wait_seconds, rejected=self.rejected)
+        return metrics
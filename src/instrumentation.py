@@ -0,0 +1,469 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .projection import Rows, is_dataframe, table_kind, with_notes
+from .resilience import deadline
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PHASES = ("wait", "network", "decode", "build")
+
+_current_call: contextvars.ContextVar = contextvars.ContextVar("realtor_tool_call", default=None)
+
+
+class ToolCall:
+    """Measurements for one spec-function call, filled in by the transport while the call runs.
+
+    wait is time spent queued on the rate governor or sleeping between retries, network is time until
+    the response body arrived, decode is JSON parsing and build is everything else, mostly DataFrame
+    construction. Requests a batch tool runs concurrently all add to wait, network and decode, so
+    those can sum to more than the wall time; build is then reported as zero. notices are caveats
+    about the result, such as stale data served while an endpoint was down, that are attached to
+    what the tool returns.
+    """
+
+    __slots__ = (
+        "tool", "arguments", "started", "seconds", "wait_seconds", "network_seconds", "decode_seconds",
+        "requests", "retries", "response_bytes", "status_codes", "cache_hits", "rows", "columns",
+        "output_chars", "error", "notices", "_lock"
+    )
+
+    def __init__(self, tool: str, arguments: Dict[str, Any]):
+        self.tool = tool
+        self.arguments = arguments
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.wait_seconds = 0.0
+        self.network_seconds = 0.0
+        self.decode_seconds = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.status_codes: Dict[str, int] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.rows: Optional[int] = None
+        self.columns: Optional[int] = None
+        self.output_chars: Optional[int] = None
+        self.error: Optional[str] = None
+        self.notices: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def build_seconds(self) -> float:
+        return max(0.0, self.seconds - self.wait_seconds - self.network_seconds - self.decode_seconds)
+
+    def add_request(self, status: str, retry: bool, wait: float, network: float, decode: float, response_bytes: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.retries += retry
+            self.wait_seconds += wait
+            self.network_seconds += network
+            self.decode_seconds += decode
+            self.response_bytes += response_bytes
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def add_cache_hit(self, cache: str) -> None:
+        with self._lock:
+            self.cache_hits[cache] = self.cache_hits.get(cache, 0) + 1
+
+    def add_notice(self, text: str) -> None:
+        with self._lock:
+            if text not in self.notices:
+                self.notices.append(text)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "seconds": self.seconds,
+            "wait_seconds": self.wait_seconds,
+            "network_seconds": self.network_seconds,
+            "decode_seconds": self.decode_seconds,
+            "build_seconds": self.build_seconds,
+            "requests": self.requests,
+            "retries": self.retries,
+            "response_bytes": self.response_bytes,
+            "status_codes": dict(self.status_codes),
+            "cache_hits": dict(self.cache_hits),
+            "rows": self.rows,
+            "columns": self.columns,
+            "output_chars": self.output_chars,
+            "error": self.error,
+            "notices": list(self.notices),
+        }
+
+
+def current_call() -> Optional[ToolCall]:
+    return _current_call.get()
+
+
+def record_cache_hit(cache: str) -> None:
+    """Count a hit in a module-level cache, such as the detail cache, against the running tool call."""
+    call = _current_call.get()
+    if call is not None:
+        call.add_cache_hit(cache)
+
+
+def record_notice(text: str) -> None:
+    """Attach a caveat about its result, such as stale data, to the running tool call."""
+    call = _current_call.get()
+    if call is not None:
+        call.add_notice(text)
+
+
+def _with_notices(result: Any, notices: List[str]) -> Any:
+    """Surface a call's notices in its result: prefixed to text, under a dict key, or printed ahead of a table or list."""
+    if not notices:
+        return result
+    if isinstance(result, str):
+        return "\n".join([f"Note: {notice}" for notice in notices] + [result])
+    if isinstance(result, dict):
+        return dict(result, notices=list(notices))
+    return with_notes(result, notices)
+
+
+def _shape(result: Any) -> Tuple[Optional[int], Optional[int]]:
+    if is_dataframe(result):
+        return result.shape
+    if isinstance(result, Rows):
+        return len(result), len(result.columns)
+    if isinstance(result, (dict, list, tuple)):
+        return len(result), None
+    return None, None
+
+
+class InstrumentationHook:
+    """Base class for instrumentation callbacks; override the events you need."""
+
+    def on_tool_start(self, call: ToolCall) -> None:
+        pass
+
+    def on_tool_end(self, call: ToolCall) -> None:
+        pass
+
+    def on_request(self, path: str, status: str, retry: bool, wait: float, network: float, decode: float, response_bytes: int) -> None:
+        pass
+
+
+class _CallableHook(InstrumentationHook):
+    def __init__(self, fn: Callable[[ToolCall], None]):
+        self.fn = fn
+
+    def on_tool_end(self, call: ToolCall) -> None:
+        self.fn(call)
+
+
+class LlamaIndexCallbackHook(InstrumentationHook):
+    """Report every tool call to a llama_index CallbackManager as a FUNCTION_CALL event.
+
+    The end event's payload carries the call's measurements under 'realtor_metrics', so handlers
+    such as LlamaDebugHandler or tracing integrations see them nested under the agent step.
+    """
+
+    def __init__(self, callback_manager):
+        from llama_index.core.callbacks import CBEventType, EventPayload
+        from llama_index.core.tools import ToolMetadata
+
+        self.callback_manager = callback_manager
+        self._event_type = CBEventType.FUNCTION_CALL
+        self._payload = EventPayload
+        self._metadata = ToolMetadata
+        self._event_ids: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def on_tool_start(self, call: ToolCall) -> None:
+        event_id = self.callback_manager.on_event_start(
+            self._event_type,
+            payload={
+                self._payload.FUNCTION_CALL: json.dumps(call.arguments, default=str),
+                self._payload.TOOL: self._metadata(name=call.tool, description=call.tool),
+            }
+        )
+        with self._lock:
+            self._event_ids[id(call)] = event_id
+
+    def on_tool_end(self, call: ToolCall) -> None:
+        with self._lock:
+            event_id = self._event_ids.pop(id(call), None)
+        payload = {"realtor_metrics": call.as_dict()}
+        if call.error is None:
+            payload[self._payload.FUNCTION_OUTPUT] = f"{call.tool} returned {call.rows} rows"
+        else:
+            payload[self._payload.EXCEPTION] = call.error
+        self.callback_manager.on_event_end(self._event_type, payload=payload, event_id=event_id)
+
+
+def _new_tool_stats() -> Dict[str, Any]:
+    return {
+        "calls": 0, "errors": 0, "seconds": 0.0, "buckets": [0] * len(LATENCY_BUCKETS),
+        "phases": dict.fromkeys(PHASES, 0.0), "requests": 0, "retries": 0, "response_bytes": 0,
+        "rows": 0, "output_samples": 0, "output_chars": 0, "cache_hits": {}, "notices": 0,
+    }
+
+
+def _new_endpoint_stats() -> Dict[str, Any]:
+    return {
+        "statuses": {}, "retries": 0, "response_bytes": 0, "cache_hits": 0, "coalesced": 0, "hedges": 0, "hedges_won": 0,
+        "phases": dict.fromkeys(PHASES[:3], 0.0),
+    }
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Instrumentation:
+    """Per-tool and per-endpoint counters, timings and payload sizes, plus a hook API.
+
+    The spec wraps every tool function in track/atrack and the transport reports every HTTP attempt
+    through record_request, so the cost per call is a few perf_counter reads and dict updates under a
+    lock. Measuring the rendered output size means calling str() on the result, which for a
+    DataFrame can cost far more than the call itself, so only a sampled fraction of calls
+    (output_sample_rate) is rendered.
+    """
+
+    def __init__(self, hooks: Optional[List[Any]] = None, output_sample_rate: float = 0.05):
+        self.output_sample_rate = output_sample_rate
+        self._hooks: List[InstrumentationHook] = []
+        self._lock = threading.Lock()
+        self._tools: Dict[str, Dict[str, Any]] = {}
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        for hook in hooks or []:
+            self.add_hook(hook)
+
+    def add_hook(self, hook: Any) -> None:
+        """Register an InstrumentationHook, or a plain callable that receives each finished ToolCall."""
+        self._hooks.append(hook if isinstance(hook, InstrumentationHook) else _CallableHook(hook))
+
+    def _emit(self, event: str, *args: Any) -> None:
+        for hook in self._hooks:
+            try:
+                getattr(hook, event)(*args)
+            except Exception:
+                logger.exception("instrumentation hook %r failed on %s", hook, event)
+
+    def _start(self, tool: str, arguments: Dict[str, Any]) -> Tuple[ToolCall, contextvars.Token]:
+        call = ToolCall(tool, arguments)
+        token = _current_call.set(call)
+        if self._hooks:
+            self._emit("on_tool_start", call)
+        return call, token
+
+    def _finish(self, call: ToolCall, token: contextvars.Token, result: Any = None, error: Optional[BaseException] = None) -> None:
+        call.seconds = time.perf_counter() - call.started
+        _current_call.reset(token)
+        if error is not None:
+            call.error = f"{type(error).__name__}: {error}"
+        else:
+            call.rows, call.columns = _shape(result)
+            if self.output_sample_rate and random.random() < self.output_sample_rate:
+                call.output_chars = len(str(result))
+
+        with self._lock:
+            stats = self._tools.get(call.tool)
+            if stats is None:
+                stats = self._tools[call.tool] = _new_tool_stats()
+            stats["calls"] += 1
+            stats["errors"] += error is not None
+            stats["seconds"] += call.seconds
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if call.seconds <= bound:
+                    stats["buckets"][i] += 1
+                    break
+            phases = stats["phases"]
+            phases["wait"] += call.wait_seconds
+            phases["network"] += call.network_seconds
+            phases["decode"] += call.decode_seconds
+            phases["build"] += call.build_seconds
+            stats["requests"] += call.requests
+            stats["retries"] += call.retries
+            stats["response_bytes"] += call.response_bytes
+            stats["rows"] += call.rows or 0
+            stats["notices"] += bool(call.notices)
+            if call.output_chars is not None:
+                stats["output_samples"] += 1
+                stats["output_chars"] += call.output_chars
+            for cache, hits in call.cache_hits.items():
+                stats["cache_hits"][cache] = stats["cache_hits"].get(cache, 0) + hits
+        if self._hooks:
+            self._emit("on_tool_end", call)
+
+    def track(self, tool: str, arguments: Dict[str, Any], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn as the tool named tool, called with arguments, and record its measurements."""
+        call, token = self._start(tool, arguments)
+        try:
+            result = _with_notices(fn(*args, **kwargs), call.notices)
+        except BaseException as exc:
+            self._finish(call, token, error=exc)
+            raise
+        self._finish(call, token, result)
+        return result
+
+    async def atrack(self, tool: str, arguments: Dict[str, Any], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Async counterpart of track."""
+        call, token = self._start(tool, arguments)
+        try:
+            result = _with_notices(await fn(*args, **kwargs), call.notices)
+        except BaseException as exc:
+            self._finish(call, token, error=exc)
+            raise
+        self._finish(call, token, result)
+        return result
+
+    def record_request(self, path: str, status: Any, retry: bool, wait: float, network: float, decode: float = 0.0, response_bytes: int = 0) -> None:
+        """Record one HTTP attempt; status is the status code or the exception name for transport errors."""
+        status = str(status)
+        call = _current_call.get()
+        if call is not None:
+            call.add_request(status, retry, wait, network, decode, response_bytes)
+        with self._lock:
+            stats = self._endpoints.get(path)
+            if stats is None:
+                stats = self._endpoints[path] = _new_endpoint_stats()
+            stats["statuses"][status] = stats["statuses"].get(status, 0) + 1
+            stats["retries"] += retry
+            stats["response_bytes"] += response_bytes
+            phases = stats["phases"]
+            phases["wait"] += wait
+            phases["network"] += network
+            phases["decode"] += decode
+        if self._hooks:
+            self._emit("on_request", path, status, retry, wait, network, decode, response_bytes)
+
+    def record_response_cache_hit(self, path: str) -> None:
+        call = _current_call.get()
+        if call is not None:
+            call.add_cache_hit("response")
+        with self._lock:
+            stats = self._endpoints.get(path)
+            if stats is None:
+                stats = self._endpoints[path] = _new_endpoint_stats()
+            stats["cache_hits"] += 1
+
+    def record_coalesced(self, path: str) -> None:
+        """Count a request that joined an identical one already in flight instead of being sent."""
+        call = _current_call.get()
+        if call is not None:
+            call.add_cache_hit("coalesced")
+        with self._lock:
+            stats = self._endpoints.get(path)
+            if stats is None:
+                stats = self._endpoints[path] = _new_endpoint_stats()
+            stats["coalesced"] += 1
+
+    def record_hedge(self, path: str, won: bool = False) -> None:
+        """Count a hedged duplicate request sent for path, or, with won, one that answered first."""
+        with self._lock:
+            stats = self._endpoints.get(path)
+            if stats is None:
+                stats = self._endpoints[path] = _new_endpoint_stats()
+            stats["hedges_won" if won else "hedges"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of the per-tool and per-endpoint counters."""
+        with self._lock:
+            tools = {}
+            for tool, stats in self._tools.items():
+                tools[tool] = dict(stats, buckets=list(stats["buckets"]), phases=dict(stats["phases"]), cache_hits=dict(stats["cache_hits"]))
+            endpoints = {}
+            for path, stats in self._endpoints.items():
+                endpoints[path] = dict(stats, statuses=dict(stats["statuses"]), phases=dict(stats["phases"]))
+        return {"tools": tools, "endpoints": endpoints}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tools.clear()
+            self._endpoints.clear()
+
+    def prometheus_text(self, prefix: str = "realtor") -> str:
+        """Render the counters in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[str, Dict[str, Any], float]]) -> None:
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                rendered = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+                lines.append(f"{prefix}_{name}{suffix}{{{rendered}}} {value!r}")
+
+        tools = sorted(snapshot["tools"].items())
+        endpoints = sorted(snapshot["endpoints"].items())
+
+        durations = []
+        for tool, stats in tools:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, stats["buckets"]):
+                cumulative += count
+                durations.append(("_bucket", {"tool": tool, "le": bound}, cumulative))
+            durations.append(("_bucket", {"tool": tool, "le": "+Inf"}, stats["calls"]))
+            durations.append(("_sum", {"tool": tool}, stats["seconds"]))
+            durations.append(("_count", {"tool": tool}, stats["calls"]))
+        family("tool_duration_seconds", "histogram", "Wall time of tool calls.", durations)
+        family("tool_calls_total", "counter", "Tool calls.", [("", {"tool": t}, s["calls"]) for t, s in tools])
+        family("tool_errors_total", "counter", "Tool calls that raised.", [("", {"tool": t}, s["errors"]) for t, s in tools])
+        family("tool_phase_seconds_total", "counter", "Tool wall time by phase: wait, network, decode and build.",
+               [("", {"tool": t, "phase": p}, v) for t, s in tools for p, v in s["phases"].items()])
+        family("tool_requests_total", "counter", "HTTP attempts made by tool calls.", [("", {"tool": t}, s["requests"]) for t, s in tools])
+        family("tool_retries_total", "counter", "HTTP retries made by tool calls.", [("", {"tool": t}, s["retries"]) for t, s in tools])
+        family("tool_response_bytes_total", "counter", "Response body bytes read by tool calls.",
+               [("", {"tool": t}, s["response_bytes"]) for t, s in tools])
+        family("tool_rows_total", "counter", "Rows or items returned by tool calls.", [("", {"tool": t}, s["rows"]) for t, s in tools])
+        family("tool_output_chars", "summary", "Characters in the rendered tool output, over sampled calls.",
+               [(suffix, {"tool": t}, s[key]) for t, s in tools for suffix, key in (("_sum", "output_chars"), ("_count", "output_samples"))])
+        family("tool_cache_hits_total", "counter", "Cache hits during tool calls.",
+               [("", {"tool": t, "cache": c}, v) for t, s in tools for c, v in sorted(s["cache_hits"].items())])
+        family("tool_notices_total", "counter", "Tool calls whose result carried a notice, such as stale data.",
+               [("", {"tool": t}, s["notices"]) for t, s in tools])
+
+        family("http_requests_total", "counter", "HTTP attempts by endpoint and status.",
+               [("", {"path": p, "status": code}, v) for p, s in endpoints for code, v in sorted(s["statuses"].items())])
+        family("http_retries_total", "counter", "HTTP retries by endpoint.", [("", {"path": p}, s["retries"]) for p, s in endpoints])
+        family("http_response_bytes_total", "counter", "Response body bytes by endpoint.",
+               [("", {"path": p}, s["response_bytes"]) for p, s in endpoints])
+        family("http_phase_seconds_total", "counter", "HTTP time by endpoint and phase: wait, network and decode.",
+               [("", {"path": p, "phase": ph}, v) for p, s in endpoints for ph, v in s["phases"].items()])
+        family("response_cache_hits_total", "counter", "Responses served from the persistent cache.",
+               [("", {"path": p}, s["cache_hits"]) for p, s in endpoints])
+        family("http_coalesced_total", "counter", "Requests that joined an identical request already in flight.",
+               [("", {"path": p}, s["coalesced"]) for p, s in endpoints])
+        family("http_hedges_total", "counter", "Duplicate requests sent to hedge a slow attempt, and how many answered first.",
+               [("", {"path": p, "outcome": o}, s[k]) for p, s in endpoints for o, k in (("sent", "hedges"), ("won", "hedges_won"))])
+        return "\n".join(lines) + "\n"
+
+
+def _arguments(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(kwargs, args=list(args)) if args else kwargs
+
+
+def instrumented(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorate a spec method so each call is recorded by the spec's Instrumentation.
+
+    functools.wraps keeps the signature and docstring that llama_index turns into the tool schema.
+    The call runs under the spec's _call_deadline, tightening any deadline the caller already set,
+    and builds its tables as the spec's _table_kind.
+    """
+    name = fn.__name__[1:] if fn.__name__.startswith("a") and inspect.iscoroutinefunction(fn) else fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            with deadline(getattr(self, "_call_deadline", None)), table_kind(getattr(self, "_table_kind", "dataframe")):
+                return await self._instrumentation.atrack(name, _arguments(args, kwargs), fn, self, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+        with deadline(getattr(self, "_call_deadline", None)), table_kind(getattr(self, "_table_kind", "dataframe")):
+            return self._instrumentation.track(name, _arguments(args, kwargs), fn, self, *args, **kwargs)
+    return wrapper
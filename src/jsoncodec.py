@@ -0,0 +1,28 @@
+import json
+
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=str)
+
+
+# orjson decodes Realtor payloads several times faster than the stdlib; it is optional
+loads = orjson.loads if orjson is not None else _json_loads
+dumps = _orjson_dumps if orjson is not None else _json_dumps
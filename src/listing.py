@@ -1,63 +1,230 @@
-import requests
-import pandas as pd
+import asyncio
+import contextvars
 
-from typing import Dict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple, Union
 
+from .projection import LISTING_FIELDS, Table, concat_tables, empty_table, project
+from .transport import RealtorTransport
 
-def get_listings_by_postal_code(api_key: Dict[str, str], postal_code:str) -> pd.DataFrame:
-    """List properties for sent, sale, sold with options and filters"""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/list"
-    payload = {
-    	"limit": 200,
-    	"offset": 0,
+
+LIST_PATH = "/properties/v3/list"
+SIMILAR_HOMES_PATH = "/properties/v3/list-similar-homes"
+DEFAULT_STATUS = ("for_sale", "ready_to_build")
+
+
+def _listings_payload(postal_code: str, status: Sequence[str] = DEFAULT_STATUS, limit: int = 200, offset: int = 0) -> dict:
+    """Build the search payload for one page of properties in a postal code."""
+    return {
+    	"limit": limit,
+    	"offset": offset,
     	"postal_code": postal_code,
-    	"status": ["for_sale", "ready_to_build"],
+    	"status": list(status),
     	"sort": {
     		"direction": "desc",
     		"field": "list_date"
     	}
     }
-    headers = {
-    	"content-type": "application/json",
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }    
-    listings_df = pd.DataFrame()
-    response = requests.post(url, json=payload, headers=headers)
-    if response.status_code != 200:
-        return listings_df
-
-    listings_df = pd.json_normalize(response.json()['data']['home_search']['results'])
-    
-    return listings_df
-
-
-def get_similar_listings_by_property_id(api_key: Dict[str, str], property_id:str) -> pd.DataFrame:
-    """Find similar homes given the property_id."""
-    
-    REALTOR_API_KEY = api_key["REALTOR_API_KEY"]
-    url = "https://realtor.p.rapidapi.com/properties/v3/list-similar-homes"
-    querystring = {"property_id":property_id,"limit":"10","status":"for_sale"}
-    headers = {
-    	"X-RapidAPI-Key": REALTOR_API_KEY,
-    	"X-RapidAPI-Host": "realtor.p.rapidapi.com"
-    }
-    similar_listings_df = pd.DataFrame()
-    response = requests.get(url, headers=headers, params=querystring)
-    if response.status_code != 200:
+
+
+def _page_from_response(response_json: Optional[dict]) -> Tuple[list, Optional[int]]:
+    """Return the result rows of a search page and the total number of matches, if reported."""
+    if response_json is None:
+        return [], 0
+    home_search = response_json['data']['home_search'] or {}
+    return home_search.get('results') or [], home_search.get('total')
+
+
+class _PagePlan:
+    """Tracks the next offset and remaining budget while paging through several postal codes."""
+
+    def __init__(self, postal_codes: Union[str, Sequence[str]], page_size: int, max_results: Optional[int], fields: Optional[Sequence[str]] = None):
+        if isinstance(postal_codes, str):
+            postal_codes = [postal_codes]
+        self.postal_codes = list(dict.fromkeys(postal_codes))
+        self.page_size = page_size
+        self.max_results = max_results
+        self.fields = fields
+        self.returned = 0
+
+    @property
+    def remaining(self) -> Optional[int]:
+        if self.max_results is None:
+            return None
+        return max(0, self.max_results - self.returned)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining == 0
+
+    def limit(self) -> int:
+        """Page size for the next request, shrunk so small caps never download a full page."""
+        if self.remaining is None:
+            return self.page_size
+        return max(1, min(self.page_size, self.remaining))
+
+    def next_offset(self, offset: int, results: list, total: Optional[int], limit: int) -> Optional[int]:
+        """Offset of the following page for a postal code, or None when it is exhausted."""
+        fetched = offset + len(results)
+        if not results or (total is not None and fetched >= total) or (total is None and len(results) < limit):
+            return None
+        return fetched
+
+    def take(self, results: list) -> Table:
+        """Trim a page to the remaining budget and project it into a table."""
+        if self.remaining is not None:
+            results = results[:self.remaining]
+        self.returned += len(results)
+        return project(results, self.fields, LISTING_FIELDS)
+
+
+def iter_listing_pages(
+    transport: RealtorTransport,
+    postal_codes: Union[str, Sequence[str]],
+    status: Sequence[str] = DEFAULT_STATUS,
+    page_size: int = 50,
+    max_results: Optional[int] = None,
+    max_concurrency: int = 4,
+    fields: Optional[Sequence[str]] = None
+) -> Iterator[Table]:
+    """Yield pages of listings for one or more postal codes as dataframes.
+
+    Postal codes are paged concurrently, each one sequentially by offset, and pages are yielded
+    as they arrive. Paging stops as soon as max_results rows have been yielded. Each page holds the
+    given dotted field paths, LISTING_FIELDS by default or every column with ['*'].
+    """
+    plan = _PagePlan(postal_codes, page_size, max_results, fields)
+    if plan.done or not plan.postal_codes:
+        return
+
+    def fetch(postal_code: str, offset: int, limit: int):
+        response_json = transport.post_json(LIST_PATH, _listings_payload(postal_code, status, limit, offset))
+        return (postal_code, offset, limit) + _page_from_response(response_json)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(plan.postal_codes))))
+    try:
+        pending = {executor.submit(contextvars.copy_context().run, fetch, postal_code, 0, plan.limit()) for postal_code in plan.postal_codes}
+        while pending and not plan.done:
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                postal_code, offset, limit, results, total = future.result()
+                next_offset = plan.next_offset(offset, results, total, limit)
+                if results and not plan.done:
+                    yield plan.take(results)
+                if next_offset is not None and not plan.done:
+                    pending.add(executor.submit(contextvars.copy_context().run, fetch, postal_code, next_offset, plan.limit()))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_listing_pages(
+    transport: RealtorTransport,
+    postal_codes: Union[str, Sequence[str]],
+    status: Sequence[str] = DEFAULT_STATUS,
+    page_size: int = 50,
+    max_results: Optional[int] = None,
+    max_concurrency: int = 4,
+    fields: Optional[Sequence[str]] = None
+) -> AsyncIterator[Table]:
+    """Async counterpart of iter_listing_pages."""
+    plan = _PagePlan(postal_codes, page_size, max_results, fields)
+    if plan.done or not plan.postal_codes:
+        return
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(postal_code: str, offset: int, limit: int):
+        async with semaphore:
+            response_json = await transport.apost_json(LIST_PATH, _listings_payload(postal_code, status, limit, offset))
+        return (postal_code, offset, limit) + _page_from_response(response_json)
+
+    pending = {asyncio.ensure_future(fetch(postal_code, 0, plan.limit())) for postal_code in plan.postal_codes}
+    try:
+        while pending and not plan.done:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                postal_code, offset, limit, results, total = task.result()
+                next_offset = plan.next_offset(offset, results, total, limit)
+                if results and not plan.done:
+                    yield plan.take(results)
+                if next_offset is not None and not plan.done:
+                    pending.add(asyncio.ensure_future(fetch(postal_code, next_offset, plan.limit())))
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _concat_pages(pages: List[Table]) -> Table:
+    return concat_tables(pages)
+
+
+def search_listings(
+    transport: RealtorTransport,
+    postal_codes: Union[str, Sequence[str]],
+    status: Sequence[str] = DEFAULT_STATUS,
+    page_size: int = 50,
+    max_results: Optional[int] = 200,
+    max_concurrency: int = 4,
+    fields: Optional[Sequence[str]] = None
+) -> Table:
+    """Collect every page of a listing search into one dataframe, up to max_results rows."""
+    return _concat_pages(list(iter_listing_pages(transport, postal_codes, status, page_size, max_results, max_concurrency, fields)))
+
+
+async def asearch_listings(
+    transport: RealtorTransport,
+    postal_codes: Union[str, Sequence[str]],
+    status: Sequence[str] = DEFAULT_STATUS,
+    page_size: int = 50,
+    max_results: Optional[int] = 200,
+    max_concurrency: int = 4,
+    fields: Optional[Sequence[str]] = None
+) -> Table:
+    """Async counterpart of search_listings."""
+    return _concat_pages([page async for page in aiter_listing_pages(transport, postal_codes, status, page_size, max_results, max_concurrency, fields)])
+
+
+def _similar_homes_from_response(response_json: Optional[dict]) -> list:
+    """Return the related home records of a similar-homes response."""
+    if response_json is None:
+        return []
+    home = response_json['data']['home'] or {}
+    return (home.get('related_homes') or {}).get('results') or []
+
+
+def _similar_listings_from_response(response_json: Optional[dict], fields: Optional[Sequence[str]] = None) -> Table:
+    similar_listings_df = empty_table()
+    if response_json is None:
         return similar_listings_df
 
-    similar_listings_df = pd.json_normalize(response.json()['data']['home']['related_homes']['results'])
-    
+    similar_listings_df = project(_similar_homes_from_response(response_json), fields, LISTING_FIELDS)
+
     return similar_listings_df
 
 
+def get_listings_by_postal_code(transport: RealtorTransport, postal_code:str, max_results: int = 200, fields: Optional[Sequence[str]] = None) -> Table:
+    """List properties for sent, sale, sold with options and filters"""
+
+    return search_listings(transport, postal_code, page_size=min(max_results, 200), max_results=max_results, fields=fields)
+
 
+async def aget_listings_by_postal_code(transport: RealtorTransport, postal_code:str, max_results: int = 200, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of get_listings_by_postal_code."""
 
+    return await asearch_listings(transport, postal_code, page_size=min(max_results, 200), max_results=max_results, fields=fields)
 
 
+def get_similar_listings_by_property_id(transport: RealtorTransport, property_id:str, fields: Optional[Sequence[str]] = None) -> Table:
+    """Find similar homes given the property_id."""
+
+    querystring = {"property_id":property_id,"limit":"10","status":"for_sale"}
+    response_json = transport.get_json(SIMILAR_HOMES_PATH, params=querystring)
+    return _similar_listings_from_response(response_json, fields)
 
 
+async def aget_similar_listings_by_property_id(transport: RealtorTransport, property_id:str, fields: Optional[Sequence[str]] = None) -> Table:
+    """Async counterpart of get_similar_listings_by_property_id."""
 
+    querystring = {"property_id":property_id,"limit":"10","status":"for_sale"}
+    response_json = await transport.aget_json(SIMILAR_HOMES_PATH, params=querystring)
+    return _similar_listings_from_response(response_json, fields)
@@ -0,0 +1,562 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .batch import afan_out, fan_out, unique_ids
+from .detail import DETAIL_PATH, _home_from_response
+from .errors import RealtorAPIError
+from .listing import DEFAULT_STATUS, LIST_PATH, SIMILAR_HOMES_PATH, _page_from_response, _similar_homes_from_response, aiter_listing_pages, iter_listing_pages
+from .projection import Table, column_values, extract_columns, table_from_records
+from .transport import RealtorTransport
+
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+
+# store column -> dotted path in a Realtor listing record
+STORE_COLUMNS = {
+    "property_id": "property_id",
+    "postal_code": "location.address.postal_code",
+    "status": "status",
+    "list_price": "list_price",
+    "beds": "description.beds",
+    "baths": "description.baths",
+    "sqft": "description.sqft",
+    "lot_sqft": "description.lot_sqft",
+    "year_built": "description.year_built",
+    "property_type": "description.type",
+    "garage": "description.garage",
+    "stories": "description.stories",
+    "pool": "description.pool",
+    "list_date": "list_date",
+    "price_reduced_amount": "price_reduced_amount",
+    "sold_price": "last_sold_price",
+    "sold_date": "last_sold_date",
+    "address": "location.address.line",
+    "city": "location.address.city",
+    "state_code": "location.address.state_code",
+    "lat": "location.address.coordinate.lat",
+    "lon": "location.address.coordinate.lon",
+    "is_new_listing": "flags.is_new_listing",
+    "is_price_reduced": "flags.is_price_reduced",
+    "is_pending": "flags.is_pending",
+    "is_contingent": "flags.is_contingent",
+    "tags": "tags",
+    "href": "href",
+}
+QUERY_COLUMNS = (
+    "property_id", "address", "city", "postal_code", "status", "list_price", "beds", "baths", "sqft",
+    "lot_sqft", "year_built", "property_type", "pool", "list_date", "price_reduced_amount", "href",
+)
+SORT_COLUMNS = ("list_date", "list_price", "beds", "baths", "sqft", "lot_sqft", "year_built", "price_reduced_amount")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    property_id TEXT PRIMARY KEY,
+    postal_code TEXT,
+    status TEXT,
+    list_price INTEGER,
+    beds REAL,
+    baths REAL,
+    sqft INTEGER,
+    lot_sqft INTEGER,
+    year_built INTEGER,
+    property_type TEXT,
+    garage REAL,
+    stories REAL,
+    pool INTEGER,
+    list_date TEXT,
+    price_reduced_amount INTEGER,
+    sold_price INTEGER,
+    sold_date TEXT,
+    address TEXT,
+    city TEXT,
+    state_code TEXT,
+    lat REAL,
+    lon REAL,
+    is_new_listing INTEGER,
+    is_price_reduced INTEGER,
+    is_pending INTEGER,
+    is_contingent INTEGER,
+    tags TEXT,
+    href TEXT,
+    seen_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS listings_postal_code_status ON listings (postal_code, status);
+CREATE INDEX IF NOT EXISTS listings_status ON listings (status);
+CREATE INDEX IF NOT EXISTS listings_list_price ON listings (list_price);
+CREATE INDEX IF NOT EXISTS listings_beds ON listings (beds);
+CREATE INDEX IF NOT EXISTS listings_baths ON listings (baths);
+CREATE INDEX IF NOT EXISTS listings_sqft ON listings (sqft);
+CREATE INDEX IF NOT EXISTS listings_list_date ON listings (list_date);
+CREATE TABLE IF NOT EXISTS postal_code_syncs (
+    postal_code TEXT NOT NULL,
+    statuses TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    full_synced_at REAL NOT NULL,
+    newest_list_date TEXT,
+    PRIMARY KEY (postal_code, statuses)
+);
+CREATE TABLE IF NOT EXISTS property_events (
+    property_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    postal_code TEXT,
+    date TEXT,
+    event_name TEXT,
+    price INTEGER,
+    sqft INTEGER,
+    source_name TEXT,
+    PRIMARY KEY (property_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS property_events_postal_code_date ON property_events (postal_code, date);
+CREATE TABLE IF NOT EXISTS history_syncs (
+    property_id TEXT PRIMARY KEY,
+    postal_code TEXT,
+    synced_at REAL NOT NULL
+);
+"""
+# listing columns added after the first release, with their types, for stores created before them
+ADDED_COLUMNS = {"sold_price": "INTEGER", "sold_date": "TEXT"}
+EVENT_COLUMNS = ("property_id", "date", "event_name", "price", "sqft")
+
+
+def _statuses_key(status: Sequence[str]) -> str:
+    return ",".join(sorted(set(status)))
+
+
+def _store_rows(records: List[dict]) -> List[tuple]:
+    """Pull the store columns out of listing records, deriving the pool flag from tags as well; seen_at is added on write."""
+    columns = extract_columns(records, list(STORE_COLUMNS.values()))
+    names = list(STORE_COLUMNS)
+    rows = []
+    for values in zip(*(columns[path] for path in STORE_COLUMNS.values())):
+        row = dict(zip(names, values))
+        if not row["property_id"]:
+            continue
+        tags = row["tags"] or []
+        row["pool"] = bool(row["pool"]) or any("pool" in str(tag) for tag in tags)
+        row["tags"] = ",".join(str(tag) for tag in tags)
+        row["property_id"] = str(row["property_id"])
+        row["postal_code"] = str(row["postal_code"]) if row["postal_code"] is not None else None
+        rows.append(tuple(row[name] for name in names))
+    return rows
+
+
+def _event_rows(home: dict) -> Tuple[Optional[str], List[tuple]]:
+    """Pull the postal code and every property_history event out of a property detail document."""
+    columns = extract_columns([home], ["location.address.postal_code", "description.sqft"])
+    postal_code = columns["location.address.postal_code"][0]
+    postal_code = str(postal_code) if postal_code is not None else None
+    sqft = columns["description.sqft"][0]
+    rows = [
+        (str(home["property_id"]), position, postal_code, (event.get("date") or "")[:10] or None,
+         event.get("event_name"), event.get("price"), sqft, event.get("source_name"))
+        for position, event in enumerate(home.get("property_history") or []) if isinstance(event, dict)
+    ]
+    return postal_code, rows
+
+
+class ListingStore:
+    """Local SQLite store of listings with indexed filter queries and per-postal-code sync.
+
+    Every listing search response seen by a watched transport is upserted, and refresh brings
+    stale postal codes up to date: once synced_at is older than max_age only the newest pages are
+    fetched, down to the newest list_date already stored; once full_synced_at is older than
+    full_refresh_age every page is fetched again and listings that no longer appear are removed.
+    Every property_history event of each detail response seen is kept as well. One connection is
+    shared behind a lock; path=':memory:' keeps the store in process memory.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        max_age: float = 15 * MINUTE,
+        full_refresh_age: float = 24 * HOUR,
+        page_size: int = 200,
+        max_listings_per_postal_code: int = 2000
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.full_refresh_age = full_refresh_age
+        self.page_size = page_size
+        self.max_listings_per_postal_code = max_listings_per_postal_code
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        existing = {row[1] for row in self._connection.execute("PRAGMA table_info(listings)")}
+        for column, kind in ADDED_COLUMNS.items():
+            if column not in existing:
+                self._connection.execute(f"ALTER TABLE listings ADD COLUMN {column} {kind}")
+        self._lock = threading.Lock()
+        # the write clock behind seen_at; it never runs backwards, so seen_at follows commit order
+        self._last_write = self._connection.execute("SELECT COALESCE(MAX(seen_at), 0) FROM listings").fetchone()[0]
+        self._watched: Set[int] = set()
+        # bumped on every write so derived indexes know when to rebuild
+        self.version = 0
+        self.deletions = 0
+        # bumped on every write of a postal code's listings or property histories
+        self._postal_code_versions: Dict[str, int] = {}
+        self._insert = (
+            f"INSERT OR REPLACE INTO listings ({', '.join(STORE_COLUMNS)}, seen_at) "
+            f"VALUES ({', '.join('?' for _ in range(len(STORE_COLUMNS) + 1))})"
+        )
+
+    def add_records(self, records: Iterable[dict]) -> int:
+        """Upsert listing records from a search response. Returns the number of rows written."""
+        rows = _store_rows([r for r in records or [] if r])
+        if rows:
+            with self._lock:
+                seen_at = self._clock()
+                self._connection.executemany(self._insert, [row + (seen_at,) for row in rows])
+                self.version += 1
+                self._bump(row[1] for row in rows)
+        return len(rows)
+
+    def _clock(self) -> float:
+        # called with the lock held, so that timestamps and commits happen in the same order
+        self._last_write = max(time.time(), self._last_write)
+        return self._last_write
+
+    def _bump(self, postal_codes: Iterable[Optional[str]]) -> None:
+        # called with the lock held
+        for postal_code in set(postal_codes):
+            self._postal_code_versions[postal_code] = self._postal_code_versions.get(postal_code, 0) + 1
+
+    def postal_code_version(self, postal_code: str) -> int:
+        """A counter that changes whenever a postal code's listings or property histories are written."""
+        with self._lock:
+            return self._postal_code_versions.get(str(postal_code), 0)
+
+    def add_history(self, home: dict) -> int:
+        """Replace the stored property_history events of a property detail document. Returns the number written."""
+        if not home or not home.get("property_id"):
+            return 0
+        postal_code, rows = _event_rows(home)
+        property_id = str(home["property_id"])
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.execute("DELETE FROM property_events WHERE property_id = ?", (property_id,))
+                self._connection.executemany(
+                    "INSERT INTO property_events (property_id, position, postal_code, date, event_name, price, sqft, source_name) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO history_syncs (property_id, postal_code, synced_at) VALUES (?, ?, ?)",
+                    (property_id, postal_code, time.time())
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._bump([postal_code])
+        return len(rows)
+
+    def watch(self, transport: RealtorTransport) -> None:
+        """Upsert every listing that passes through transport's listing search and similar-homes endpoints,
+        and every property history that passes through its detail endpoint."""
+        if id(transport) in self._watched:
+            return
+        self._watched.add(id(transport))
+        transport.add_response_listener(LIST_PATH, lambda response_json: self.add_records(_page_from_response(response_json)[0]))
+        transport.add_response_listener(SIMILAR_HOMES_PATH, lambda response_json: self.add_records(_similar_homes_from_response(response_json)))
+        transport.add_response_listener(DETAIL_PATH, lambda response_json: self.add_history(_home_from_response(response_json)))
+
+    def _sync_state(self, postal_code: str, statuses: str) -> Optional[Tuple[float, float, Optional[str]]]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT synced_at, full_synced_at, newest_list_date FROM postal_code_syncs WHERE postal_code = ? AND statuses = ?",
+                (postal_code, statuses)
+            ).fetchone()
+
+    def refresh_mode(self, postal_code: str, status: Sequence[str] = DEFAULT_STATUS) -> Optional[str]:
+        """Return 'full', 'incremental' or None when the postal code is fresh enough to query."""
+        state = self._sync_state(postal_code, _statuses_key(status))
+        now = time.time()
+        if state is None or now - state[1] >= self.full_refresh_age:
+            return "full"
+        if now - state[0] >= self.max_age:
+            return "incremental"
+        return None
+
+    def _page_plan(self, postal_code: str, status: Sequence[str]) -> Tuple[str, Optional[str], float]:
+        mode = self.refresh_mode(postal_code, status)
+        state = self._sync_state(postal_code, _statuses_key(status))
+        watermark = state[2] if state is not None and mode == "incremental" else None
+        # on the write clock, so every row written after the sync starts counts as seen by it
+        with self._lock:
+            started = self._clock()
+        return mode, watermark, started
+
+    def _finish_sync(self, postal_code: str, status: Sequence[str], mode: str, started: float, fetched: int, newest: Optional[str]) -> int:
+        """Record a completed sync and, after a complete full sync, drop listings that were not seen."""
+        statuses = _statuses_key(status)
+        removed = 0
+        with self._lock:
+            if mode == "full" and fetched < self.max_listings_per_postal_code:
+                placeholders = ", ".join("?" for _ in status)
+                removed = self._connection.execute(
+                    f"DELETE FROM listings WHERE postal_code = ? AND status IN ({placeholders}) AND seen_at < ?",
+                    (postal_code, *status, started)
+                ).rowcount
+                self.version += 1
+                self.deletions += removed
+                self._bump([postal_code])
+            previous = self._connection.execute(
+                "SELECT full_synced_at, newest_list_date FROM postal_code_syncs WHERE postal_code = ? AND statuses = ?",
+                (postal_code, statuses)
+            ).fetchone()
+            full_synced_at = started if mode == "full" or previous is None else previous[0]
+            if previous is not None and previous[1] and (newest is None or previous[1] > newest):
+                newest = previous[1]
+            self._connection.execute(
+                "INSERT OR REPLACE INTO postal_code_syncs (postal_code, statuses, synced_at, full_synced_at, newest_list_date) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (postal_code, statuses, started, full_synced_at, newest)
+            )
+        return removed
+
+    def _sync_postal_code(self, transport: RealtorTransport, postal_code: str, status: Sequence[str]) -> Dict[str, Any]:
+        mode, watermark, started = self._page_plan(postal_code, status)
+        if mode is None:
+            return {"mode": None, "fetched": 0, "removed": 0}
+        fetched, newest = 0, None
+        # the listing search is sorted newest first, so an incremental sync stops at the first page
+        # reaching back past the newest list_date stored by the previous sync
+        pages = iter_listing_pages(transport, postal_code, status, self.page_size, self.max_listings_per_postal_code, 1, fields=["list_date"])
+        try:
+            for page in pages:
+                fetched += len(page)
+                dates = [date for date in column_values(page, "list_date") if isinstance(date, str)]
+                if dates:
+                    newest = max(newest or "", max(dates))
+                    if watermark and min(dates) <= watermark:
+                        break
+        finally:
+            pages.close()
+        removed = self._finish_sync(postal_code, status, mode, started, fetched, newest)
+        return {"mode": mode, "fetched": fetched, "removed": removed}
+
+    async def _async_sync_postal_code(self, transport: RealtorTransport, postal_code: str, status: Sequence[str]) -> Dict[str, Any]:
+        mode, watermark, started = self._page_plan(postal_code, status)
+        if mode is None:
+            return {"mode": None, "fetched": 0, "removed": 0}
+        fetched, newest = 0, None
+        pages = aiter_listing_pages(transport, postal_code, status, self.page_size, self.max_listings_per_postal_code, 1, fields=["list_date"])
+        try:
+            async for page in pages:
+                fetched += len(page)
+                dates = [date for date in column_values(page, "list_date") if isinstance(date, str)]
+                if dates:
+                    newest = max(newest or "", max(dates))
+                    if watermark and min(dates) <= watermark:
+                        break
+        finally:
+            await pages.aclose()
+        removed = self._finish_sync(postal_code, status, mode, started, fetched, newest)
+        return {"mode": mode, "fetched": fetched, "removed": removed}
+
+    def refresh(self, transport: RealtorTransport, postal_codes: Sequence[str], status: Sequence[str] = DEFAULT_STATUS, max_concurrency: int = 4) -> Dict[str, Dict[str, Any]]:
+        """Sync every stale postal code concurrently; returns fan_out outcomes keyed by postal code.
+
+        Rows are written by the watch listener as pages arrive, so the sync itself only asks for list_date.
+        """
+        self.watch(transport)
+        return fan_out(lambda postal_code: self._sync_postal_code(transport, postal_code, status), postal_codes, max_concurrency)
+
+    async def arefresh(self, transport: RealtorTransport, postal_codes: Sequence[str], status: Sequence[str] = DEFAULT_STATUS, max_concurrency: int = 4) -> Dict[str, Dict[str, Any]]:
+        """Async counterpart of refresh."""
+        self.watch(transport)
+        return await afan_out(lambda postal_code: self._async_sync_postal_code(transport, postal_code, status), postal_codes, max_concurrency)
+
+    def raise_for_unsynced(self, outcomes: Dict[str, Dict[str, Any]], status: Sequence[str] = DEFAULT_STATUS) -> None:
+        """Serve stale rows when a refresh fails, but fail loudly for postal codes never synced."""
+        statuses = _statuses_key(status)
+        for postal_code, outcome in outcomes.items():
+            if outcome["status"] == "error" and self._sync_state(postal_code, statuses) is None:
+                raise RealtorAPIError(LIST_PATH, reason=f"could not sync postal code {postal_code}: {outcome['error']}")
+
+    def query_records(
+        self,
+        postal_codes: Optional[Sequence[str]] = None,
+        status: Sequence[str] = DEFAULT_STATUS,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_beds: Optional[float] = None,
+        max_beds: Optional[float] = None,
+        min_baths: Optional[float] = None,
+        max_baths: Optional[float] = None,
+        min_sqft: Optional[float] = None,
+        max_sqft: Optional[float] = None,
+        property_types: Optional[Sequence[str]] = None,
+        has_pool: Optional[bool] = None,
+        listed_after: Optional[str] = None,
+        sort_by: str = "list_date",
+        descending: bool = True,
+        limit: Optional[int] = 20,
+        property_ids: Optional[Sequence[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter, sort and limit the stored listings with one indexed SQL query; limit=None returns every match.
+
+        Each listing is a dict of the QUERY_COLUMNS, with pool as a bool.
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {SORT_COLUMNS}, got {sort_by!r}")
+        clauses, params = [], []
+
+        def any_of(column: str, values: Sequence[Any]) -> None:
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(values)
+
+        if postal_codes:
+            any_of("postal_code", unique_ids(postal_codes))
+        if property_ids is not None:
+            # one JSON parameter instead of one placeholder per id keeps large id sets under SQLite's variable limit
+            clauses.append("property_id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(unique_ids(property_ids)))
+        if status:
+            any_of("status", list(status))
+        if property_types:
+            any_of("property_type", list(property_types))
+        for column, operator, value in (
+            ("list_price", ">=", min_price), ("list_price", "<=", max_price),
+            ("beds", ">=", min_beds), ("beds", "<=", max_beds),
+            ("baths", ">=", min_baths), ("baths", "<=", max_baths),
+            ("sqft", ">=", min_sqft), ("sqft", "<=", max_sqft),
+            ("list_date", ">=", listed_after),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                params.append(value)
+        if has_pool is not None:
+            clauses.append("pool = ?")
+            params.append(int(has_pool))
+
+        sql = f"SELECT {', '.join(QUERY_COLUMNS)} FROM listings"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {sort_by} IS NULL, {sort_by} {'DESC' if descending else 'ASC'}, property_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(max(0, int(limit)))
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        records = [dict(zip(QUERY_COLUMNS, row)) for row in rows]
+        for record in records:
+            record["pool"] = bool(record["pool"])
+        return records
+
+    def query(self, postal_codes: Optional[Sequence[str]] = None, status: Sequence[str] = DEFAULT_STATUS, **filters: Any) -> Table:
+        """query_records as a table of the current table kind; filters are the query_records filters."""
+        return table_from_records(self.query_records(postal_codes, status, **filters), QUERY_COLUMNS)
+
+    def location(self, property_id: str) -> Optional[Tuple[float, float, Optional[str]]]:
+        """Return (lat, lon, postal_code) of a stored listing, or None when it is unknown or has no coordinates."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT lat, lon, postal_code FROM listings WHERE property_id = ? AND lat IS NOT NULL AND lon IS NOT NULL",
+                (str(property_id),)
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def coordinates(self) -> Tuple[List[str], List[float], List[float]]:
+        """Return property ids, latitudes and longitudes of every stored listing that has coordinates."""
+        with self._lock:
+            rows = self._connection.execute("SELECT property_id, lat, lon FROM listings WHERE lat IS NOT NULL AND lon IS NOT NULL").fetchall()
+        if not rows:
+            return [], [], []
+        property_ids, lats, lons = zip(*rows)
+        return list(property_ids), list(lats), list(lons)
+
+    def rows_seen_since(self, seen_at: float, columns: Sequence[str]) -> Dict[str, list]:
+        """Return the given columns, plus seen_at, of listings written at or after seen_at, one list per column."""
+        unknown = [c for c in columns if c not in STORE_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown listing store columns: {unknown}")
+        names = list(dict.fromkeys(list(columns) + ["seen_at"]))
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {', '.join(names)} FROM listings WHERE seen_at >= ?", (seen_at,)).fetchall()
+        return {column: [row[i] for row in rows] for i, column in enumerate(names)}
+
+    def postal_code_extent(self, postal_code: str) -> Optional[Tuple[float, float, float, float]]:
+        """Return (min_lat, min_lon, max_lat, max_lon) over the stored listings of a postal code."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT MIN(lat), MIN(lon), MAX(lat), MAX(lon) FROM listings WHERE postal_code = ? AND lat IS NOT NULL AND lon IS NOT NULL",
+                (str(postal_code),)
+            ).fetchone()
+        return tuple(row) if row is not None and row[0] is not None else None
+
+    def properties_without_history(self, postal_code: str, status: Sequence[str] = DEFAULT_STATUS, newest: int = 20) -> List[str]:
+        """Return ids among the newest stored listings of a postal code whose property history has not been seen."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT property_id FROM (SELECT property_id, list_date FROM listings WHERE postal_code = ? AND status IN ({', '.join('?' for _ in status)}) "
+                "ORDER BY list_date IS NULL, list_date DESC, property_id LIMIT ?) "
+                "WHERE property_id NOT IN (SELECT property_id FROM history_syncs)",
+                (str(postal_code), *status, max(0, int(newest)))
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def postal_code_columns(self, postal_code: str, columns: Sequence[str]) -> Dict[str, list]:
+        """Return the given store columns of every stored listing of a postal code, one list per column."""
+        unknown = [c for c in columns if c not in STORE_COLUMNS]
+        if unknown:
+            raise ValueError(f"unknown listing store columns: {unknown}")
+        with self._lock:
+            rows = self._connection.execute(f"SELECT {', '.join(columns)} FROM listings WHERE postal_code = ?", (str(postal_code),)).fetchall()
+        return {column: [row[i] for row in rows] for i, column in enumerate(columns)}
+
+    def postal_code_events(self, postal_code: str) -> Dict[str, list]:
+        """Return the stored property history events of a postal code, one list per EVENT_COLUMNS entry, in history order."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(EVENT_COLUMNS)} FROM property_events WHERE postal_code = ? ORDER BY property_id, position",
+                (str(postal_code),)
+            ).fetchall()
+        return {column: [row[i] for row in rows] for i, column in enumerate(EVENT_COLUMNS)}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            listings = self._connection.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+            postal_codes = self._connection.execute("SELECT COUNT(DISTINCT postal_code) FROM postal_code_syncs").fetchone()[0]
+            histories = self._connection.execute("SELECT COUNT(*) FROM history_syncs").fetchone()[0]
+        return {"listings": listings, "synced_postal_codes": postal_codes, "property_histories": histories}
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def query_listings(
+    store: ListingStore,
+    transport: RealtorTransport,
+    postal_codes: Sequence[str],
+    status: Sequence[str] = DEFAULT_STATUS,
+    max_concurrency: int = 4,
+    **filters: Any
+) -> Table:
+    """Bring the postal codes up to date under the store's freshness policy, then query the store."""
+    store.raise_for_unsynced(store.refresh(transport, postal_codes, status, max_concurrency), status)
+    return store.query(postal_codes, status, **filters)
+
+
+async def aquery_listings(
+    store: ListingStore,
+    transport: RealtorTransport,
+    postal_codes: Sequence[str],
+    status: Sequence[str] = DEFAULT_STATUS,
+    max_concurrency: int = 4,
+    **filters: Any
+) -> Table:
+    """Async counterpart of query_listings."""
+    store.raise_for_unsynced(await store.arefresh(transport, postal_codes, status, max_concurrency), status)
+    return store.query(postal_codes, status, **filters)
@@ -0,0 +1,267 @@
+import threading
+
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import detail
+from .batch import afan_out, fan_out
+from .cache import TTLCache
+from .instrumentation import record_cache_hit
+from .listing import DEFAULT_STATUS
+from .listing_store import EVENT_COLUMNS, ListingStore
+from .projection import Table, table_from_records
+from .transport import RealtorTransport
+
+
+MARKET_WINDOWS = (30, 90, 365)
+SOLD_STATUS = ("sold",)
+LISTED_EVENTS = ("Listed",)
+SOLD_EVENTS = ("Sold",)
+PRICE_CHANGE_EVENTS = ("Price Changed",)
+QUARTILES = (0.25, 0.5, 0.75)
+
+MARKET_COLUMNS = (
+    "window_days", "listings", "median_list_price", "list_price_p25", "list_price_p75",
+    "median_list_ppsf", "list_ppsf_p25", "list_ppsf_p75", "list_ppsf_change_pct",
+    "median_days_on_market", "price_cut_rate", "sales", "median_sale_price", "median_sale_ppsf",
+    "sale_ppsf_change_pct", "median_list_to_sale_pct", "median_sale_days_on_market", "price_cuts",
+)
+
+_OTHER, _LISTED, _SOLD, _PRICE_CHANGE = 0, 1, 2, 3
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _day(value: Optional[str]) -> float:
+    if not isinstance(value, str):
+        return np.nan
+    try:
+        return float(date.fromisoformat(value[:10]).toordinal() - _EPOCH_ORDINAL)
+    except ValueError:
+        return np.nan
+
+
+def _days(dates: Sequence[Optional[str]]) -> np.ndarray:
+    """Day numbers since 1970-01-01 of ISO dates as floats, NaN where a date is missing or malformed."""
+    return np.array([_day(d) for d in dates], dtype=float)
+
+
+def _floats(values: Sequence[Any]) -> np.ndarray:
+    return np.array([np.nan if v is None else v for v in values], dtype=float)
+
+
+def _per_sqft(prices: np.ndarray, sqft: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(sqft > 0, prices / sqft, np.nan)
+
+
+def _quantiles(values: np.ndarray, mask: np.ndarray, digits: int) -> Tuple[Optional[float], ...]:
+    selected = values[mask]
+    selected = selected[np.isfinite(selected)]
+    if not selected.size:
+        return (None,) * len(QUARTILES)
+    return tuple(round(float(q), digits) for q in np.quantile(selected, QUARTILES))
+
+
+def _median(values: np.ndarray, mask: np.ndarray, digits: int) -> Optional[float]:
+    return _quantiles(values, mask, digits)[1]
+
+
+def _change_pct(current: Optional[float], previous: Optional[float]) -> Optional[float]:
+    if current is None or not previous:
+        return None
+    return round((current - previous) / previous * 100, 2)
+
+
+def _with_listing_sales(listings: Dict[str, list], events: Dict[str, list]) -> Dict[str, list]:
+    """Add a Sold event for each sold listing whose sale is not already in its property history."""
+    recorded = {
+        (property_id, (day or "")[:10])
+        for property_id, day, name in zip(events["property_id"], events["date"], events["event_name"]) if name in SOLD_EVENTS
+    }
+    sales = [
+        (property_id, day[:10], SOLD_EVENTS[0], price, sqft)
+        for property_id, status, day, price, sqft in zip(listings["property_id"], listings["status"], listings["sold_date"], listings["sold_price"], listings["sqft"])
+        if status in SOLD_STATUS and isinstance(day, str) and price is not None and (property_id, day[:10]) not in recorded
+    ]
+    if not sales:
+        return events
+    return {column: list(events[column]) + [sale[i] for sale in sales] for i, column in enumerate(EVENT_COLUMNS)}
+
+
+class _MarketData:
+    """Column arrays of one postal code's listings and property history events, with per-event derivations.
+
+    Sales are the Sold events of the property histories plus the sale price and date of each sold
+    listing whose history has not been fetched or does not record that sale.
+    """
+
+    def __init__(self, listings: Dict[str, list], events: Dict[str, list]):
+        self.list_price = _floats(listings["list_price"])
+        self.list_ppsf = _per_sqft(self.list_price, _floats(listings["sqft"]))
+        self.listed = _days(listings["list_date"])
+        self.reduced = np.array([bool(flag) or bool(cut) for flag, cut in zip(listings["is_price_reduced"], listings["price_reduced_amount"])], dtype=bool)
+        self.active = np.isin(np.array(listings["status"], dtype=object), list(DEFAULT_STATUS))
+        events = _with_listing_sales(listings, events)
+
+        # events sorted by property then date, so each event's predecessors are the rows above it
+        day = _days(events["date"])
+        dated = np.flatnonzero(np.isfinite(day))
+        property_codes = np.unique(np.array(events["property_id"], dtype=object), return_inverse=True)[1].reshape(-1)
+        order = dated[np.lexsort((day[dated], property_codes[dated]))]
+        self.property = property_codes[order]
+        self.day = day[order]
+        self.price = _floats(events["price"])[order]
+        self.ppsf = _per_sqft(self.price, _floats(events["sqft"])[order])
+        names = np.array(events["event_name"], dtype=object)[order]
+        self.kind = np.select(
+            [np.isin(names, LISTED_EVENTS), np.isin(names, SOLD_EVENTS), np.isin(names, PRICE_CHANGE_EVENTS)],
+            [_LISTED, _SOLD, _PRICE_CHANGE], _OTHER
+        )
+
+        # the latest Listed event at or before each event of the same property
+        positions = np.arange(len(self.day))
+        last_listed = np.maximum.accumulate(np.where(self.kind == _LISTED, positions, -1)) if len(positions) else positions
+        anchor = np.clip(last_listed, 0, None)
+        has_listing = (last_listed >= 0) & (self.property[anchor] == self.property) if len(positions) else np.zeros(0, dtype=bool)
+        listed_price = np.where(has_listing, self.price[anchor], np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.list_to_sale_pct = np.where(listed_price > 0, (self.price - listed_price) / listed_price * 100, np.nan)
+        self.sale_days_on_market = np.where(has_listing, self.day - self.day[anchor], np.nan)
+
+        # a price change below the previous event's price of the same property
+        previous_price = np.concatenate([[np.nan], self.price[:-1]])
+        same_property = np.concatenate([[False], self.property[1:] == self.property[:-1]])
+        self.price_cut = (self.kind == _PRICE_CHANGE) & same_property & (self.price < previous_price)
+
+    def window(self, today: int, days: int) -> Dict[str, Any]:
+        start, prior_start = today - days, today - 2 * days
+        listed = (self.listed > start) & (self.listed <= today)
+        listed_before = (self.listed > prior_start) & (self.listed <= start)
+        in_window = (self.day > start) & (self.day <= today)
+        sold = in_window & (self.kind == _SOLD)
+        sold_before = (self.day > prior_start) & (self.day <= start) & (self.kind == _SOLD)
+        price_p25, price_median, price_p75 = _quantiles(self.list_price, listed, 0)
+        ppsf_p25, ppsf_median, ppsf_p75 = _quantiles(self.list_ppsf, listed, 2)
+        sale_ppsf = _median(self.ppsf, sold, 2)
+        return {
+            "window_days": days,
+            "listings": int(listed.sum()),
+            "median_list_price": price_median,
+            "list_price_p25": price_p25,
+            "list_price_p75": price_p75,
+            "median_list_ppsf": ppsf_median,
+            "list_ppsf_p25": ppsf_p25,
+            "list_ppsf_p75": ppsf_p75,
+            "list_ppsf_change_pct": _change_pct(ppsf_median, _median(self.list_ppsf, listed_before, 2)),
+            "median_days_on_market": _median(today - self.listed, listed & self.active, 1),
+            "price_cut_rate": round(float(self.reduced[listed].mean()), 3) if listed.any() else None,
+            "sales": int(sold.sum()),
+            "median_sale_price": _median(self.price, sold, 0),
+            "median_sale_ppsf": sale_ppsf,
+            "sale_ppsf_change_pct": _change_pct(sale_ppsf, _median(self.ppsf, sold_before, 2)),
+            "median_list_to_sale_pct": _median(self.list_to_sale_pct, sold, 2),
+            "median_sale_days_on_market": _median(self.sale_days_on_market, sold, 1),
+            "price_cuts": int((in_window & self.price_cut).sum()),
+        }
+
+
+class MarketStats:
+    """Per-postal-code market statistics over the listings and property histories in a ListingStore.
+
+    A postal code's listings and history events are loaded into column arrays once per version of
+    its data in the store and every window is aggregated with vectorized numpy operations. Summaries
+    are cached by postal code, data version, windows and day, so they are recomputed only for
+    postal codes that received new listings or histories, and at most once a day otherwise.
+    """
+
+    def __init__(self, store: ListingStore, cache_size: int = 256):
+        self.store = store
+        self._data = TTLCache(maxsize=cache_size, ttl=float("inf"))
+        self._summaries = TTLCache(maxsize=cache_size, ttl=float("inf"))
+        self._lock = threading.Lock()
+
+    def _market_data(self, postal_code: str, version: int) -> _MarketData:
+        key = (postal_code, version)
+        data = self._data.get(key)
+        if data is None:
+            listings = self.store.postal_code_columns(postal_code, [
+                "property_id", "list_price", "sqft", "list_date", "price_reduced_amount", "is_price_reduced", "status", "sold_price", "sold_date",
+            ])
+            data = _MarketData(listings, self.store.postal_code_events(postal_code))
+            self._data.set(key, data)
+        return data
+
+    def summary(self, postal_code: str, windows: Sequence[int] = MARKET_WINDOWS, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Return one row of statistics per trailing window of days, ending today."""
+        postal_code = str(postal_code)
+        today = (today or date.today())
+        windows = tuple(sorted({int(w) for w in windows if int(w) > 0}))
+        version = self.store.postal_code_version(postal_code)
+        key = (postal_code, version, windows, today)
+        rows = self._summaries.get(key)
+        if rows is not None:
+            record_cache_hit("market")
+            return rows
+        with self._lock:
+            data = self._market_data(postal_code, version)
+            day = int(np.datetime64(today.isoformat(), "D").astype("int64"))
+            rows = [data.window(day, days) for days in windows]
+        self._summaries.set(key, rows)
+        return rows
+
+
+def _summary_table(stats: MarketStats, postal_code: str, windows: Optional[Sequence[int]]) -> Table:
+    return table_from_records(stats.summary(postal_code, windows or MARKET_WINDOWS), MARKET_COLUMNS)
+
+
+def _without_history(store: ListingStore, postal_code: str, history_fetches: int) -> List[str]:
+    return [
+        property_id
+        for status in (DEFAULT_STATUS, SOLD_STATUS)
+        for property_id in store.properties_without_history(postal_code, status, history_fetches)
+    ]
+
+
+def get_market_stats(
+    stats: MarketStats,
+    transport: RealtorTransport,
+    postal_code: str,
+    windows: Optional[Sequence[int]] = None,
+    detail_cache: Optional[TTLCache] = None,
+    history_fetches: int = 20,
+    max_concurrency: int = 4
+) -> Table:
+    """Bring a postal code's active and sold listings up to date, fill in missing property histories, then summarize it.
+
+    The histories of the history_fetches newest active listings and as many sold ones are sampled:
+    those not seen yet are fetched and the store picks their events out of the detail responses, so
+    a repeated call only fetches the histories of listings that are new since the last one.
+    """
+    store = stats.store
+    for status in (DEFAULT_STATUS, SOLD_STATUS):
+        store.raise_for_unsynced(store.refresh(transport, [postal_code], status, max_concurrency), status)
+    missing = _without_history(store, postal_code, history_fetches)
+    fan_out(lambda property_id: detail.get_property_detail(transport, property_id, detail_cache), missing, max_concurrency)
+    return _summary_table(stats, postal_code, windows)
+
+
+async def aget_market_stats(
+    stats: MarketStats,
+    transport: RealtorTransport,
+    postal_code: str,
+    windows: Optional[Sequence[int]] = None,
+    detail_cache: Optional[TTLCache] = None,
+    history_fetches: int = 20,
+    max_concurrency: int = 4
+) -> Table:
+    """Async counterpart of get_market_stats."""
+    store = stats.store
+    for status in (DEFAULT_STATUS, SOLD_STATUS):
+        store.raise_for_unsynced(await store.arefresh(transport, [postal_code], status, max_concurrency), status)
+    missing = _without_history(store, postal_code, history_fetches)
+    await afan_out(lambda property_id: detail.aget_property_detail(transport, property_id, detail_cache), missing, max_concurrency)
+    return _summary_table(stats, postal_code, windows)
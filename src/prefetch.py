@@ -0,0 +1,208 @@
+import logging
+import threading
+import time
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .cache import TTLCache
+from .detail import PHOTOS_PATH, SURROUNDINGS_PATH, get_property_detail, get_property_media
+from .governor import background_priority
+from .instrumentation import InstrumentationHook, ToolCall
+from .projection import Rows, column_values, is_dataframe
+from .resilience import deadline
+from .transport import RealtorTransport
+
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_KINDS = ("detail", "photos", "surroundings")
+MEDIA_PATHS = {"photos": PHOTOS_PATH, "surroundings": SURROUNDINGS_PATH}
+
+# the tools answered from the cache that each kind of prefetch warms
+CONSUMERS = {
+    "detail": {
+        "get_listing_details_by_property_id", "get_nearby_school_info_by_property_id", "get_property_address_by_property_id",
+        "get_property_history_by_property_id", "get_listing_description_by_property_id", "get_home_details_by_property_id",
+        "get_listing_details_by_property_ids", "get_property_addresses_by_property_ids", "get_listing_descriptions_by_property_ids",
+        "get_nearby_schools_by_property_ids",
+    },
+    "photos": {"get_listing_photos_by_property_id"},
+    "surroundings": {"get_listing_surroundings_detail_by_property_id"},
+}
+
+
+def _top_property_ids(result: Any, top_n: int) -> List[str]:
+    if not isinstance(result, Rows) and not is_dataframe(result):
+        return []
+    property_ids = [pid for pid in column_values(result, "property_id") if pid is not None and pid == pid]
+    return list(dict.fromkeys(str(pid) for pid in property_ids[:top_n]))
+
+
+def _requested_property_ids(call: ToolCall) -> List[str]:
+    arguments = call.arguments
+    positional = arguments.get("args") or [None]
+    property_ids = arguments.get("property_ids", arguments.get("property_id", positional[0]))
+    if property_ids is None:
+        return []
+    if isinstance(property_ids, (str, int)):
+        property_ids = [property_ids]
+    return [str(pid) for pid in property_ids]
+
+
+class Prefetcher(InstrumentationHook):
+    """Speculatively warms the caches that the agent's follow-up questions about search results hit.
+
+    schedule() takes a listing search result and fetches the detail, photos and surroundings of its
+    top_n property ids on a small worker pool. Prefetches run in the rate governor's background lane,
+    so they only spend tokens and monthly quota above the interactive reserve, and at most budget of
+    them are sent per budget_window seconds. A new search supersedes the prefetches still queued for
+    the previous one, and so does a tool call about a property outside the prefetched results.
+
+    Registered as an instrumentation hook, the prefetcher sees every later tool call and counts the
+    ones answered by an entry it warmed; hit_rate in stats() is the share of prefetches that were used.
+    """
+
+    def __init__(
+        self,
+        transport: RealtorTransport,
+        caches: Dict[str, TTLCache],
+        top_n: int = 3,
+        kinds: Sequence[str] = PREFETCH_KINDS,
+        max_workers: int = 2,
+        budget: int = 300,
+        budget_window: float = 3600.0,
+        request_deadline: float = 10.0,
+        max_tracked: int = 4096
+    ):
+        self.transport = transport
+        self.caches = caches
+        self.top_n = top_n
+        self.kinds = tuple(kind for kind in kinds if kind in caches)
+        self.budget = budget
+        self.budget_window = budget_window
+        self.request_deadline = request_deadline
+        self.max_tracked = max_tracked
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="realtor-prefetch")
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pending: List[Future] = []
+        self._targets: set = set()
+        self._warmed: "OrderedDict[Tuple[str, str], None]" = OrderedDict()
+        self._window_started = time.monotonic()
+        self._window_spent = 0
+        self.scheduled = 0
+        self.fetched = 0
+        self.already_cached = 0
+        self.over_budget = 0
+        self.cancelled = 0
+        self.errors = 0
+        self.hits = 0
+
+    def schedule(self, result: Any) -> int:
+        """Queue prefetches for the top property ids of a search result, returning how many were queued."""
+        property_ids = _top_property_ids(result, self.top_n)
+        with self._lock:
+            self._supersede()
+            self._targets = set(property_ids)
+            generation = self._generation
+            for kind in self.kinds:
+                for property_id in property_ids:
+                    self._pending.append(self._executor.submit(self._prefetch, generation, kind, property_id))
+            queued = len(property_ids) * len(self.kinds)
+            self.scheduled += queued
+        return queued
+
+    def cancel(self) -> None:
+        """Drop every prefetch that has not been sent yet."""
+        with self._lock:
+            self._supersede()
+            self._targets = set()
+
+    def _supersede(self) -> None:
+        # called with the lock held; running prefetches notice the new generation before sending
+        self._generation += 1
+        for future in self._pending:
+            if future.cancel():
+                self.cancelled += 1
+        self._pending = []
+
+    def _spend(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._window_started >= self.budget_window:
+                self._window_started = now
+                self._window_spent = 0
+            if self._window_spent >= self.budget:
+                self.over_budget += 1
+                return False
+            self._window_spent += 1
+            return True
+
+    def _prefetch(self, generation: int, kind: str, property_id: str) -> None:
+        with self._lock:
+            if generation != self._generation:
+                self.cancelled += 1
+                return
+        cache = self.caches[kind]
+        if property_id in cache:
+            with self._lock:
+                self.already_cached += 1
+            return
+        if not self._spend():
+            return
+        try:
+            with background_priority(), deadline(self.request_deadline):
+                if kind == "detail":
+                    get_property_detail(self.transport, property_id, cache)
+                else:
+                    get_property_media(self.transport, MEDIA_PATHS[kind], property_id, cache, kind)
+        except Exception:
+            logger.debug("prefetch of %s for %s failed", kind, property_id, exc_info=True)
+            with self._lock:
+                self.errors += 1
+            return
+        with self._lock:
+            self.fetched += 1
+            self._warmed[(kind, property_id)] = None
+            while len(self._warmed) > self.max_tracked:
+                self._warmed.popitem(last=False)
+
+    def on_tool_start(self, call: ToolCall) -> None:
+        kinds = [kind for kind in self.kinds if call.tool in CONSUMERS[kind]]
+        if not kinds:
+            return
+        property_ids = _requested_property_ids(call)
+        refresh = bool(call.arguments.get("refresh"))
+        with self._lock:
+            for kind in kinds:
+                for property_id in property_ids:
+                    key = (kind, property_id)
+                    if key in self._warmed:
+                        del self._warmed[key]
+                        self.hits += not refresh and property_id in self.caches[kind]
+            if self._targets and not self._targets.issuperset(property_ids):
+                # the agent has moved on from the results being prefetched
+                self._supersede()
+                self._targets = set()
+
+    def stats(self) -> Dict[str, float]:
+        """Return prefetch counters; hit_rate is hits over prefetches actually sent."""
+        with self._lock:
+            return {
+                "scheduled": self.scheduled,
+                "fetched": self.fetched,
+                "already_cached": self.already_cached,
+                "over_budget": self.over_budget,
+                "cancelled": self.cancelled,
+                "errors": self.errors,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.fetched if self.fetched else 0.0,
+                "pending": sum(not future.done() for future in self._pending),
+            }
+
+    def close(self) -> None:
+        """Cancel queued prefetches and release the worker threads."""
+        self.cancel()
+        self._executor.shutdown(wait=False)
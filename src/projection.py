@@ -0,0 +1,468 @@
+import contextlib
+import contextvars
+import csv
+import functools
+import io
+import json
+import sys
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+ALL_FIELDS = "*"
+
+LISTING_FIELDS = (
+    "property_id", "status", "list_price", "list_date", "price_reduced_amount",
+    "description.beds", "description.baths", "description.sqft", "description.lot_sqft",
+    "description.year_built", "description.type",
+    "location.address.line", "location.address.city", "location.address.state_code", "location.address.postal_code",
+    "location.address.coordinate.lat", "location.address.coordinate.lon",
+    "flags.is_new_listing", "flags.is_price_reduced", "flags.is_pending", "flags.is_contingent",
+    "href",
+)
+DETAIL_FIELDS = LISTING_FIELDS + (
+    "last_sold_price", "last_sold_date", "description.baths_full", "description.baths_half",
+    "description.garage", "description.stories", "description.pool", "description.sub_type", "hoa.fee", "tags",
+)
+SCHOOL_FIELDS = (
+    "name", "rating", "parent_rating", "education_levels", "grades", "funding_type", "student_count", "distance_in_miles",
+)
+HOME_DETAIL_FIELDS = ("category", "parent_category", "text")
+SURROUNDINGS_FIELDS = ("type", "text")
+FRED_SERIES_FIELDS = (
+    "id", "title", "frequency_short", "units_short", "seasonal_adjustment_short",
+    "observation_start", "observation_end", "last_updated", "popularity",
+)
+
+SHORT_KEYS = {
+    "property_id": "id",
+    "list_price": "price",
+    "list_date": "listed",
+    "price_reduced_amount": "price_cut",
+    "last_sold_price": "sold_price",
+    "last_sold_date": "sold_date",
+    "description.year_built": "built",
+    "description.lot_sqft": "lot_sqft",
+    "description.baths_full": "baths_full",
+    "description.baths_half": "baths_half",
+    "description.sub_type": "sub_type",
+    "location.address.line": "address",
+    "location.address.state_code": "state",
+    "location.address.postal_code": "zip",
+    "location.address.coordinate.lat": "lat",
+    "location.address.coordinate.lon": "lon",
+    "flags.is_new_listing": "new",
+    "flags.is_price_reduced": "reduced",
+    "flags.is_pending": "pending",
+    "flags.is_contingent": "contingent",
+    "distance_in_miles": "miles",
+    "frequency_short": "frequency",
+    "units_short": "units",
+    "seasonal_adjustment_short": "seasonal_adjustment",
+}
+
+OUTPUT_FORMATS = ("dataframe", "csv", "records", "python", "arrow")
+COMPACT_FORMATS = ("csv", "records")
+TABLE_KINDS = ("dataframe", "rows")
+
+_table_kind: contextvars.ContextVar = contextvars.ContextVar("realtor_table_kind", default="dataframe")
+
+
+@contextlib.contextmanager
+def table_kind(kind: str) -> Iterator[None]:
+    """Build the tables of tools called inside the block as DataFrames, or as Rows with 'rows'.
+
+    Rows never import pandas, so a spec that returns text, plain Python objects or Arrow tables
+    stays pandas-free on the tools whose tables come straight from a projection.
+    """
+    if kind not in TABLE_KINDS:
+        raise ValueError(f"table kind must be one of {TABLE_KINDS}, got {kind!r}")
+    token = _table_kind.set(kind)
+    try:
+        yield
+    finally:
+        _table_kind.reset(token)
+
+
+def _noted(attrs: Dict[str, Any], text: str) -> str:
+    """Prefix text with a 'Note:' line for each of the notices in attrs."""
+    notes = [f"Note: {notice}\n" for notice in attrs.get("notices", ())]
+    return "".join(notes) + text
+
+
+class NotedList(list):
+    """A list whose repr, and so the text an agent is shown, leads with the notices in its attrs.
+
+    attrs holds metadata about the list, as DataFrame.attrs does.
+    """
+
+    def __init__(self, items: Iterable[Any] = ()):
+        super().__init__(items)
+        self.attrs: Dict[str, Any] = {}
+
+    def __repr__(self) -> str:
+        return _noted(self.attrs, super().__repr__())
+
+
+class Rows(NotedList):
+    """A table as a list of row dicts sharing the same keys, in column order."""
+
+    @property
+    def columns(self) -> List[str]:
+        return list(dict.fromkeys(key for row in self for key in row))
+
+
+Table = Union["pd.DataFrame", Rows]
+
+
+def is_dataframe(value: Any) -> bool:
+    """isinstance(value, pd.DataFrame) that does not import pandas just to say no."""
+    pandas = sys.modules.get("pandas")
+    return pandas is not None and isinstance(value, pandas.DataFrame)
+
+
+@functools.lru_cache(maxsize=None)
+def _noted_frame_class() -> type:
+    import pandas as pd
+
+    class NotedDataFrame(pd.DataFrame):
+        """A DataFrame whose repr leads with the notices in its attrs; derived frames are plain DataFrames."""
+
+        @property
+        def _constructor(self) -> type:
+            return pd.DataFrame
+
+        def __repr__(self) -> str:
+            return _noted(self.attrs, super().__repr__())
+
+    return NotedDataFrame
+
+
+def with_notes(data: Any, notices: List[str]) -> Any:
+    """Copy a table or list result with notices in its attrs, shown ahead of it when it is printed.
+
+    An Arrow table carries them as JSON under the 'notices' key of its schema metadata instead.
+    """
+    if is_dataframe(data):
+        noted = _noted_frame_class()(data)
+    elif isinstance(data, list):
+        noted = type(data)(data) if isinstance(data, NotedList) else NotedList(data)
+    elif sys.modules.get("pyarrow") is not None and isinstance(data, sys.modules["pyarrow"].Table):
+        metadata = dict(data.schema.metadata or {})
+        metadata[b"notices"] = json.dumps(list(notices)).encode()
+        return data.replace_schema_metadata(metadata)
+    else:
+        return data
+    noted.attrs = dict(getattr(data, "attrs", {}), notices=list(notices))
+    return noted
+
+
+def table(columns: Dict[str, list], length: Optional[int] = None) -> Table:
+    """Build a table of the current kind from aligned columns; length sizes a table with no columns."""
+    if _table_kind.get() == "rows":
+        if not columns:
+            return Rows({} for _ in range(length or 0))
+        return Rows(dict(zip(columns, values)) for values in zip(*columns.values()))
+    import pandas as pd
+
+    if not columns:
+        return pd.DataFrame(index=range(length or 0))
+    return pd.DataFrame(columns)
+
+
+def table_from_records(records: Iterable[dict], columns: Optional[Sequence[str]] = None) -> Table:
+    """Build a table of the current kind from row dicts, optionally fixing its columns."""
+    if _table_kind.get() == "rows":
+        if columns is None:
+            return Rows(records)
+        return Rows({name: record.get(name) for name in columns} for record in records)
+    import pandas as pd
+
+    return pd.DataFrame.from_records(list(records), columns=columns)
+
+
+def empty_table(columns: Sequence[str] = ()) -> Table:
+    return table_from_records([], list(columns) if columns else None)
+
+
+def concat_tables(tables: Sequence[Table]) -> Table:
+    """Stack tables of the current kind, aligning their columns."""
+    if _table_kind.get() == "rows":
+        return Rows(row for part in tables for row in part)
+    import pandas as pd
+
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
+
+
+def column_values(data: Table, name: str) -> list:
+    """The values of one column of a table as a list, or [] if it has no such column."""
+    if is_dataframe(data):
+        return data[name].tolist() if name in data.columns else []
+    return [row.get(name) for row in data] if any(name in row for row in data) else []
+
+
+@functools.lru_cache(maxsize=256)
+def compile_fields(fields: Tuple[str, ...]) -> Dict[str, list]:
+    """Compile dotted field paths into a tree keyed by path segment.
+
+    Each node is [field or None, children]; fields that share a prefix such as 'location.address'
+    share its nodes, so the prefix is looked up once per record rather than once per field.
+    """
+    tree: Dict[str, list] = {}
+    for field in fields:
+        node = [None, tree]
+        for key in field.split("."):
+            node = node[1].setdefault(key, [None, {}])
+        node[0] = field
+    return tree
+
+
+def _extract(values: list, tree: Dict[str, list], out: Dict[str, list]) -> None:
+    for key, (field, children) in tree.items():
+        column = [v.get(key) if isinstance(v, dict) else None for v in values]
+        if field is not None:
+            out[field] = column
+        if children:
+            _extract(column, children, out)
+
+
+def extract_columns(records: List[dict], fields: Sequence[str]) -> Dict[str, list]:
+    """Return one list of values per dotted field path, aligned with records; missing paths give None."""
+    fields = tuple(dict.fromkeys(fields))
+    values: Dict[str, list] = {}
+    _extract(records, compile_fields(fields), values)
+    return values
+
+
+def _is_empty(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return isinstance(value, (str, list, dict, tuple)) and len(value) == 0
+
+
+def _add_column(columns: Dict[str, list], name: str, values: list, drop_empty: bool) -> None:
+    """Add one extracted column, expanding nested objects into one column per leaf."""
+    nested = [v for v in values if isinstance(v, dict)]
+    if not nested:
+        if not drop_empty or not all(map(_is_empty, values)):
+            columns[name] = values
+        return
+    if len(nested) < len(values) and any(v is not None and not isinstance(v, dict) for v in values):
+        _add_column(columns, name, [None if isinstance(v, dict) else v for v in values], drop_empty)
+    for key in dict.fromkeys(k for v in nested for k in v):
+        _add_column(columns, f"{name}.{key}", [v.get(key) if isinstance(v, dict) else None for v in values], drop_empty)
+
+
+def _flatten(record: dict, prefix: str, out: dict) -> dict:
+    for key, value in record.items():
+        if isinstance(value, dict) and value:
+            _flatten(value, f"{prefix}{key}.", out)
+        else:
+            out[f"{prefix}{key}"] = value
+    return out
+
+
+def select_fields(records: Iterable[dict], fields: Optional[Sequence[str]], drop_empty: bool = False) -> Table:
+    """Build a table holding only the given dotted field paths of each record.
+
+    Values are pulled out column by column through the compiled field tree and the table is built
+    from those columns, so unused branches of the payload are never flattened. A path that ends at
+    a nested object, such as 'description', expands to all of its leaves, and '*' (or None) keeps
+    every leaf, as pd.json_normalize would. With drop_empty, columns holding only nulls, empty
+    strings or empty containers are left out.
+    """
+    records = records if isinstance(records, list) else list(records)
+    if fields is None or ALL_FIELDS in fields:
+        if _table_kind.get() == "rows":
+            rows = Rows(_flatten(record, "", {}) for record in records)
+            if drop_empty:
+                keep = [c for c in rows.columns if not all(_is_empty(row.get(c)) for row in rows)]
+                rows = Rows({c: row.get(c) for c in keep} for row in rows)
+            return rows
+        import pandas as pd
+
+        df = pd.json_normalize(records)
+        return drop_empty_columns(df) if drop_empty else df
+    fields = tuple(dict.fromkeys(fields))
+    values = extract_columns(records, fields)
+    columns: Dict[str, list] = {}
+    for field in fields:
+        _add_column(columns, field, values[field], drop_empty)
+    return table(columns, len(records))
+
+
+def drop_empty_columns(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Drop columns whose every value is null, NaN, an empty string or an empty container."""
+    if df.empty:
+        return df
+    keep = [c for c in df.columns if df[c].notna().any()]
+    keep = [c for c in keep if df[c].dtype != object or not df[c].map(_is_empty).all()]
+    if len(keep) == len(df.columns):
+        return df
+    return df[keep]
+
+
+def project(records: Iterable[dict], fields: Optional[Sequence[str]], default_fields: Sequence[str], drop_empty: bool = True) -> Table:
+    """Select fields (or the tool's default_fields when fields is None), dropping empty columns."""
+    return select_fields(records, default_fields if fields is None else fields, drop_empty)
+
+
+def _short_keys(columns: Sequence[str]) -> Dict[str, str]:
+    """Map column paths to short keys: SHORT_KEYS, else the last path segment unless that collides."""
+    short = {c: SHORT_KEYS.get(c, str(c).rsplit(".", 1)[-1]) for c in columns}
+    counts: Dict[str, int] = {}
+    for key in short.values():
+        counts[key] = counts.get(key, 0) + 1
+    return {c: key if counts[key] == 1 else str(c) for c, key in short.items()}
+
+
+def _cell(value: Any, max_cell_chars: int) -> Any:
+    if _is_empty(value):
+        return None
+    if hasattr(value, "item") and not isinstance(value, (list, dict, str)):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (list, tuple)):
+        value = "|".join(str(v) for v in value)
+    elif isinstance(value, dict):
+        value = json.dumps(value, separators=(",", ":"), default=str)
+    if isinstance(value, str) and len(value) > max_cell_chars:
+        value = value[:max_cell_chars - 3] + "..."
+    return value
+
+
+def _csv_line(values: List[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(["" if v is None else v for v in values])
+    return buffer.getvalue()
+
+
+def _table_lines(data: Table, output_format: str, max_cell_chars: int) -> List[str]:
+    columns = list(data.columns)
+    keys = _short_keys(columns)
+    names = [keys[c] for c in columns]
+    if is_dataframe(data):
+        values = data.itertuples(index=False, name=None)
+    else:
+        values = (tuple(row.get(c) for c in columns) for row in data)
+    rows = ([_cell(v, max_cell_chars) for v in row] for row in values)
+    if output_format == "csv":
+        return [_csv_line(names)] + [_csv_line(values) for values in rows]
+    return [
+        json.dumps({name: v for name, v in zip(names, values) if v is not None}, separators=(",", ":"), default=str) + "\n"
+        for values in rows
+    ]
+
+
+def _item_lines(data: Any, max_cell_chars: int) -> List[str]:
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    lines = []
+    for key, value in items:
+        text = json.dumps(value, separators=(",", ":"), default=str)
+        if len(text) > max_cell_chars * 4:
+            text = text[:max_cell_chars * 4 - 3] + "..."
+        lines.append(f"{key}: {text}\n" if isinstance(data, dict) else text + "\n")
+    return lines
+
+
+def _section_lines(data: dict, output_format: str, max_cell_chars: int) -> List[str]:
+    """Lines of a dict whose values include tables: each table or dict under a 'key:' line, other items as JSON."""
+    lines = []
+    for key, value in data.items():
+        if isinstance(value, Rows) or is_dataframe(value):
+            lines.append(f"{key}:\n")
+            lines.extend(_table_lines(value, output_format, max_cell_chars))
+        elif isinstance(value, dict):
+            lines.append(f"{key}:\n")
+            lines.extend(_item_lines(value, max_cell_chars))
+        else:
+            lines.extend(_item_lines({key: value}, max_cell_chars))
+    return lines
+
+
+def _has_tables(data: Any) -> bool:
+    return isinstance(data, dict) and any(isinstance(v, Rows) or is_dataframe(v) for v in data.values())
+
+
+def compact(data: Any, output_format: str = "csv", max_chars: int = 6000, max_cell_chars: int = 200) -> str:
+    """Serialize a tool result into compact text of at most max_chars characters.
+
+    Tables become CSV, or JSON records without null fields, under short column keys; dicts and
+    lists become one JSON line per item, with a table inside a dict rendered under its key. Rows are
+    kept in their original order until the budget runs out, and a final line reports how many rows
+    were left out so the agent can ask for a narrower projection or fewer rows. Long cell values are
+    cut to max_cell_chars.
+    """
+    if output_format not in COMPACT_FORMATS:
+        raise ValueError(f"output_format must be one of {COMPACT_FORMATS}, got {output_format!r}")
+    if isinstance(data, str):
+        return data if len(data) <= max_chars else data[:max_chars - 3] + "..."
+    if isinstance(data, Rows) or is_dataframe(data):
+        lines = _table_lines(data, output_format, max_cell_chars)
+        header = lines[:1] if output_format == "csv" else []
+        rows = lines[len(header):]
+    elif _has_tables(data):
+        header, rows = [], _section_lines(data, output_format, max_cell_chars)
+    elif isinstance(data, (dict, list, tuple)):
+        header, rows = [], _item_lines(data, max_cell_chars)
+    else:
+        return str(data)[:max_chars]
+
+    total = len(rows)
+    used = sum(len(line) for line in header)
+    kept = 0
+    for line in rows:
+        # keep room for the omission note unless this is the last row
+        reserve = 0 if kept == total - 1 else 64
+        if used + len(line) + reserve > max_chars:
+            break
+        used += len(line)
+        kept += 1
+    text = "".join(header + rows[:kept])
+    if kept < total:
+        text += f"[{total - kept} of {total} rows omitted to fit {max_chars} chars]\n"
+    return text
+
+
+def to_python(data: Any) -> Any:
+    """Turn a DataFrame result, or the DataFrames in a dict result, into Rows; everything else is already plain Python."""
+    if _has_tables(data):
+        return {key: to_python(value) for key, value in data.items()}
+    if is_dataframe(data):
+        return Rows(data.astype(object).where(data.notna(), None).to_dict("records"))
+    return data
+
+
+def to_arrow(data: Any) -> Any:
+    """Turn a table result into a pyarrow.Table; results that are not tables are returned as they are.
+
+    pyarrow itself imports pandas, when it is installed, as it converts Python values.
+    """
+    if _has_tables(data):
+        return {key: to_arrow(value) for key, value in data.items()}
+    if not isinstance(data, Rows) and not is_dataframe(data):
+        return data
+    import pyarrow as pa
+
+    if is_dataframe(data):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    return pa.Table.from_pylist(list(data))
+
+
+def render(data: Any, output_format: str, max_chars: int = 6000) -> Any:
+    """Render a tool result in a spec's output_format: as is, compact text, plain Python or an Arrow table."""
+    if output_format == "dataframe":
+        return data
+    if output_format == "python":
+        return to_python(data)
+    if output_format == "arrow":
+        return to_arrow(data)
+    return compact(data, output_format, max_chars)
@@ -0,0 +1,140 @@
+import contextlib
+import contextvars
+import threading
+import time
+
+from collections import deque
+from typing import Dict, Iterator, Optional
+
+from .errors import CircuitOpenError, DeadlineExceededError
+
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("realtor_deadline", default=None)
+
+
+@contextlib.contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every Realtor call made inside the block to finish within seconds.
+
+    Deadlines nest: an inner block can only tighten the deadline it inherits, never extend it.
+    seconds=None inherits the enclosing deadline unchanged.
+    """
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + max(0.0, seconds)
+    inherited = _deadline.get()
+    token = _deadline.set(expires_at if inherited is None else min(inherited, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when no deadline is set."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
+
+
+def check_deadline(path: str, needed: float = 0.0) -> Optional[float]:
+    """Return the seconds left, raising DeadlineExceededError if fewer than needed remain."""
+    remaining = time_remaining()
+    if remaining is not None and remaining <= needed:
+        raise DeadlineExceededError(path, reason=f"deadline exceeded with {max(remaining, 0.0):.2f}s left")
+    return remaining
+
+
+class LatencyTracker:
+    """Sliding window of recent successful response times per endpoint, for hedging thresholds."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, path: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(path)
+            if samples is None:
+                samples = self._samples[path] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, path: str, q: float) -> Optional[float]:
+        """The q-quantile of the endpoint's recent latencies, or None until min_samples are seen."""
+        with self._lock:
+            samples = self._samples.get(path)
+            if samples is None or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker.
+
+    After failure_threshold consecutive failed requests an endpoint opens: calls fail fast with
+    CircuitOpenError for reset_timeout seconds. Then a single trial request is let through
+    (half-open); its success closes the circuit and its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def state(self, path: str) -> str:
+        with self._lock:
+            return self._state(path, time.monotonic())
+
+    def _state(self, path: str, now: float) -> str:
+        opened_at = self._opened_at.get(path)
+        if opened_at is None:
+            return CLOSED
+        return OPEN if now - opened_at < self.reset_timeout else HALF_OPEN
+
+    def before_request(self, path: str) -> None:
+        """Raise CircuitOpenError unless path may be called now."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state(path, now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._trial.get(path):
+                self._trial[path] = True
+                return
+            retry_in = max(0.0, self.reset_timeout - (now - self._opened_at[path]))
+        raise CircuitOpenError(path, reason=f"endpoint is failing, circuit open; retry in {retry_in:.0f}s")
+
+    def record_success(self, path: str) -> None:
+        with self._lock:
+            self._failures.pop(path, None)
+            self._opened_at.pop(path, None)
+            self._trial.pop(path, None)
+
+    def record_failure(self, path: str) -> None:
+        with self._lock:
+            failures = self._failures[path] = self._failures.get(path, 0) + 1
+            if self._trial.pop(path, False) or failures >= self.failure_threshold:
+                self._opened_at[path] = time.monotonic()
+
+    def release(self, path: str) -> None:
+        """Forget the trial slot of a request that ended without reaching the endpoint, such as on a deadline."""
+        with self._lock:
+            self._trial.pop(path, None)
+
+    def stats(self) -> Dict[str, str]:
+        now = time.monotonic()
+        with self._lock:
+            return {path: self._state(path, now) for path in set(self._failures) | set(self._opened_at)}
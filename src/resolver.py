@@ -0,0 +1,248 @@
+import re
+import threading
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+
+STREET_SUFFIXES = {
+    "ALLEY": "ALY", "AVENUE": "AVE", "AV": "AVE", "AVEN": "AVE", "BOULEVARD": "BLVD", "BOUL": "BLVD",
+    "CIRCLE": "CIR", "CIRC": "CIR", "COURT": "CT", "CRT": "CT", "COVE": "CV", "CRESCENT": "CRES",
+    "DRIVE": "DR", "DRV": "DR", "EXPRESSWAY": "EXPY", "FREEWAY": "FWY", "HIGHWAY": "HWY", "HIWAY": "HWY",
+    "LANE": "LN", "LOOP": "LOOP", "PARKWAY": "PKWY", "PKY": "PKWY", "PLACE": "PL", "PLAZA": "PLZ",
+    "POINT": "PT", "ROAD": "RD", "SQUARE": "SQ", "STREET": "ST", "STR": "ST", "TERRACE": "TER",
+    "TRAIL": "TRL", "TURNPIKE": "TPKE", "WAY": "WAY", "MANOR": "MNR", "RUN": "RUN", "PATH": "PATH",
+}
+DIRECTIONALS = {
+    "NORTH": "N", "SOUTH": "S", "EAST": "E", "WEST": "W",
+    "NORTHEAST": "NE", "NORTHWEST": "NW", "SOUTHEAST": "SE", "SOUTHWEST": "SW",
+}
+UNIT_DESIGNATORS = {"APARTMENT": "APT", "SUITE": "STE", "UNIT": "UNIT", "NUMBER": "#", "NO": "#", "BUILDING": "BLDG", "FLOOR": "FLR"}
+SPELLED_ORDINALS = {
+    "FIRST": "1", "SECOND": "2", "THIRD": "3", "FOURTH": "4", "FIFTH": "5", "SIXTH": "6",
+    "SEVENTH": "7", "EIGHTH": "8", "NINTH": "9", "TENTH": "10", "ELEVENTH": "11", "TWELFTH": "12",
+}
+STATES = {
+    "ALABAMA": "AL", "ALASKA": "AK", "ARIZONA": "AZ", "ARKANSAS": "AR", "CALIFORNIA": "CA", "COLORADO": "CO",
+    "CONNECTICUT": "CT", "DELAWARE": "DE", "FLORIDA": "FL", "GEORGIA": "GA", "HAWAII": "HI", "IDAHO": "ID",
+    "ILLINOIS": "IL", "INDIANA": "IN", "IOWA": "IA", "KANSAS": "KS", "KENTUCKY": "KY", "LOUISIANA": "LA",
+    "MAINE": "ME", "MARYLAND": "MD", "MASSACHUSETTS": "MA", "MICHIGAN": "MI", "MINNESOTA": "MN",
+    "MISSISSIPPI": "MS", "MISSOURI": "MO", "MONTANA": "MT", "NEBRASKA": "NE", "NEVADA": "NV",
+    "NEW HAMPSHIRE": "NH", "NEW JERSEY": "NJ", "NEW MEXICO": "NM", "NEW YORK": "NY", "NORTH CAROLINA": "NC",
+    "NORTH DAKOTA": "ND", "OHIO": "OH", "OKLAHOMA": "OK", "OREGON": "OR", "PENNSYLVANIA": "PA",
+    "RHODE ISLAND": "RI", "SOUTH CAROLINA": "SC", "SOUTH DAKOTA": "SD", "TENNESSEE": "TN", "TEXAS": "TX",
+    "UTAH": "UT", "VERMONT": "VT", "VIRGINIA": "VA", "WASHINGTON": "WA", "WEST VIRGINIA": "WV",
+    "WISCONSIN": "WI", "WYOMING": "WY", "DISTRICT OF COLUMBIA": "DC",
+}
+_MULTIWORD_STATES = sorted((name for name in STATES if " " in name), key=len, reverse=True)
+_ORDINAL = re.compile(r"^(\d+)(ST|ND|RD|TH)$")
+_ZIP = re.compile(r"^(\d{5})(\d{4})?$")
+
+
+def canonicalize_address(address: str) -> str:
+    """Normalize case, punctuation, USPS suffixes and directionals, ordinals, state names and ZIP+4.
+
+    '2111 North 26th Avenue, Hollywood, Florida 33020-1234' and '2111 N 26 AVE Hollywood FL 33020'
+    both become '2111 N 26 AVE HOLLYWOOD FL 33020'.
+    """
+    text = address.upper().replace("-", " ").replace("#", " # ")
+    text = re.sub(r"[^A-Z0-9# ]+", " ", text)
+    text = " ".join(text.split())
+    for name in _MULTIWORD_STATES:
+        text = re.sub(rf"\b{name}\b", STATES[name], text)
+
+    tokens = []
+    for token in text.split():
+        ordinal = _ORDINAL.match(token)
+        if ordinal:
+            token = ordinal.group(1)
+        elif token in SPELLED_ORDINALS:
+            token = SPELLED_ORDINALS[token]
+        elif token in DIRECTIONALS:
+            token = DIRECTIONALS[token]
+        elif token in STREET_SUFFIXES:
+            token = STREET_SUFFIXES[token]
+        elif token in UNIT_DESIGNATORS:
+            token = UNIT_DESIGNATORS[token]
+        elif token in STATES:
+            token = STATES[token]
+        tokens.append(token)
+    # a trailing 5-digit and 4-digit pair is a ZIP+4 split by the hyphen
+    if len(tokens) >= 2 and re.fullmatch(r"\d{5}", tokens[-2]) and re.fullmatch(r"\d{4}", tokens[-1]):
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def address_from_record(address: Optional[dict]) -> str:
+    """Join a Realtor location.address dict into a single address line."""
+    if not address:
+        return ""
+    parts = [address.get("line"), address.get("city"), address.get("state_code"), address.get("postal_code")]
+    return " ".join(str(part) for part in parts if part)
+
+
+_SUFFIX_CODES = set(STREET_SUFFIXES.values())
+_DIRECTIONAL_CODES = set(DIRECTIONALS.values())
+_UNIT_CODES = set(UNIT_DESIGNATORS.values())
+_STATE_CODES = set(STATES.values())
+
+
+class AddressParts(NamedTuple):
+    number: str
+    predirectional: str
+    street: str
+    suffix: str
+    postdirectional: str
+    unit: str
+    city: str
+    state: str
+    postal_code: str
+
+
+def split_address(key: str) -> Optional[AddressParts]:
+    """Split a canonical address into its components, or None when the street cannot be delimited.
+
+    The street runs from the house number to the first USPS suffix, so the suffix CT and the state CT
+    are told apart by position. Addresses without a recognizable suffix are not split.
+    """
+    tokens = key.split()
+    if len(tokens) < 3 or not tokens[0][0].isdigit():
+        return None
+    number, rest = tokens[0], tokens[1:]
+
+    predirectional = ""
+    if rest[0] in _DIRECTIONAL_CODES and len(rest) > 1 and rest[1] not in _SUFFIX_CODES:
+        predirectional, rest = rest[0], rest[1:]
+    end = next((i for i in range(1, len(rest)) if rest[i] in _SUFFIX_CODES), None)
+    if end is None:
+        return None
+    street, suffix, rest = " ".join(rest[:end]), rest[end], rest[end + 1:]
+
+    postdirectional = ""
+    if rest and rest[0] in _DIRECTIONAL_CODES:
+        postdirectional, rest = rest[0], rest[1:]
+    unit = ""
+    if len(rest) >= 2 and rest[0] in _UNIT_CODES:
+        unit, rest = rest[1], rest[2:]
+
+    postal_code = ""
+    if rest and _ZIP.match(rest[-1]):
+        postal_code, rest = rest[-1][:5], rest[:-1]
+    state = ""
+    if rest and rest[-1] in _STATE_CODES:
+        state, rest = rest[-1], rest[:-1]
+    return AddressParts(number, predirectional, street, suffix, postdirectional, unit, " ".join(rest), state, postal_code)
+
+
+def _same_property(query: AddressParts, candidate: AddressParts) -> bool:
+    """Exact equality on the street and state; city and ZIP only have to agree when both sides carry them."""
+    if query[:6] != candidate[:6] or not query.state or query.state != candidate.state:
+        return False
+    if query.city and candidate.city and query.city != candidate.city:
+        return False
+    if query.postal_code and candidate.postal_code and query.postal_code != candidate.postal_code:
+        return False
+    return True
+
+
+class AddressIndex:
+    """Local index from canonical addresses to property ids with exact and component-wise lookup.
+
+    A non-exact lookup only resolves when the house number, directionals, street name, suffix, unit and
+    state all match one indexed property; a missing city or ZIP is tolerated only if that leaves a
+    single candidate. Anything ambiguous returns None so the caller falls through to autocomplete.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._ids: Dict[str, str] = {}
+        self._by_house_number: Dict[str, Set[str]] = {}
+        self._parts: Dict[str, AddressParts] = {}
+        self._lock = threading.Lock()
+
+    def add(self, address: str, property_id: str) -> None:
+        key = canonicalize_address(address)
+        if not key or not property_id:
+            return
+        with self._lock:
+            if key not in self._ids:
+                self._by_house_number.setdefault(key.split()[0], set()).add(key)
+                parts = split_address(key)
+                if parts is not None:
+                    self._parts[key] = parts
+            self._ids[key] = str(property_id)
+
+    def add_records(self, records: Iterable[dict]) -> None:
+        """Index listing or detail records that carry a property_id and a location.address."""
+        for record in records or []:
+            if not record:
+                continue
+            address = address_from_record((record.get("location") or {}).get("address"))
+            if address and record.get("property_id"):
+                self.add(address, record["property_id"])
+
+    def lookup(self, address: str) -> Optional[str]:
+        """Return the property id for an address, trying an exact match, then a unique component match."""
+        key = canonicalize_address(address)
+        with self._lock:
+            property_id = self._ids.get(key) or self._component_match(key)
+            if property_id is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return property_id
+
+    def _component_match(self, key: str) -> Optional[str]:
+        query = split_address(key)
+        if query is None:
+            return None
+        property_ids = {
+            self._ids[candidate]
+            for candidate in self._by_house_number.get(query.number, ())
+            if candidate in self._parts and _same_property(query, self._parts[candidate])
+        }
+        if len(property_ids) != 1:
+            return None
+        return property_ids.pop()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._ids)}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def _autocomplete_records(response_json: dict) -> Iterable[dict]:
+    for row in response_json.get("autocomplete") or []:
+        if row.get("area_type") == "address" and row.get("mpr_id"):
+            yield {"property_id": str(row["mpr_id"]), "location": {"address": row}}
+
+
+def _home_search_records(response_json: dict) -> Iterable[dict]:
+    return ((response_json.get("data") or {}).get("home_search") or {}).get("results") or []
+
+
+def _detail_records(response_json: dict) -> Iterable[dict]:
+    home = (response_json.get("data") or {}).get("home")
+    return [home] if home else []
+
+
+def _similar_home_records(response_json: dict) -> Iterable[dict]:
+    home = (response_json.get("data") or {}).get("home") or {}
+    return (home.get("related_homes") or {}).get("results") or []
+
+
+def watch_transport(index: AddressIndex, transport) -> None:
+    """Feed every address seen in autocomplete, listing and detail payloads into the index."""
+    from .autocomplete import AUTOCOMPLETE_PATH
+    from .detail import DETAIL_PATH
+    from .listing import LIST_PATH, SIMILAR_HOMES_PATH
+
+    for path, records in (
+        (AUTOCOMPLETE_PATH, _autocomplete_records),
+        (LIST_PATH, _home_search_records),
+        (SIMILAR_HOMES_PATH, _similar_home_records),
+        (DETAIL_PATH, _detail_records),
+    ):
+        transport.add_response_listener(path, lambda response_json, records=records: index.add_records(records(response_json)))
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from typing import Any, Dict, Optional
+
+from .jsoncodec import dumps, loads
+
+
+MINUTE = 60.0
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+DEFAULT_TTLS = {
+    "/locations/v2/auto-complete": 3 * DAY,
+    "/properties/v3/list": 10 * MINUTE,
+    "/properties/v3/list-similar-homes": 1 * HOUR,
+    "/properties/v3/detail": 1 * HOUR,
+    "/properties/v3/get-photos": 1 * DAY,
+    "/properties/v3/get-surroundings": 7 * DAY,
+    # drive times between a home and a fixed destination barely change
+    "/properties/v3/get-commute-time": 7 * DAY,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS stored_bytes (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO stored_bytes (id, total) SELECT 1, COALESCE(SUM(size), 0) FROM responses;
+CREATE TRIGGER IF NOT EXISTS responses_insert_size AFTER INSERT ON responses BEGIN
+    UPDATE stored_bytes SET total = total + new.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_update_size AFTER UPDATE OF size ON responses BEGIN
+    UPDATE stored_bytes SET total = total + new.size - old.size WHERE id = 1;
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete_size AFTER DELETE ON responses BEGIN
+    UPDATE stored_bytes SET total = total - old.size WHERE id = 1;
+END;
+"""
+
+
+def _normalize(value: Any) -> Any:
+    """Normalize request parameters so equivalent requests share one cache key."""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return str(value)
+
+
+def request_key(
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    payload: Optional[Dict[str, Any]] = None,
+    base_url: str = ""
+) -> str:
+    """Stable key for a host and endpoint plus its normalized query parameters and JSON body."""
+    canonical = json.dumps(
+        [method.upper(), base_url.rstrip("/"), path, _normalize(params or {}), _normalize(payload or {})],
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Persistent SQLite cache of raw Realtor JSON responses with per-endpoint TTLs.
+
+    The database runs in WAL mode with a busy timeout so several worker processes can share one
+    file; every thread gets its own connection. Bodies are zlib-compressed and the least recently
+    read entries are evicted once the stored size passes max_bytes. The stored size is kept in a
+    one-row table by triggers, so checking it on every write does not scan the responses.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = 10 * MINUTE,
+        max_bytes: int = 256 * 1024 * 1024
+    ):
+        self.path = path
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def ttl_for(self, path: str) -> float:
+        return self.ttls.get(path, self.default_ttl)
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[dict]:
+        """Return the cached response for key, or None if it is missing or expired."""
+        now = time.time()
+        row = self._connection().execute(
+            "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[1] <= now and not allow_stale):
+            self.misses += 1
+            return None
+        self._connection().execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return loads(zlib.decompress(row[0]))
+
+    def set(self, key: str, path: str, value: dict, ttl: Optional[float] = None) -> None:
+        """Store a response under key with the endpoint's TTL, then evict if over the size budget."""
+        now = time.time()
+        body = zlib.compress(dumps(value))
+        expires_at = now + (self.ttl_for(path) if ttl is None else ttl)
+        # an upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+        self._connection().execute(
+            "INSERT INTO responses (key, path, body, size, created_at, expires_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET path = excluded.path, body = excluded.body, size = excluded.size, "
+            "created_at = excluded.created_at, expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+            (key, path, body, len(body), now, expires_at, now)
+        )
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently read ones, until under max_bytes. Returns rows removed."""
+        connection = self._connection()
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            return 0
+        removed = connection.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),)).rowcount
+        total = self._stored_bytes()
+        target = int(self.max_bytes * 0.9)
+        if total > target:
+            rows = connection.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+            doomed = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                doomed.append((key,))
+                total -= size
+            connection.executemany("DELETE FROM responses WHERE key = ?", doomed)
+            removed += len(doomed)
+        return removed
+
+    def _stored_bytes(self) -> int:
+        return self._connection().execute("SELECT total FROM stored_bytes WHERE id = 1").fetchone()[0]
+
+    def clear(self) -> None:
+        self._connection().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for this process and the shared entry count and stored bytes."""
+        entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": self._stored_bytes(), "max_bytes": self.max_bytes}
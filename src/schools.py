@@ -0,0 +1,188 @@
+import threading
+import time
+
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import detail
+from .batch import afan_out, fan_out, unique_ids
+from .cache import TTLCache
+from .instrumentation import record_cache_hit
+from .projection import Table, table_from_records
+from .transport import RealtorTransport
+
+
+SCHOOL_INDEX_FIELDS = ("name", "rating", "parent_rating", "education_levels", "grades", "funding_type", "student_count")
+SCHOOL_INDEX_COLUMNS = ("school_id",) + SCHOOL_INDEX_FIELDS + ("lat", "lon", "properties", "nearest_miles")
+
+
+def _school_id(school: dict) -> Optional[str]:
+    """The school's id, or its name and coordinate when the payload carries no id."""
+    if school.get("id"):
+        return str(school["id"])
+    if not school.get("name"):
+        return None
+    coordinate = school.get("coordinate") or {}
+    return f"{school['name']}@{coordinate.get('lat')},{coordinate.get('lon')}"
+
+
+def _school_record(school_id: str, school: dict) -> dict:
+    coordinate = school.get("coordinate") or {}
+    record = {"school_id": school_id}
+    record.update((field, school.get(field)) for field in SCHOOL_INDEX_FIELDS)
+    record["lat"] = coordinate.get("lat")
+    record["lon"] = coordinate.get("lon")
+    return record
+
+
+class SchoolIndex:
+    """Local index of the schools near properties, each school stored once however many properties list it.
+
+    Schools are keyed by id and hold their ratings, grades, funding and location; every indexed property
+    maps to its (school id, distance in miles) pairs, since the distance is the only part of a nearby
+    school that depends on the property. A property's schools are fresh for max_age seconds after
+    its detail payload was last seen.
+    """
+
+    def __init__(self, max_age: float = 7 * 86400.0):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._schools: Dict[str, dict] = {}
+        self._properties: Dict[str, Tuple[float, List[Tuple[str, Optional[float]]]]] = {}
+        self._lock = threading.Lock()
+
+    def add_home(self, home: Optional[dict], property_id: Optional[str] = None) -> None:
+        """Index the nearby schools of a detail document."""
+        if not home:
+            return
+        property_id = property_id or home.get("property_id")
+        if not property_id:
+            return
+        schools = (home.get("nearby_schools") or {}).get("schools") or []
+        nearby = []
+        records = {}
+        for school in schools:
+            school_id = _school_id(school or {})
+            if school_id is None:
+                continue
+            records[school_id] = _school_record(school_id, school)
+            nearby.append((school_id, school.get("distance_in_miles")))
+        with self._lock:
+            self._schools.update(records)
+            self._properties[str(property_id)] = (time.time(), nearby)
+
+    def watch(self, transport: RealtorTransport) -> None:
+        """Index the schools of every detail payload that passes through transport."""
+        transport.add_response_listener(detail.DETAIL_PATH, lambda response_json: self.add_home(detail._home_from_response(response_json)))
+
+    def lookup(self, property_ids: Iterable[str]) -> Tuple[Dict[str, List[Tuple[str, Optional[float]]]], List[str]]:
+        """Return the fresh school mapping of each indexed property, and the ids that are missing or stale."""
+        now = time.time()
+        found, missing = {}, []
+        with self._lock:
+            for property_id in property_ids:
+                entry = self._properties.get(property_id)
+                if entry is not None and now - entry[0] < self.max_age:
+                    found[property_id] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(property_id)
+                    self.misses += 1
+        return found, missing
+
+    def nearby(self, property_ids: Iterable[str]) -> Dict[str, List[Tuple[str, Optional[float]]]]:
+        """Return the school mapping of each indexed property, fresh or not."""
+        with self._lock:
+            return {property_id: self._properties[property_id][1] for property_id in property_ids if property_id in self._properties}
+
+    def schools(self, school_ids: Iterable[str]) -> Dict[str, dict]:
+        with self._lock:
+            return {school_id: self._schools[school_id] for school_id in school_ids if school_id in self._schools}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "schools": len(self._schools), "properties": len(self._properties)}
+
+    def __len__(self) -> int:
+        return len(self._schools)
+
+
+def _schools_table(index: SchoolIndex, mapping: Dict[str, List[Tuple[str, Optional[float]]]]) -> Table:
+    """One row per distinct school, with how many of the properties list it and the nearest one's distance."""
+    counts: Dict[str, int] = {}
+    nearest: Dict[str, Optional[float]] = {}
+    for nearby in mapping.values():
+        for school_id, miles in nearby:
+            counts[school_id] = counts.get(school_id, 0) + 1
+            if miles is not None and (nearest.get(school_id) is None or miles < nearest[school_id]):
+                nearest[school_id] = miles
+    rows = []
+    for school_id, record in index.schools(counts).items():
+        row = dict(record)
+        row["properties"] = counts[school_id]
+        row["nearest_miles"] = nearest.get(school_id)
+        rows.append(row)
+    rows.sort(key=lambda row: (row["nearest_miles"] is None, row["nearest_miles"] or 0.0))
+    return table_from_records(rows, SCHOOL_INDEX_COLUMNS)
+
+
+def _plan(index: SchoolIndex, property_ids: List[str], refresh: bool) -> Tuple[List[str], Dict[str, list], List[str]]:
+    property_ids = unique_ids(property_ids)
+    if refresh:
+        return property_ids, {}, property_ids
+    found, missing = index.lookup(property_ids)
+    if found:
+        record_cache_hit("schools")
+    return property_ids, found, missing
+
+
+def _nearby_schools(index: SchoolIndex, property_ids: List[str], found: Dict[str, list], outcomes: Dict[str, dict]) -> Dict[str, Any]:
+    """Index the fetched details, then build the deduplicated table and the compact property mapping."""
+    unavailable = {}
+    for property_id, outcome in outcomes.items():
+        if outcome["status"] == "ok":
+            index.add_home(outcome["result"], property_id)
+        else:
+            unavailable[property_id] = outcome["status"]
+    found = {**found, **index.nearby(property_id for property_id in outcomes if property_id not in unavailable)}
+    mapping = {property_id: found[property_id] for property_id in property_ids if property_id in found}
+    result = {
+        "schools": _schools_table(index, mapping),
+        "property_schools": {property_id: [[school_id, miles] for school_id, miles in nearby] for property_id, nearby in mapping.items()},
+    }
+    if unavailable:
+        result["unavailable"] = unavailable
+    return result
+
+
+def get_nearby_schools_by_property_ids(
+    index: SchoolIndex,
+    transport: RealtorTransport,
+    property_ids: List[str],
+    detail_cache: Optional[TTLCache] = None,
+    refresh: bool = False,
+    max_concurrency: int = 8
+) -> Dict[str, Any]:
+    """Get the schools near many properties as one deduplicated table plus a property to school mapping.
+
+    Properties whose schools are fresh in the index are answered from it; the details of the others
+    are fetched concurrently.
+    """
+    property_ids, found, missing = _plan(index, property_ids, refresh)
+    fetch = partial(detail.get_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _nearby_schools(index, property_ids, found, fan_out(fetch, missing, max_concurrency))
+
+
+async def aget_nearby_schools_by_property_ids(
+    index: SchoolIndex,
+    transport: RealtorTransport,
+    property_ids: List[str],
+    detail_cache: Optional[TTLCache] = None,
+    refresh: bool = False,
+    max_concurrency: int = 8
+) -> Dict[str, Any]:
+    """Async counterpart of get_nearby_schools_by_property_ids."""
+    property_ids, found, missing = _plan(index, property_ids, refresh)
+    fetch = partial(detail.aget_property_detail, transport, detail_cache=detail_cache, refresh=refresh)
+    return _nearby_schools(index, property_ids, found, await afan_out(fetch, missing, max_concurrency))
@@ -0,0 +1,320 @@
+import math
+import threading
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import detail, listing
+from .batch import afan_out, fan_out, unique_ids
+from .cache import TTLCache
+from .listing import DEFAULT_STATUS
+from .listing_store import QUERY_COLUMNS, ListingStore
+from .projection import Table, column_values, table_from_records
+from .spatial import MILES_PER_DEGREE_LAT
+from .transport import RealtorTransport
+
+
+# numeric feature -> (store column, log-scaled)
+NUMERIC_FEATURES = {
+    "price": ("list_price", True),
+    "beds": ("beds", False),
+    "baths": ("baths", False),
+    "sqft": ("sqft", True),
+    "lot_sqft": ("lot_sqft", True),
+    "year_built": ("year_built", False),
+}
+DEFAULT_WEIGHTS = {
+    "price": 1.0,
+    "beds": 1.0,
+    "baths": 0.75,
+    "sqft": 1.0,
+    "lot_sqft": 0.25,
+    "year_built": 0.5,
+    "property_type": 1.0,
+    "location": 1.0,
+}
+_COLUMNS = ["property_id", "status", "property_type", "lat", "lon"] + [column for column, _ in NUMERIC_FEATURES.values()]
+MERGED_COLUMNS = ("seed_property_id", "property_id", "similarity_distance", "source") + QUERY_COLUMNS[1:]
+
+
+def _numbers(values: Sequence[Any]) -> np.ndarray:
+    """Values as a float array, NaN where a value is missing or not a number."""
+    numbers = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            numbers[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return numbers
+
+
+def _weights(overrides: Optional[Dict[str, float]]) -> Dict[str, float]:
+    weights = dict(DEFAULT_WEIGHTS)
+    if overrides:
+        unknown = set(overrides) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"unknown similarity features {sorted(unknown)}; expected some of {list(DEFAULT_WEIGHTS)}")
+        weights.update({name: float(value) for name, value in overrides.items()})
+    return weights
+
+
+class SimilarityEngine:
+    """k-nearest-neighbour search over the listings of a ListingStore on a NumPy feature matrix.
+
+    Raw features are kept per listing and picked up incrementally: every sync appends or updates
+    only the rows the store wrote since the previous one, and a full reload happens only after the
+    store removed listings. At query time the numeric features (price, sqft and lot size on a log
+    scale) are standardized, missing values land on the column mean, property type is one-hot, and
+    location is measured in units of location_scale_miles; each block is scaled by its weight, so
+    the squared distance between two homes is the weighted sum of their squared feature gaps.
+    """
+
+    def __init__(self, store: ListingStore, weights: Optional[Dict[str, float]] = None, location_scale_miles: float = 2.0, block_size: int = 256):
+        self.store = store
+        self.weights = _weights(weights)
+        self.location_scale_miles = location_scale_miles
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._row: Dict[str, int] = {}
+        self._property_ids = np.array([], dtype=object)
+        self._status = np.array([], dtype=object)
+        self._types = np.array([], dtype=object)
+        self._numeric = np.empty((0, len(NUMERIC_FEATURES)))
+        self._coordinates = np.empty((0, 2))
+        self._seen_at = float("-inf")
+        self._version = -1
+        self._deletions = self.store.deletions
+        self._matrix_key: Optional[tuple] = None
+        self._matrix: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self._property_ids)
+
+    def sync(self) -> int:
+        """Pick up rows the store wrote since the last sync. Returns the number of rows added or updated."""
+        with self._lock:
+            if self.store.deletions != self._deletions:
+                self._reset()
+            if self.store.version == self._version:
+                return 0
+            version = self.store.version
+            rows = self.store.rows_seen_since(self._seen_at, _COLUMNS)
+            self._version = version
+            if not rows["property_id"]:
+                return 0
+            self._seen_at = float(max(rows["seen_at"]))
+            numeric = np.column_stack([
+                np.log1p(np.clip(_numbers(rows[column]), 0, None)) if log_scaled else _numbers(rows[column])
+                for column, log_scaled in NUMERIC_FEATURES.values()
+            ])
+            coordinates = np.column_stack([_numbers(rows["lat"]), _numbers(rows["lon"])])
+            ids = np.array(rows["property_id"], dtype=object)
+            status = np.array(rows["status"], dtype=object)
+            types = np.array(rows["property_type"], dtype=object)
+            positions = np.array([self._row.get(property_id, -1) for property_id in ids])
+            known = positions >= 0
+            if known.any():
+                self._status[positions[known]] = status[known]
+                self._types[positions[known]] = types[known]
+                self._numeric[positions[known]] = numeric[known]
+                self._coordinates[positions[known]] = coordinates[known]
+            new = ~known
+            if new.any():
+                start = len(self._property_ids)
+                new_ids = ids[new]
+                self._row.update({property_id: start + i for i, property_id in enumerate(new_ids)})
+                self._property_ids = np.concatenate([self._property_ids, new_ids])
+                self._status = np.concatenate([self._status, status[new]])
+                self._types = np.concatenate([self._types, types[new]])
+                self._numeric = np.vstack([self._numeric, numeric[new]])
+                self._coordinates = np.vstack([self._coordinates, coordinates[new]])
+            self._matrix_key = None
+            return len(ids)
+
+    def _feature_matrix(self, weights: Dict[str, float]) -> np.ndarray:
+        key = (self._version, tuple(sorted(weights.items())), self.location_scale_miles)
+        if self._matrix_key == key:
+            return self._matrix
+        blocks = []
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nanmean(self._numeric, axis=0) if len(self) else np.zeros(len(NUMERIC_FEATURES))
+            std = np.nanstd(self._numeric, axis=0) if len(self) else np.ones(len(NUMERIC_FEATURES))
+        std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+        standardized = np.nan_to_num((self._numeric - np.nan_to_num(mean)) / std)
+        blocks.append(standardized * np.array([weights[name] for name in NUMERIC_FEATURES]))
+
+        types = np.array([t if isinstance(t, str) else "" for t in self._types], dtype=object)
+        vocabulary = sorted(set(types))
+        if vocabulary:
+            one_hot = (types[:, None] == np.array(vocabulary, dtype=object)[None, :]).astype(float)
+            # two differing one-hot entries add 2 * w^2 to the squared distance, so scale by w / sqrt(2)
+            blocks.append(one_hot * weights["property_type"] / math.sqrt(2))
+
+        coordinates = self._coordinates
+        finite = np.isfinite(coordinates).all(axis=1)
+        mean_lat = float(np.mean(coordinates[finite, 0])) if finite.any() else 0.0
+        miles = np.column_stack([
+            coordinates[:, 0] * MILES_PER_DEGREE_LAT,
+            coordinates[:, 1] * MILES_PER_DEGREE_LAT * math.cos(math.radians(mean_lat)),
+        ])
+        # homes without coordinates sit at the centroid rather than at (0, 0)
+        centroid = miles[finite].mean(axis=0) if finite.any() else np.zeros(2)
+        miles[~finite] = centroid
+        blocks.append((miles - centroid) / self.location_scale_miles * weights["location"])
+
+        self._matrix = np.hstack(blocks)
+        self._matrix_key = key
+        return self._matrix
+
+    def similar(
+        self,
+        property_ids: Sequence[str],
+        k: int = 10,
+        weights: Optional[Dict[str, float]] = None,
+        status: Optional[Sequence[str]] = DEFAULT_STATUS
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """Return, per seed property id, up to k (property_id, distance) pairs of the nearest listings.
+
+        Seeds are scored in blocks of block_size against the whole matrix; candidates are limited
+        to the given listing statuses and never include the seed itself. Seeds the engine has not
+        seen map to an empty list.
+        """
+        self.sync()
+        with self._lock:
+            seeds = [property_id for property_id in unique_ids(property_ids) if property_id in self._row]
+            results: Dict[str, List[Tuple[str, float]]] = {str(property_id): [] for property_id in property_ids}
+            if not seeds or k <= 0:
+                return results
+            matrix = self._feature_matrix(_weights({**self.weights, **(weights or {})}))
+            allowed = np.isin(self._status, list(status)) if status else np.ones(len(self), dtype=bool)
+            candidates = np.flatnonzero(allowed)
+            if not len(candidates):
+                return results
+            pool = matrix[candidates]
+            pool_norms = np.einsum("ij,ij->i", pool, pool)
+            for start in range(0, len(seeds), self.block_size):
+                block = seeds[start:start + self.block_size]
+                rows = np.array([self._row[property_id] for property_id in block])
+                queries = matrix[rows]
+                squared = np.einsum("ij,ij->i", queries, queries)[:, None] + pool_norms[None, :] - 2 * queries @ pool.T
+                squared[candidates[None, :] == rows[:, None]] = np.inf
+                take = min(k, len(candidates))
+                nearest = np.argpartition(squared, take - 1, axis=1)[:, :take] if take < len(candidates) else np.tile(np.arange(len(candidates)), (len(block), 1))
+                for seed, row_squared, row_nearest in zip(block, squared, nearest):
+                    order = row_nearest[np.argsort(row_squared[row_nearest], kind="stable")]
+                    results[seed] = [
+                        (self._property_ids[candidates[i]], float(np.sqrt(max(row_squared[i], 0.0))))
+                        for i in order if np.isfinite(row_squared[i])
+                    ]
+            return results
+
+
+def _seed_postal_codes(store: ListingStore, property_ids: Sequence[str]) -> List[str]:
+    locations = (store.location(property_id) for property_id in property_ids)
+    return unique_ids(location[2] for location in locations if location is not None and location[2])
+
+
+def _merged(
+    engine: SimilarityEngine,
+    property_ids: Sequence[str],
+    k: int,
+    weights: Optional[Dict[str, float]],
+    remote: Dict[str, List[str]]
+) -> Table:
+    """Rank local neighbours together with remote similar homes, each listing once per seed."""
+    local = engine.similar(property_ids, k, weights)
+    ranked = []
+    for seed in unique_ids(property_ids):
+        sources: Dict[str, str] = {property_id: "local" for property_id, _ in local.get(seed, [])}
+        for property_id in remote.get(seed, []):
+            if property_id != seed:
+                sources[property_id] = "both" if property_id in sources else "remote"
+        # remote homes are scored as well, so the merged list is ordered by one distance
+        scored = dict(local.get(seed, []))
+        if len(sources) > len(scored):
+            scored.update(engine.similar([seed], len(engine), weights, status=None).get(seed, []))
+        for property_id, source in sources.items():
+            distance = scored.get(property_id)
+            ranked.append({
+                "seed_property_id": seed,
+                "property_id": property_id,
+                "similarity_distance": None if distance is None else round(distance, 3),
+                "source": source,
+            })
+    if not ranked:
+        return table_from_records([], MERGED_COLUMNS[:4])
+    # by seed, then by distance with unscored homes last
+    ranked.sort(key=lambda row: (row["seed_property_id"], row["similarity_distance"] is None, row["similarity_distance"] or 0.0))
+    listings = {
+        record["property_id"]: record
+        for record in engine.store.query_records(status=None, property_ids=unique_ids(row["property_id"] for row in ranked), limit=None)
+    }
+    return table_from_records(
+        [dict(row, **{column: listings.get(row["property_id"], {}).get(column) for column in QUERY_COLUMNS[1:]}) for row in ranked],
+        MERGED_COLUMNS
+    )
+
+
+def _remote_ids(outcomes: Dict[str, Dict[str, Any]]) -> Dict[str, List[str]]:
+    return {
+        seed: [str(property_id) for property_id in column_values(outcome["result"], "property_id") if property_id is not None]
+        for seed, outcome in outcomes.items()
+        if outcome["status"] == "ok"
+    }
+
+
+def get_similar_listings_by_property_ids(
+    engine: SimilarityEngine,
+    transport: RealtorTransport,
+    property_ids: Sequence[str],
+    k: int = 10,
+    weights: Optional[Dict[str, float]] = None,
+    include_remote: bool = False,
+    detail_cache: Optional[TTLCache] = None,
+    max_concurrency: int = 8
+) -> Table:
+    """Return the k most similar listings for every seed property id from the local engine.
+
+    Seeds missing from the listing store are added from their detail document, and their postal
+    codes are synced so there are neighbours to rank. With include_remote the remote similar-homes
+    results are merged in, de-duplicated, and flagged in a 'source' column.
+    """
+    store = engine.store
+    property_ids = unique_ids(property_ids)
+    missing = [property_id for property_id in property_ids if store.location(property_id) is None]
+    for outcome in fan_out(lambda property_id: detail.get_property_detail(transport, property_id, detail_cache), missing, max_concurrency).values():
+        if outcome["status"] == "ok":
+            store.add_records([outcome["result"]])
+    store.refresh(transport, _seed_postal_codes(store, property_ids), DEFAULT_STATUS, max_concurrency)
+    remote = {}
+    if include_remote:
+        remote = _remote_ids(fan_out(lambda property_id: listing.get_similar_listings_by_property_id(transport, property_id, ["property_id"]), property_ids, max_concurrency))
+    return _merged(engine, property_ids, k, weights, remote)
+
+
+async def aget_similar_listings_by_property_ids(
+    engine: SimilarityEngine,
+    transport: RealtorTransport,
+    property_ids: Sequence[str],
+    k: int = 10,
+    weights: Optional[Dict[str, float]] = None,
+    include_remote: bool = False,
+    detail_cache: Optional[TTLCache] = None,
+    max_concurrency: int = 8
+) -> Table:
+    """Async counterpart of get_similar_listings_by_property_ids."""
+    store = engine.store
+    property_ids = unique_ids(property_ids)
+    missing = [property_id for property_id in property_ids if store.location(property_id) is None]
+    for outcome in (await afan_out(lambda property_id: detail.aget_property_detail(transport, property_id, detail_cache), missing, max_concurrency)).values():
+        if outcome["status"] == "ok":
+            store.add_records([outcome["result"]])
+    await store.arefresh(transport, _seed_postal_codes(store, property_ids), DEFAULT_STATUS, max_concurrency)
+    remote = {}
+    if include_remote:
+        remote = _remote_ids(await afan_out(lambda property_id: listing.aget_similar_listings_by_property_id(transport, property_id, ["property_id"]), property_ids, max_concurrency))
+    return _merged(engine, property_ids, k, weights, remote)
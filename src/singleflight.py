@@ -0,0 +1,109 @@
+import asyncio
+import threading
+
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leading asyncio task was cancelled, so waiters run the call themselves."""
+
+
+class SingleFlight:
+    """Coalesce identical in-flight calls so that concurrent callers share one execution.
+
+    The first caller for a key leads and runs the call; callers arriving while it is in flight wait
+    for its outcome instead, receiving the same result or the same exception. A flight is a
+    concurrent.futures.Future, so threads block on it and asyncio tasks await it through
+    asyncio.wrap_future, and the two kinds of caller can share one flight. The key is forgotten as
+    soon as the call finishes, so nothing is cached beyond the lifetime of the request.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.led = 0
+        self.coalesced = 0
+
+    def _join(self, key: Hashable) -> Tuple[Future, bool]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = Future()
+            self.led += 1
+            return flight, True
+
+    def _land(self, key: Hashable, flight: Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def do(self, key: Hashable, fn: Callable[[], Any], on_coalesced: Callable[[], None] = None, timeout: Optional[float] = None) -> Any:
+        """Run fn for key, or wait for the identical call already in flight.
+
+        A waiter gives up with TimeoutError after timeout seconds; the flight itself carries on.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # blocking on a flight led by a task of this very loop would deadlock it
+            return fn()
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                break
+            if on_coalesced is not None:
+                on_coalesced()
+            try:
+                return flight.result(timeout)
+            except _LeaderCancelled:
+                continue
+            except FutureTimeoutError:
+                raise TimeoutError(f"gave up waiting for the in-flight call after {timeout}s") from None
+        try:
+            result = fn()
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            self._land(key, flight)
+
+    async def ado(self, key: Hashable, afn: Callable[[], Awaitable[Any]], on_coalesced: Callable[[], None] = None, timeout: Optional[float] = None) -> Any:
+        """Async counterpart of do."""
+        while True:
+            flight, leader = self._join(key)
+            if leader:
+                break
+            if on_coalesced is not None:
+                on_coalesced()
+            try:
+                # shield so that cancelling one waiter leaves the shared flight untouched
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(flight)), timeout)
+            except _LeaderCancelled:
+                continue
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"gave up waiting for the in-flight call after {timeout}s") from None
+        try:
+            result = await afn()
+        except asyncio.CancelledError:
+            flight.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            self._land(key, flight)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"led": self.led, "coalesced": self.coalesced, "in_flight": len(self._flights)}
@@ -0,0 +1,278 @@
+import math
+import re
+import threading
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import autocomplete, detail
+from .cache import TTLCache
+from .listing import DEFAULT_STATUS
+from .listing_store import QUERY_COLUMNS, ListingStore
+from .projection import Table, table_from_records
+from .resolver import AddressIndex
+from .transport import RealtorTransport
+
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+
+_PROPERTY_ID = re.compile(r"^\d{6,}$")
+_TRAILING_POSTAL_CODE = re.compile(r"\b(\d{5})(?:-\d{4})?\s*$")
+_ROW_STRIDE = 1 << 20
+# how far past its postal code's stored listings a circle must reach before neighbors are synced
+NEIGHBOR_MARGIN_MILES = 1.0
+RANKED_COLUMNS = ("property_id", "distance_miles") + QUERY_COLUMNS[1:]
+
+
+def haversine_miles(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in miles from one point to arrays of points."""
+    lat1 = math.radians(lat)
+    lats2 = np.radians(lats)
+    dlat = lats2 - lat1
+    dlon = np.radians(lons) - math.radians(lon)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lats2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _degree_box(lat: float, radius_miles: float) -> Tuple[float, float]:
+    """Half-height and half-width in degrees of the box enclosing a circle of radius_miles at lat."""
+    dlat = radius_miles / MILES_PER_DEGREE_LAT
+    return dlat, dlat / max(math.cos(math.radians(lat)), 1e-6)
+
+
+def _cell_keys(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return rows.astype(np.int64) * _ROW_STRIDE + cols.astype(np.int64) + _ROW_STRIDE // 2
+
+
+class SpatialIndex:
+    """Uniform lat/lon grid over listing coordinates.
+
+    Points are sorted by grid cell key, so the cells of one grid row inside a query box form a
+    contiguous slice found with two binary searches. Candidates from those slices are then
+    measured with a vectorized haversine and cut to the exact radius.
+    """
+
+    def __init__(self, property_ids: Sequence[str], lats: Sequence[float], lons: Sequence[float], cell_degrees: float = 0.01):
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        self.cell_degrees = cell_degrees
+        keys = _cell_keys(np.floor(lats / cell_degrees), np.floor(lons / cell_degrees))
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._property_ids = np.asarray(property_ids, dtype=object)[order]
+        self._lats = lats[order]
+        self._lons = lons[order]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def within(self, lat: float, lon: float, radius_miles: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the property ids within radius_miles of (lat, lon) and their distances, nearest first."""
+        if not len(self) or radius_miles < 0:
+            return np.array([], dtype=object), np.array([], dtype=float)
+        dlat, dlon = _degree_box(lat, radius_miles)
+        cell = self.cell_degrees
+        rows = np.arange(math.floor((lat - dlat) / cell), math.floor((lat + dlat) / cell) + 1)
+        starts = np.searchsorted(self._keys, _cell_keys(rows, np.full_like(rows, math.floor((lon - dlon) / cell))), "left")
+        ends = np.searchsorted(self._keys, _cell_keys(rows, np.full_like(rows, math.floor((lon + dlon) / cell))), "right")
+        candidates = np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])
+        distances = haversine_miles(lat, lon, self._lats[candidates], self._lons[candidates])
+        keep = distances <= radius_miles
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return self._property_ids[candidates[order]], distances[order]
+
+
+class ListingLocator:
+    """Keeps a SpatialIndex over a ListingStore, rebuilt lazily after the store changes."""
+
+    def __init__(self, store: ListingStore, cell_degrees: float = 0.01):
+        self.store = store
+        self.cell_degrees = cell_degrees
+        self._index: Optional[SpatialIndex] = None
+        self._version = -1
+        self._lock = threading.Lock()
+
+    def index(self) -> SpatialIndex:
+        with self._lock:
+            version = self.store.version
+            if self._index is None or version != self._version:
+                self._index = SpatialIndex(*self.store.coordinates(), cell_degrees=self.cell_degrees)
+                self._version = version
+            return self._index
+
+
+def _location_from_home(home: dict) -> Optional[Tuple[float, float, Optional[str]]]:
+    address = ((home or {}).get("location") or {}).get("address") or {}
+    coordinate = address.get("coordinate") or {}
+    if coordinate.get("lat") is None or coordinate.get("lon") is None:
+        return None
+    return float(coordinate["lat"]), float(coordinate["lon"]), address.get("postal_code")
+
+
+def _postal_code_hint(address_or_property_id: str) -> Optional[str]:
+    match = _TRAILING_POSTAL_CODE.search(str(address_or_property_id))
+    return match.group(1) if match else None
+
+
+def _origin(address_or_property_id: str, property_id: str, location: Optional[Tuple[float, float, Optional[str]]]) -> Tuple[str, float, float, Optional[str]]:
+    if location is None:
+        raise ValueError(f"could not find coordinates for {address_or_property_id!r}")
+    lat, lon, postal_code = location
+    return property_id, lat, lon, postal_code or _postal_code_hint(address_or_property_id)
+
+
+def locate(
+    store: ListingStore,
+    transport: RealtorTransport,
+    address_or_property_id: str,
+    detail_cache: Optional[TTLCache] = None,
+    address_index: Optional[AddressIndex] = None
+) -> Tuple[str, float, float, Optional[str]]:
+    """Resolve an address or property id to (property_id, lat, lon, postal_code).
+
+    Coordinates come from the listing store when the property is stored, else from its detail document.
+    """
+    text = str(address_or_property_id).strip()
+    property_id = text if _PROPERTY_ID.match(text) else autocomplete.get_property_id(transport, text, address_index)
+    if not property_id:
+        raise ValueError(f"could not resolve {address_or_property_id!r} to a property")
+    location = store.location(property_id)
+    if location is None:
+        location = _location_from_home(detail.get_property_detail(transport, property_id, detail_cache))
+    return _origin(text, property_id, location)
+
+
+async def alocate(
+    store: ListingStore,
+    transport: RealtorTransport,
+    address_or_property_id: str,
+    detail_cache: Optional[TTLCache] = None,
+    address_index: Optional[AddressIndex] = None
+) -> Tuple[str, float, float, Optional[str]]:
+    """Async counterpart of locate."""
+    text = str(address_or_property_id).strip()
+    property_id = text if _PROPERTY_ID.match(text) else await autocomplete.aget_property_id(transport, text, address_index)
+    if not property_id:
+        raise ValueError(f"could not resolve {address_or_property_id!r} to a property")
+    location = store.location(property_id)
+    if location is None:
+        location = _location_from_home(await detail.aget_property_detail(transport, property_id, detail_cache))
+    return _origin(text, property_id, location)
+
+
+def neighbor_postal_codes(postal_code: str, count: int) -> List[str]:
+    """Numerically adjacent postal codes within the same three-digit sectional center, closest first.
+
+    ZIP codes are assigned outward from a sectional center, so close numbers are usually close on
+    the map; this is a heuristic, not a boundary lookup.
+    """
+    if not postal_code or not postal_code.isdigit() or len(postal_code) != 5:
+        return []
+    number, prefix = int(postal_code), postal_code[:3]
+    neighbors: List[str] = []
+    for step in range(1, 100):
+        for candidate in (number - step, number + step):
+            code = f"{candidate:05d}"
+            if 0 <= candidate <= 99999 and code[:3] == prefix and len(neighbors) < count:
+                neighbors.append(code)
+        if len(neighbors) >= count:
+            break
+    return neighbors
+
+
+def _crosses_extent(extent: Optional[Tuple[float, float, float, float]], lat: float, lon: float, radius_miles: float, margin_miles: float = NEIGHBOR_MARGIN_MILES) -> bool:
+    """Whether the circle around (lat, lon) reaches more than margin_miles past the stored listings of the origin postal code.
+
+    The extent is the bounding box of the listings, which sits inside the postal code, so nearly any
+    circle pokes out of it a little; the margin keeps those from counting.
+    """
+    if extent is None:
+        return True
+    min_lat, min_lon, max_lat, max_lon = extent
+    mlat, mlon = _degree_box(lat, margin_miles)
+    dlat, dlon = _degree_box(lat, radius_miles)
+    return (
+        lat - dlat < min_lat - mlat or lat + dlat > max_lat + mlat
+        or lon - dlon < min_lon - mlon or lon + dlon > max_lon + mlon
+    )
+
+
+def _ranked(store: ListingStore, property_ids: np.ndarray, distances: np.ndarray, origin_id: str, status: Sequence[str], limit: Optional[int], filters: dict) -> Table:
+    keep = property_ids != origin_id
+    miles = dict(zip(property_ids[keep].tolist(), np.round(distances[keep], 2).tolist()))
+    records = store.query_records(status=status, property_ids=list(miles), limit=None, **filters)
+    ranked = sorted(
+        ({"property_id": record["property_id"], "distance_miles": miles[record["property_id"]], **record} for record in records),
+        key=lambda record: (record["distance_miles"], record["property_id"])
+    )
+    if limit is not None:
+        ranked = ranked[:max(0, int(limit))]
+    return table_from_records(ranked, RANKED_COLUMNS)
+
+
+def listings_near(
+    locator: ListingLocator,
+    transport: RealtorTransport,
+    address_or_property_id: str,
+    radius_miles: float,
+    limit: Optional[int] = None,
+    detail_cache: Optional[TTLCache] = None,
+    address_index: Optional[AddressIndex] = None,
+    status: Sequence[str] = DEFAULT_STATUS,
+    max_concurrency: int = 4,
+    include_neighbors: bool = False,
+    max_neighbor_postal_codes: int = 4,
+    **filters: Any
+) -> Table:
+    """Return stored listings within radius_miles of an address or property id, nearest first.
+
+    The origin's postal code is synced into the store first. With include_neighbors, when the circle
+    reaches well past the extent of its stored listings, neighbor_postal_codes are synced as well;
+    each costs a listing search, and numeric neighbors are not always geographic ones. filters are
+    the ListingStore.query filters.
+    """
+    store = locator.store
+    hint = _postal_code_hint(address_or_property_id)
+    if hint:
+        # syncing the address's own postal code first usually lets the origin resolve from the store
+        store.refresh(transport, [hint], status, max_concurrency)
+    origin_id, lat, lon, postal_code = locate(store, transport, address_or_property_id, detail_cache, address_index)
+    if postal_code:
+        store.raise_for_unsynced(store.refresh(transport, [postal_code], status, max_concurrency), status)
+        if include_neighbors and _crosses_extent(store.postal_code_extent(postal_code), lat, lon, radius_miles):
+            # neighbors are best effort: a neighbor that fails to sync only narrows the search
+            store.refresh(transport, neighbor_postal_codes(postal_code, max_neighbor_postal_codes), status, max_concurrency)
+    property_ids, distances = locator.index().within(lat, lon, radius_miles)
+    return _ranked(store, property_ids, distances, origin_id, status, limit, filters)
+
+
+async def alistings_near(
+    locator: ListingLocator,
+    transport: RealtorTransport,
+    address_or_property_id: str,
+    radius_miles: float,
+    limit: Optional[int] = None,
+    detail_cache: Optional[TTLCache] = None,
+    address_index: Optional[AddressIndex] = None,
+    status: Sequence[str] = DEFAULT_STATUS,
+    max_concurrency: int = 4,
+    include_neighbors: bool = False,
+    max_neighbor_postal_codes: int = 4,
+    **filters: Any
+) -> Table:
+    """Async counterpart of listings_near."""
+    store = locator.store
+    hint = _postal_code_hint(address_or_property_id)
+    if hint:
+        # syncing the address's own postal code first usually lets the origin resolve from the store
+        await store.arefresh(transport, [hint], status, max_concurrency)
+    origin_id, lat, lon, postal_code = await alocate(store, transport, address_or_property_id, detail_cache, address_index)
+    if postal_code:
+        store.raise_for_unsynced(await store.arefresh(transport, [postal_code], status, max_concurrency), status)
+        if include_neighbors and _crosses_extent(store.postal_code_extent(postal_code), lat, lon, radius_miles):
+            await store.arefresh(transport, neighbor_postal_codes(postal_code, max_neighbor_postal_codes), status, max_concurrency)
+    property_ids, distances = locator.index().within(lat, lon, radius_miles)
+    return _ranked(store, property_ids, distances, origin_id, status, limit, filters)
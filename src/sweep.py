@@ -0,0 +1,321 @@
+"""Bulk ingestion of listings and listing details for many postal codes into partitioned Parquet.
+
+Postal codes are spread over worker processes, each running its listing and detail requests on
+asyncio. Every process draws from one rate governor whose state lives in a file under the output
+directory, so --rate-limit and --monthly-quota hold for the whole sweep. Progress is checkpointed per
+postal code and per property, so an interrupted sweep picks up where it stopped when rerun:
+
+    python -m src.sweep --postal-codes 33019,33020,33021 --out sweep/ --processes 4
+    python -m src.sweep --postal-codes-file zips.txt --out sweep/ --no-details --monthly-quota 50000
+
+Listings land in <out>/listings/postal_code=<zip>/ and details in <out>/details/postal_code=<zip>/,
+readable as one dataset with pandas.read_parquet(<out>/listings). Writing Parquet needs pyarrow on top of
+the agent's own dependencies (pip install pyarrow); the sweep checks for it before sending any request.
+"""
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import os
+import sqlite3
+import time
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import pandas as pd
+
+from .batch import afan_out, unique_ids
+from .detail import _listing_details_from_outcomes, aget_property_detail
+from .governor import RateGovernor
+from .listing import DEFAULT_STATUS, asearch_listings
+from .projection import column_values
+from .transport import REALTOR_BASE_URL, RealtorTransport
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postal_codes (
+    postal_code TEXT PRIMARY KEY,
+    listings INTEGER,
+    listed_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS properties (
+    property_id TEXT PRIMARY KEY,
+    postal_code TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS properties_postal_code ON properties (postal_code);
+"""
+
+
+class SweepCheckpoint:
+    """Per-postal-code and per-property progress of a sweep, kept in SQLite beside its output.
+
+    A postal code is listed once its listings partition is written and finished once every listing
+    in it has its details written; a property is recorded once its detail row is written. Each
+    worker process opens its own connection and WAL mode lets them commit side by side.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=60.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def unfinished(self, postal_codes: Iterable[str]) -> List[str]:
+        finished = {row[0] for row in self._conn.execute("SELECT postal_code FROM postal_codes WHERE finished_at IS NOT NULL")}
+        return [postal_code for postal_code in unique_ids(postal_codes) if postal_code not in finished]
+
+    def listed(self, postal_code: str) -> bool:
+        row = self._conn.execute("SELECT listed_at FROM postal_codes WHERE postal_code = ?", (postal_code,)).fetchone()
+        return row is not None and row[0] is not None
+
+    def mark_listed(self, postal_code: str, listings: int) -> None:
+        self._conn.execute(
+            "INSERT INTO postal_codes (postal_code, listings, listed_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(postal_code) DO UPDATE SET listings = excluded.listings, listed_at = excluded.listed_at",
+            (postal_code, listings, time.time())
+        )
+
+    def fetched(self, postal_code: str) -> Set[str]:
+        return {row[0] for row in self._conn.execute("SELECT property_id FROM properties WHERE postal_code = ?", (postal_code,))}
+
+    def mark_fetched(self, postal_code: str, property_ids: Sequence[str]) -> None:
+        now = time.time()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO properties (property_id, postal_code, fetched_at) VALUES (?, ?, ?)",
+                [(property_id, postal_code, now) for property_id in property_ids]
+            )
+
+    def mark_finished(self, postal_code: str) -> None:
+        self._conn.execute("UPDATE postal_codes SET finished_at = ? WHERE postal_code = ?", (time.time(), postal_code))
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _write_partition(frame: pd.DataFrame, root: str, postal_code: str, basename: str, replace: bool = False) -> None:
+    """Write frame under root/postal_code=<postal_code>/, replacing the partition's files when replace is set."""
+    frame.assign(postal_code=postal_code).to_parquet(
+        root, partition_cols=["postal_code"], index=False, basename_template=basename + "-{i}.parquet",
+        existing_data_behavior="delete_matching" if replace else "overwrite_or_ignore"
+    )
+
+
+def _chunk_name(property_ids: Sequence[str]) -> str:
+    # named after its contents, so a chunk rewritten after a crash replaces its earlier copy
+    return "details-" + hashlib.md5(",".join(property_ids).encode()).hexdigest()[:16]
+
+
+class _Worker:
+    """The transport and checkpoint connection of one sweep process."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        governor = RateGovernor(
+            rate=options["rate_limit"], burst=options["rate_burst"], monthly_quota=options["monthly_quota"],
+            state_path=os.path.join(options["out_dir"], "governor.json"), max_wait=options["max_wait"]
+        )
+        self.transport = RealtorTransport(
+            options["api_key"], base_url=options["base_url"], pool_size=options["max_concurrency"],
+            max_retries=options["max_retries"], governor=governor
+        )
+        self.checkpoint = SweepCheckpoint(os.path.join(options["out_dir"], "checkpoint.db"))
+
+    async def _listing_ids(self, postal_code: str) -> Optional[List[str]]:
+        """List the postal code unless a previous run already did, returning its property ids."""
+        options = self.options
+        listings_root = os.path.join(options["out_dir"], "listings")
+        if self.checkpoint.listed(postal_code):
+            if not options["details"]:
+                return []
+            partition = os.path.join(listings_root, f"postal_code={postal_code}")
+            if not os.path.isdir(partition):
+                return []
+            stored = pd.read_parquet(partition, columns=["property_id"])
+            return [str(pid) for pid in stored["property_id"].dropna()]
+        listings = await asearch_listings(
+            self.transport, postal_code, options["status"], options["page_size"], options["max_results"],
+            options["max_concurrency"], options["fields"]
+        )
+        if len(listings):
+            _write_partition(listings, listings_root, postal_code, "listings", replace=True)
+        self.checkpoint.mark_listed(postal_code, len(listings))
+        return [str(pid) for pid in column_values(listings, "property_id") if pid is not None and pid == pid]
+
+    async def asweep(self, postal_code: str) -> Dict[str, Any]:
+        options = self.options
+        started = time.perf_counter()
+        result = {"postal_code": postal_code, "listings": 0, "details": 0, "detail_errors": 0, "error": None}
+        try:
+            listed_before = self.checkpoint.listed(postal_code)
+            property_ids = await self._listing_ids(postal_code)
+            if not listed_before:
+                result["listings"] = len(property_ids)
+            if options["details"]:
+                done = self.checkpoint.fetched(postal_code)
+                pending = sorted(pid for pid in unique_ids(property_ids) if pid not in done)
+                fetch = partial(aget_property_detail, self.transport)
+                details_root = os.path.join(options["out_dir"], "details")
+                for start in range(0, len(pending), options["chunk_size"]):
+                    chunk = pending[start:start + options["chunk_size"]]
+                    outcomes = await afan_out(fetch, chunk, options["max_concurrency"])
+                    fetched = {pid: outcome for pid, outcome in outcomes.items() if outcome["status"] != "error"}
+                    if fetched:
+                        details = _listing_details_from_outcomes(fetched, options["detail_fields"])
+                        _write_partition(details, details_root, postal_code, _chunk_name(chunk))
+                        self.checkpoint.mark_fetched(postal_code, list(fetched))
+                    result["details"] += len(fetched)
+                    result["detail_errors"] += len(outcomes) - len(fetched)
+            if not result["detail_errors"]:
+                self.checkpoint.mark_finished(postal_code)
+        except Exception as exc:
+            result["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            await self.transport.aclose()
+        result["seconds"] = time.perf_counter() - started
+        return result
+
+    def sweep(self, postal_code: str) -> Dict[str, Any]:
+        return asyncio.run(self.asweep(postal_code))
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(options: Dict[str, Any]) -> None:
+    global _worker
+    _worker = _Worker(options)
+
+
+def _sweep_in_worker(postal_code: str) -> Dict[str, Any]:
+    return _worker.sweep(postal_code)
+
+
+def run_sweep(
+    postal_codes: Iterable[str],
+    out_dir: str,
+    api_key: str,
+    processes: int = 4,
+    max_concurrency: int = 16,
+    details: bool = True,
+    status: Sequence[str] = DEFAULT_STATUS,
+    max_results: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    detail_fields: Optional[Sequence[str]] = None,
+    base_url: str = REALTOR_BASE_URL,
+    rate_limit: float = 5.0,
+    rate_burst: int = 10,
+    monthly_quota: Optional[int] = None,
+    max_retries: int = 5,
+    max_wait: float = 300.0,
+    page_size: int = 200,
+    chunk_size: int = 200,
+    progress: Optional[Callable[[Dict[str, Any], Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """Sweep listings, and unless details is False their detail documents, for every postal code into out_dir.
+
+    Postal codes finished by an earlier run into the same out_dir are skipped, as are properties whose
+    details were already written. progress, if given, is called with each postal code's result and
+    the running totals. Returns the totals, including listings_per_second. Raises ImportError when
+    pyarrow, which writes the Parquet partitions, is not installed.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("the sweep writes Parquet and needs pyarrow: pip install pyarrow")
+    os.makedirs(out_dir, exist_ok=True)
+    checkpoint = SweepCheckpoint(os.path.join(out_dir, "checkpoint.db"))
+    todo = checkpoint.unfinished(postal_codes)
+    checkpoint.close()
+    options = {
+        "out_dir": out_dir, "api_key": api_key, "base_url": base_url, "max_concurrency": max_concurrency,
+        "details": details, "status": list(status), "max_results": max_results, "fields": fields,
+        "detail_fields": detail_fields, "rate_limit": rate_limit, "rate_burst": rate_burst,
+        "monthly_quota": monthly_quota, "max_retries": max_retries, "max_wait": max_wait,
+        "page_size": page_size, "chunk_size": chunk_size,
+    }
+    totals = {"postal_codes": len(todo), "finished": 0, "failed": 0, "listings": 0, "details": 0, "detail_errors": 0}
+    started = time.perf_counter()
+
+    def record(result: Dict[str, Any]) -> None:
+        totals["failed"] += result["error"] is not None or result["detail_errors"] > 0
+        totals["finished"] += result["error"] is None and result["detail_errors"] == 0
+        for key in ("listings", "details", "detail_errors"):
+            totals[key] += result[key]
+        totals["seconds"] = time.perf_counter() - started
+        totals["listings_per_second"] = totals["listings"] / totals["seconds"] if totals["seconds"] else 0.0
+        totals["details_per_second"] = totals["details"] / totals["seconds"] if totals["seconds"] else 0.0
+        if progress is not None:
+            progress(result, totals)
+
+    if processes <= 1:
+        worker = _Worker(options)
+        for postal_code in todo:
+            record(worker.sweep(postal_code))
+        worker.checkpoint.close()
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(options,)) as executor:
+            futures = [executor.submit(_sweep_in_worker, postal_code) for postal_code in todo]
+            try:
+                for future in as_completed(futures):
+                    record(future.result())
+            except KeyboardInterrupt:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    totals["seconds"] = time.perf_counter() - started
+    totals["listings_per_second"] = totals["listings"] / totals["seconds"] if totals["seconds"] else 0.0
+    totals["details_per_second"] = totals["details"] / totals["seconds"] if totals["seconds"] else 0.0
+    return totals
+
+
+def _print_progress(result: Dict[str, Any], totals: Dict[str, Any]) -> None:
+    outcome = result["error"] or (f"{result['detail_errors']} detail errors" if result["detail_errors"] else "ok")
+    print(f"{result['postal_code']:<8}{result['listings']:>8} listings{result['details']:>8} details{result['seconds']:>8.1f}s  {outcome}"
+          f"   [{totals['finished'] + totals['failed']}/{totals['postal_codes']}, {totals['listings_per_second']:.1f} listings/s]", flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--postal-codes", help="comma-separated postal codes")
+    parser.add_argument("--postal-codes-file", help="file with one postal code per line")
+    parser.add_argument("--out", required=True, help="output directory; rerun with the same one to resume")
+    parser.add_argument("--api-key", default=os.environ.get("REALTOR_API_KEY"))
+    parser.add_argument("--base-url", default=REALTOR_BASE_URL)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per process")
+    parser.add_argument("--status", default=",".join(DEFAULT_STATUS), help="comma-separated listing statuses")
+    parser.add_argument("--max-results", type=int, help="listings per postal code; all of them by default")
+    parser.add_argument("--no-details", dest="details", action="store_false", help="only sweep listings")
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="requests per second across every process")
+    parser.add_argument("--rate-burst", type=int, default=10)
+    parser.add_argument("--monthly-quota", type=int)
+    args = parser.parse_args()
+
+    postal_codes = []
+    if args.postal_codes:
+        postal_codes += [code.strip() for code in args.postal_codes.split(",") if code.strip()]
+    if args.postal_codes_file:
+        with open(args.postal_codes_file) as f:
+            postal_codes += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not postal_codes:
+        parser.error("pass --postal-codes or --postal-codes-file")
+    if not args.api_key:
+        parser.error("pass --api-key or set REALTOR_API_KEY")
+    if importlib.util.find_spec("pyarrow") is None:
+        parser.error("the sweep writes Parquet and needs pyarrow: pip install pyarrow")
+
+    totals = run_sweep(
+        postal_codes, args.out, args.api_key, processes=args.processes, max_concurrency=args.concurrency,
+        details=args.details, status=args.status.split(","), max_results=args.max_results, base_url=args.base_url,
+        rate_limit=args.rate_limit, rate_burst=args.rate_burst, monthly_quota=args.monthly_quota, progress=_print_progress
+    )
+    print(f"{totals['finished']} of {totals['postal_codes']} postal codes finished, {totals['failed']} to retry; "
+          f"{totals['listings']} listings and {totals['details']} details in {totals['seconds']:.1f}s "
+          f"({totals['listings_per_second']:.1f} listings/s, {totals['details_per_second']:.1f} details/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,551 @@
+import asyncio
+import random
+import threading
+import time
+import requests
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .errors import APIError, DeadlineExceededError, RateLimitError, RealtorAPIError
+from .governor import RateGovernor
+from .instrumentation import Instrumentation, record_notice
+from .jsoncodec import loads
+from .resilience import CircuitBreaker, LatencyTracker, check_deadline, time_remaining
+from .response_cache import ResponseCache, request_key
+from .singleflight import SingleFlight
+
+
+REALTOR_HOST = "realtor.p.rapidapi.com"
+REALTOR_BASE_URL = f"https://{REALTOR_HOST}"
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+BODY_SNIPPET_CHARS = 120
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as delta-seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _undecodable_reason(content: bytes) -> str:
+    """Describe a 200 response whose body is not JSON, quoting the start of the body."""
+    snippet = content[:BODY_SNIPPET_CHARS].decode("utf-8", errors="replace")
+    return f"undecodable response body ({len(content)} bytes): {snippet!r}"
+
+
+async def _close_on_shutdown(client: Any) -> AsyncIterator[None]:
+    """Hold client open until this generator is closed, by aclose or by its loop's shutdown_asyncgens."""
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+def _with_stale_notice(fetched: Tuple[Optional[dict], Optional[str]]) -> Optional[dict]:
+    """Record a fetch's stale-data notice on the calling tool call and return its response."""
+    response_json, notice = fetched
+    if notice is not None:
+        record_notice(notice)
+    return response_json
+
+
+class HTTPTransport:
+    """Pooled keep-alive HTTP transport with timeouts and retry/backoff, shared by every tool module.
+
+    Requests honour the deadline set with resilience.deadline: per-attempt timeouts, rate-limit
+    waits and retry backoff are all cut to the time left. With hedge=True an attempt still running
+    after the endpoint's recent hedge_quantile latency is raced against one duplicate request, if a
+    rate-limit token is free. A circuit_breaker makes calls to a failing endpoint fail fast; with
+    serve_stale, a failed or short-circuited request falls back to an expired cached response and
+    the tool call is told so through a notice. headers go with every request, and so do
+    default_params, which are left out of cache and coalescing keys. Failures raise error_class.
+    """
+
+    error_class = APIError
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 20.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        max_retry_after: float = 30.0,
+        response_cache: Optional[ResponseCache] = None,
+        offline: bool = False,
+        governor: Optional[RateGovernor] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        coalesce: bool = True,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        serve_stale: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        default_params: Optional[Dict[str, Any]] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.response_cache = response_cache
+        self.offline = offline
+        self.governor = governor
+        self.instrumentation = instrumentation
+        # identical requests already in flight are joined rather than sent again
+        self.flights = SingleFlight() if coalesce else None
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.latencies = LatencyTracker()
+        self.circuit_breaker = circuit_breaker
+        self.serve_stale = serve_stale
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self._hedge_executor_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.headers = dict(headers or {})
+        self.session.headers.update(self.headers)
+        # sent with every request but left out of cache and coalescing keys, e.g. a query-string API key
+        self.default_params = dict(default_params or {})
+        self.session.params.update(self.default_params)
+        # one httpx.AsyncClient per event loop, each with the guard that closes it when its loop shuts down
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[Any, AsyncIterator[None]]] = {}
+        self._async_clients_lock = threading.Lock()
+        self._listeners: Dict[str, List[Callable[[dict], None]]] = {}
+
+    def add_response_listener(self, path: str, listener: Callable[[dict], None]) -> None:
+        """Call listener with every successful JSON response from path, whether fetched or cached.
+
+        Local indexes use this to learn from payloads as they pass through.
+        """
+        self._listeners.setdefault(path, []).append(listener)
+
+    def _notify(self, path: str, response_json: Optional[dict]) -> None:
+        if response_json is None:
+            return
+        for listener in self._listeners.get(path, ()):
+            listener(response_json)
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None, refresh: bool = False) -> Optional[dict]:
+        """GET an endpoint and return its decoded JSON body, or None for a non-retryable error status."""
+        return self.request_json("GET", path, params=params, refresh=refresh)
+
+    def post_json(self, path: str, payload: Dict[str, Any], refresh: bool = False) -> Optional[dict]:
+        """POST a JSON payload and return the decoded JSON body, or None for a non-retryable error status."""
+        return self.request_json("POST", path, payload=payload, refresh=refresh)
+
+    def request_json(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        refresh: bool = False
+    ) -> Optional[dict]:
+        """Serve a request from the response cache when possible, otherwise send it and cache the body.
+
+        Concurrent identical requests, keyed on the endpoint plus normalized params and body, share
+        one upstream call and all receive its response or its error. A stale fallback is shared with
+        its notice, which every caller records on its own tool call.
+        """
+        key = request_key(method, path, params, payload, self.base_url)
+        cached = self._cached(key, path, refresh)
+        if cached is not None:
+            if self.instrumentation is not None:
+                self.instrumentation.record_response_cache_hit(path)
+            self._notify(path, cached)
+            return cached
+        check_deadline(path)
+        if self.flights is None:
+            return _with_stale_notice(self._fetch(key, method, path, params, payload))
+        try:
+            return _with_stale_notice(self.flights.do(key, lambda: self._fetch(key, method, path, params, payload), lambda: self._observe_coalesced(path), time_remaining()))
+        except TimeoutError:
+            raise DeadlineExceededError(path, reason="deadline exceeded waiting for an identical request in flight") from None
+
+    def _fetch(self, key: str, method: str, path: str, params: Optional[Dict[str, Any]], payload: Optional[Dict[str, Any]]) -> Tuple[Optional[dict], Optional[str]]:
+        """Send a request and cache its body, returning it with the stale-data notice of a fallback, if any."""
+        try:
+            self._admit(path)
+            try:
+                response_json = self._send(method, path, params, payload)
+            except APIError as exc:
+                self._settle(path, exc)
+                raise
+            self._settle(path)
+        except APIError as exc:
+            return self._stale_or_raise(key, path, exc)
+        self._store(key, path, response_json)
+        self._notify(path, response_json)
+        return response_json, None
+
+    def _admit(self, path: str) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(path)
+
+    def _settle(self, path: str, error: Optional[APIError] = None) -> None:
+        """Report the outcome of an admitted request to the circuit breaker."""
+        if self.circuit_breaker is None:
+            return
+        if error is None:
+            self.circuit_breaker.record_success(path)
+        elif isinstance(error, (DeadlineExceededError, RateLimitError)):
+            # the endpoint was never shown to be failing, so only free the half-open trial slot
+            self.circuit_breaker.release(path)
+        else:
+            self.circuit_breaker.record_failure(path)
+
+    def _stale_or_raise(self, key: str, path: str, error: APIError) -> Tuple[dict, str]:
+        """Fall back to an expired cached response for a failed request, with its notice, or re-raise its error."""
+        stale = None
+        if self.serve_stale and self.response_cache is not None:
+            stale = self.response_cache.get(key, allow_stale=True)
+        if stale is None:
+            raise error
+        return stale, f"{path} unavailable ({error.reason or error.status_code}); showing previously cached data that may be out of date"
+
+    def _cached(self, key: str, path: str, refresh: bool) -> Optional[dict]:
+        """Look key up in the response cache; in offline mode a miss is an error rather than a fetch."""
+        if self.response_cache is not None and (not refresh or self.offline):
+            cached = self.response_cache.get(key, allow_stale=self.offline)
+            if cached is not None:
+                return cached
+        if self.offline:
+            raise self.error_class(path, reason="offline mode and no cached response")
+        return None
+
+    def _observe(self, path: str, attempt: int, status: Any, wait: float, network: float, decode: float = 0.0, response_bytes: int = 0) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.record_request(path, status, attempt > 0, wait, network, decode, response_bytes)
+
+    def _observe_hedge(self, path: str, won: bool = False) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.record_hedge(path, won)
+
+    def _hedge_delay(self, path: str) -> Optional[float]:
+        """Seconds after which an attempt on path is hedged, or None when hedging is off or still learning."""
+        if not self.hedge:
+            return None
+        quantile = self.latencies.quantile(path, self.hedge_quantile)
+        return None if quantile is None else max(quantile, self.min_hedge_delay)
+
+    def _attempt_timeout(self, remaining: Optional[float]) -> Tuple[float, float]:
+        if remaining is None:
+            return self.timeout
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _hedge_pool(self) -> ThreadPoolExecutor:
+        with self._hedge_executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(max_workers=2 * self.pool_size, thread_name_prefix="realtor-hedge")
+            return self._hedge_executor
+
+    def _request(self, method: str, url: str, path: str, params: Optional[Dict[str, Any]], payload: Optional[Dict[str, Any]], timeout: Tuple[float, float]) -> requests.Response:
+        """Send one attempt, racing it against a duplicate once it outlives the hedge delay."""
+        hedge_after = self._hedge_delay(path)
+        if hedge_after is None:
+            return self.session.request(method, url, params=params, json=payload, timeout=timeout)
+
+        def submit():
+            return self._hedge_pool().submit(self.session.request, method, url, params=params, json=payload, timeout=timeout)
+
+        primary = submit()
+        try:
+            return primary.result(timeout=hedge_after)
+        except FutureTimeoutError:
+            pass
+        if self.governor is not None and not self.governor.try_acquire(path):
+            return primary.result()
+        hedge = submit()
+        self._observe_hedge(path)
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._observe_hedge(path, won=True)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def _observe_coalesced(self, path: str) -> None:
+        if self.instrumentation is not None:
+            self.instrumentation.record_coalesced(path)
+
+    def _store(self, key: str, path: str, response_json: Optional[dict]) -> None:
+        if self.response_cache is not None and response_json is not None:
+            self.response_cache.set(key, path, response_json)
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Optional[dict]:
+        """Send a request, retrying connection errors, timeouts, 429s, 5xxs and non-JSON 200s with jittered backoff.
+
+        Raises error_class once the retries are exhausted so that transient failures are never
+        mistaken for an empty result.
+        """
+        url = self.base_url + path
+        status_code = None
+        reason = ""
+        queued = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            delay = self._backoff(attempt)
+            remaining = check_deadline(path)
+            if self.governor is not None:
+                self.governor.acquire(path, max_wait=remaining)
+            sent = time.perf_counter()
+            try:
+                response = self._request(method, url, path, params, payload, self._attempt_timeout(time_remaining()))
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                status_code, reason = None, type(exc).__name__
+                self._observe(path, attempt, reason, sent - queued, time.perf_counter() - sent)
+            else:
+                received = time.perf_counter()
+                if response.status_code == 200:
+                    try:
+                        response_json = loads(response.content)
+                    except ValueError:
+                        # proxy error pages and truncated bodies are retried like any other transient failure
+                        status_code, reason = 200, _undecodable_reason(response.content)
+                        self._observe(path, attempt, "undecodable", sent - queued, received - sent, time.perf_counter() - received, len(response.content))
+                    else:
+                        self.latencies.observe(path, received - sent)
+                        self._observe(path, attempt, 200, sent - queued, received - sent, time.perf_counter() - received, len(response.content))
+                        return response_json
+                else:
+                    self._observe(path, attempt, response.status_code, sent - queued, received - sent, 0.0, len(response.content))
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        return None
+                    status_code, reason = response.status_code, response.reason
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        delay = min(max(retry_after, delay), self.max_retry_after)
+                    if response.status_code == 429 and self.governor is not None:
+                        self.governor.throttled(path, delay)
+            queued = time.perf_counter()
+            if attempt < self.max_retries:
+                check_deadline(path, delay)
+                time.sleep(delay)
+        raise self.error_class(path, status_code, reason)
+
+    async def aget_json(self, path: str, params: Optional[Dict[str, Any]] = None, refresh: bool = False) -> Optional[dict]:
+        """Async counterpart of get_json."""
+        return await self.arequest_json("GET", path, params=params, refresh=refresh)
+
+    async def apost_json(self, path: str, payload: Dict[str, Any], refresh: bool = False) -> Optional[dict]:
+        """Async counterpart of post_json."""
+        return await self.arequest_json("POST", path, payload=payload, refresh=refresh)
+
+    async def arequest_json(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        refresh: bool = False
+    ) -> Optional[dict]:
+        """Async counterpart of request_json."""
+        key = request_key(method, path, params, payload, self.base_url)
+        cached = self._cached(key, path, refresh)
+        if cached is not None:
+            if self.instrumentation is not None:
+                self.instrumentation.record_response_cache_hit(path)
+            self._notify(path, cached)
+            return cached
+        check_deadline(path)
+        if self.flights is None:
+            return _with_stale_notice(await self._afetch(key, method, path, params, payload))
+        try:
+            return _with_stale_notice(await self.flights.ado(key, lambda: self._afetch(key, method, path, params, payload), lambda: self._observe_coalesced(path), time_remaining()))
+        except TimeoutError:
+            raise DeadlineExceededError(path, reason="deadline exceeded waiting for an identical request in flight") from None
+
+    async def _afetch(self, key: str, method: str, path: str, params: Optional[Dict[str, Any]], payload: Optional[Dict[str, Any]]) -> Tuple[Optional[dict], Optional[str]]:
+        """Async counterpart of _fetch."""
+        try:
+            self._admit(path)
+            try:
+                response_json = await self._asend(method, path, params, payload)
+            except APIError as exc:
+                self._settle(path, exc)
+                raise
+            self._settle(path)
+        except APIError as exc:
+            return self._stale_or_raise(key, path, exc)
+        self._store(key, path, response_json)
+        self._notify(path, response_json)
+        return response_json, None
+
+    async def _arequest(self, client: Any, method: str, path: str, params: Optional[Dict[str, Any]], payload: Optional[Dict[str, Any]], timeout: Any) -> Any:
+        """Async counterpart of _request; the losing request of a hedged pair is cancelled."""
+        hedge_after = self._hedge_delay(path)
+        if hedge_after is None:
+            return await client.request(method, path, params=params, json=payload, timeout=timeout)
+
+        def send():
+            return asyncio.ensure_future(client.request(method, path, params=params, json=payload, timeout=timeout))
+
+        primary = send()
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and (self.governor is None or self.governor.try_acquire(path)):
+                tasks.add(send())
+                self._observe_hedge(path)
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._observe_hedge(path, won=True)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _asend(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None
+    ) -> Optional[dict]:
+        """Async counterpart of _send, sharing one pooled httpx client per event loop."""
+        import httpx
+
+        client = await self._get_async_client()
+        status_code = None
+        reason = ""
+        queued = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            delay = self._backoff(attempt)
+            remaining = check_deadline(path)
+            if self.governor is not None:
+                await self.governor.aacquire(path, max_wait=remaining)
+            sent = time.perf_counter()
+            remaining = time_remaining()
+            timeout = httpx.USE_CLIENT_DEFAULT if remaining is None else httpx.Timeout(min(self.read_timeout, remaining), connect=min(self.connect_timeout, remaining))
+            try:
+                response = await self._arequest(client, method, path, params, payload, timeout)
+            except (httpx.TransportError, httpx.TimeoutException) as exc:
+                status_code, reason = None, type(exc).__name__
+                self._observe(path, attempt, reason, sent - queued, time.perf_counter() - sent)
+            else:
+                received = time.perf_counter()
+                if response.status_code == 200:
+                    try:
+                        response_json = loads(response.content)
+                    except ValueError:
+                        status_code, reason = 200, _undecodable_reason(response.content)
+                        self._observe(path, attempt, "undecodable", sent - queued, received - sent, time.perf_counter() - received, len(response.content))
+                    else:
+                        self.latencies.observe(path, received - sent)
+                        self._observe(path, attempt, 200, sent - queued, received - sent, time.perf_counter() - received, len(response.content))
+                        return response_json
+                else:
+                    self._observe(path, attempt, response.status_code, sent - queued, received - sent, 0.0, len(response.content))
+                    if response.status_code not in RETRY_STATUS_CODES:
+                        return None
+                    status_code, reason = response.status_code, response.reason_phrase
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+                    if retry_after is not None:
+                        delay = min(max(retry_after, delay), self.max_retry_after)
+                    if response.status_code == 429 and self.governor is not None:
+                        self.governor.throttled(path, delay)
+            queued = time.perf_counter()
+            if attempt < self.max_retries:
+                check_deadline(path, delay)
+                await asyncio.sleep(delay)
+        raise self.error_class(path, status_code, reason)
+
+    async def _get_async_client(self):
+        """Return the httpx.AsyncClient bound to the running event loop, creating it on first use.
+
+        A client's connections belong to its loop and cannot be closed from another one, so each
+        client comes with an async generator guard that the loop finalizes on shutdown_asyncgens,
+        as asyncio.run does, closing the client before the loop itself closes.
+        """
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            for other in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[other]
+            entry = self._async_clients.get(loop)
+            if entry is not None and not entry[0].is_closed:
+                return entry[0]
+            client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                params=self.default_params,
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            guard = _close_on_shutdown(client)
+            self._async_clients[loop] = (client, guard)
+        await guard.asend(None)
+        return client
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given attempt number."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        self.session.close()
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+
+    async def aclose(self) -> None:
+        """Close the pooled connections of every async client; those of other running loops close on their loop."""
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            entries, self._async_clients = self._async_clients, {}
+        for other, (_, guard) in entries.items():
+            if other is loop:
+                await guard.aclose()
+            elif other.is_running():
+                asyncio.run_coroutine_threadsafe(guard.aclose(), other)
+
+
+class RealtorTransport(HTTPTransport):
+    """HTTPTransport for the Realtor API on RapidAPI; failures raise RealtorAPIError."""
+
+    error_class = RealtorAPIError
+
+    def __init__(self, api_key: str, base_url: str = REALTOR_BASE_URL, **kwargs: Any):
+        kwargs.setdefault("headers", {"X-RapidAPI-Key": api_key, "X-RapidAPI-Host": REALTOR_HOST})
+        super().__init__(base_url, **kwargs)
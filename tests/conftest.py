@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.fake_realtor import FakeRealtorServer
+
+
+@pytest.fixture
+def server():
+    with FakeRealtorServer() as server:
+        yield server
@@ -0,0 +1,82 @@
+import json
+import multiprocessing
+
+import pytest
+
+from src.errors import RateLimitError
+from src.governor import BACKGROUND, RateGovernor, background_priority
+
+PATH = "/properties/v3/detail"
+
+
+def _take_tokens(state_path, attempts):
+    # refills too slowly to matter, so the shared burst is all there is
+    governor = RateGovernor(rate=0.001, burst=10, state_path=state_path)
+    return sum(governor.try_acquire(PATH) for _ in range(attempts))
+
+
+def test_bucket_is_shared_across_processes(tmp_path):
+    state_path = str(tmp_path / "governor.json")
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        granted = pool.starmap(_take_tokens, [(state_path, 5)] * 4)
+
+    assert sum(granted) == 10
+    assert RateGovernor(rate=0.001, burst=10, state_path=state_path).remaining()["monthly_used"] == 10
+
+
+def test_throttle_drains_the_shared_bucket(tmp_path):
+    state_path = str(tmp_path / "governor.json")
+    first = RateGovernor(rate=10, burst=10, state_path=state_path)
+    second = RateGovernor(rate=10, burst=10, state_path=state_path)
+
+    first.throttled(PATH, 1.0)
+
+    assert not second.try_acquire(PATH)
+    with pytest.raises(RateLimitError):
+        second.acquire(PATH, max_wait=0.1)
+
+
+def test_monthly_quota_is_enforced_and_persisted(tmp_path):
+    state_path = str(tmp_path / "governor.json")
+    governor = RateGovernor(rate=1000, burst=100, monthly_quota=3, state_path=state_path)
+    for _ in range(2):
+        governor.acquire(PATH)
+
+    restarted = RateGovernor(rate=1000, burst=100, monthly_quota=3, state_path=state_path)
+    restarted.acquire(PATH)
+    with pytest.raises(RateLimitError, match="monthly RapidAPI quota exhausted"):
+        restarted.acquire(PATH)
+    assert restarted.remaining()["monthly_remaining"] == 0
+
+
+def test_monthly_counter_resets_in_a_new_month(tmp_path):
+    state_path = tmp_path / "governor.json"
+    state_path.write_text(json.dumps({"month": "2000-01", "used": 3}))
+    governor = RateGovernor(rate=1000, burst=100, monthly_quota=3, state_path=str(state_path))
+
+    governor.acquire(PATH)
+
+    assert governor.remaining()["monthly_used"] == 1
+
+
+def test_background_calls_leave_part_of_the_quota_to_interactive_ones():
+    governor = RateGovernor(rate=1000, burst=100, monthly_quota=10, background_monthly_reserve=0.2)
+    with background_priority():
+        for _ in range(8):
+            governor.acquire(PATH)
+        with pytest.raises(RateLimitError):
+            governor.acquire(PATH)
+
+    governor.acquire(PATH)
+    governor.acquire(PATH)
+    with pytest.raises(RateLimitError):
+        governor.acquire(PATH)
+
+
+def test_background_calls_keep_burst_headroom():
+    governor = RateGovernor(rate=0.001, burst=10, background_reserve=0.5)
+
+    granted = sum(governor.try_acquire(PATH, BACKGROUND) for _ in range(10))
+
+    assert granted == 5
+    assert governor.try_acquire(PATH)
@@ -0,0 +1,14 @@
+from benchmarks.bench_import import probe
+
+# generous ceilings: they catch pandas or another heavy import creeping onto the startup path, not noise
+MAX_IMPORT_MS = 10000
+MAX_RSS_MB = 400
+
+
+def test_import_and_first_calls_stay_pandas_free_and_light(server):
+    run = probe(server.base_url, "python")
+
+    assert not run["pandas_after_import"]
+    assert not run["pandas_after_calls"]
+    assert run["import_ms"] < MAX_IMPORT_MS
+    assert run["rss_mb"] < MAX_RSS_MB
@@ -0,0 +1,104 @@
+import pytest
+
+from benchmarks.fake_realtor import FakeRealtorServer, SyntheticRealtor
+from src.errors import RealtorAPIError
+from src.listing import LIST_PATH
+from src.listing_store import ListingStore
+from src.transport import RealtorTransport
+
+POSTAL_CODE = "33020"
+
+
+@pytest.fixture
+def server():
+    with FakeRealtorServer(synthetic=SyntheticRealtor(listings_per_postal_code=12)) as server:
+        yield server
+
+
+@pytest.fixture
+def transport(server):
+    transport = RealtorTransport("test-key", base_url=server.base_url, max_retries=0)
+    yield transport
+    transport.close()
+
+
+def _store(transport, **kwargs):
+    store = ListingStore(page_size=5, **kwargs)
+    store.watch(transport)
+    return store
+
+
+def _sync(store, transport):
+    (outcome,) = store.refresh(transport, [POSTAL_CODE]).values()
+    assert outcome["status"] == "ok", outcome
+    return outcome["result"]
+
+
+def _ids(store):
+    return set(store.postal_code_columns(POSTAL_CODE, ["property_id"])["property_id"])
+
+
+def _listing(property_id):
+    return {"property_id": property_id, "status": "for_sale", "location": {"address": {"postal_code": POSTAL_CODE}}}
+
+
+def test_first_sync_is_full_then_fresh(server, transport):
+    store = _store(transport)
+
+    outcome = _sync(store, transport)
+    assert (outcome["mode"], outcome["fetched"]) == ("full", 12)
+    assert len(_ids(store)) == 12
+
+    server.reset_stats()
+    outcome = _sync(store, transport)
+    assert outcome["mode"] is None
+    assert server.snapshot()["requests"] == {}
+
+
+def test_incremental_sync_stops_at_the_stored_watermark(server, transport):
+    store = _store(transport)
+    _sync(store, transport)
+    store.max_age = 0
+    server.reset_stats()
+
+    outcome = _sync(store, transport)
+
+    assert (outcome["mode"], outcome["fetched"], outcome["removed"]) == ("incremental", 5, 0)
+    assert server.snapshot()["requests"] == {LIST_PATH: 1}
+
+
+def test_full_sync_prunes_only_listings_written_before_it_started(transport):
+    store = _store(transport)
+    store.add_records([_listing("3302099998")])
+    # written by another caller while the sync is paging, after its start
+    transport.add_response_listener(LIST_PATH, lambda _: store.add_records([_listing("3302099999")]))
+
+    outcome = _sync(store, transport)
+
+    assert outcome["removed"] == 1
+    assert "3302099998" not in _ids(store)
+    assert "3302099999" in _ids(store)
+    assert store.deletions == 1
+
+
+def test_full_sync_keeps_listings_once_a_search_hits_the_cap(transport):
+    store = _store(transport, max_listings_per_postal_code=10)
+    store.add_records([_listing("3302099998")])
+
+    outcome = _sync(store, transport)
+
+    assert (outcome["fetched"], outcome["removed"]) == (10, 0)
+    assert "3302099998" in _ids(store)
+
+
+def test_sync_failure_serves_stale_rows_but_not_unsynced_postal_codes(server, transport):
+    store = _store(transport)
+    _sync(store, transport)
+    store.max_age = 0
+    server.error_rate = 1.0
+
+    outcomes = store.refresh(transport, [POSTAL_CODE, "33021"])
+    assert outcomes[POSTAL_CODE]["status"] == "error"
+    with pytest.raises(RealtorAPIError, match="could not sync postal code 33021"):
+        store.raise_for_unsynced(outcomes)
+    assert len(_ids(store)) == 12
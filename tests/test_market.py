@@ -0,0 +1,93 @@
+from datetime import date
+
+from benchmarks.fake_realtor import FakeRealtorServer, SyntheticRealtor
+from src.listing_store import ListingStore
+from src.market import MarketStats, get_market_stats
+from src.transport import RealtorTransport
+
+
+def _listing(property_id, list_date, list_price=300000, sqft=1500):
+    return {
+        "property_id": property_id,
+        "status": "for_sale",
+        "list_price": list_price,
+        "list_date": list_date,
+        "description": {"sqft": sqft},
+        "location": {"address": {"postal_code": "33020"}},
+    }
+
+
+def _sold(property_id, list_date, sold_date, sold_price, sqft=1000):
+    return dict(_listing(property_id, list_date, sqft=sqft), status="sold", last_sold_date=sold_date, last_sold_price=sold_price)
+
+
+def _home(property_id, history):
+    return {
+        "property_id": property_id,
+        "description": {"sqft": 1500},
+        "location": {"address": {"postal_code": "33020"}},
+        "property_history": history,
+    }
+
+
+def test_malformed_dates_are_skipped():
+    store = ListingStore()
+    store.add_records([
+        _listing("1", "2024-05-20T00:00:00Z"),
+        _listing("2", "2024-13-01"),
+        _listing("3", "unknown"),
+    ])
+    store.add_history(_home("1", [
+        {"date": "2024-05-25", "event_name": "Sold", "price": 310000},
+        {"date": "2024-05-20", "event_name": "Listed", "price": 300000},
+    ]))
+    store.add_history(_home("2", [{"date": "not a date", "event_name": "Sold", "price": 250000}]))
+
+    (row,) = MarketStats(store).summary("33020", [30], today=date(2024, 6, 1))
+
+    assert row["listings"] == 1
+    assert row["median_days_on_market"] == 12.0
+    assert row["sales"] == 1
+    assert row["median_sale_price"] == 310000.0
+
+
+def test_sold_listings_are_counted_as_sales():
+    store = ListingStore()
+    store.add_records([
+        _sold("10", "2024-04-01T00:00:00Z", "2024-05-10", 400000),
+        _sold("11", "2024-04-20T00:00:00Z", "2024-05-20", 500000),
+        _sold("12", "2023-01-05T00:00:00Z", "2023-03-01", 250000),
+    ])
+    # the history of 11 records the same sale, which must not be counted twice
+    store.add_history(dict(_home("11", [
+        {"date": "2024-05-20", "event_name": "Sold", "price": 500000},
+        {"date": "2024-04-20", "event_name": "Listed", "price": 520000},
+    ]), description={"sqft": 1000}))
+
+    month, year = MarketStats(store).summary("33020", [30, 365], today=date(2024, 6, 1))
+
+    assert month["sales"] == 2
+    assert month["median_sale_price"] == 450000.0
+    assert month["median_sale_ppsf"] == 450.0
+    assert month["median_list_to_sale_pct"] == -3.85
+    assert month["median_sale_days_on_market"] == 30.0
+    assert year["sales"] == 2
+    assert month["median_days_on_market"] is None
+
+
+def test_get_market_stats_syncs_sold_listings():
+    with FakeRealtorServer(synthetic=SyntheticRealtor(listings_per_postal_code=12, history_events=0)) as server:
+        transport = RealtorTransport("test-key", base_url=server.base_url, max_retries=0)
+        store = ListingStore()
+        store.watch(transport)
+        stats = MarketStats(store)
+        get_market_stats(stats, transport, "33020", history_fetches=2)
+        requests = server.snapshot()["requests"]
+        transport.close()
+
+    (row,) = stats.summary("33020", [365], today=date(2026, 10, 1))
+
+    assert store.refresh_mode("33020", ["sold"]) is None
+    assert requests["/properties/v3/detail"] == 4
+    assert row["sales"] == 12
+    assert row["median_sale_price"] is not None
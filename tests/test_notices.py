@@ -0,0 +1,49 @@
+import pytest
+
+from src.base import RealtorAgentToolSpec
+
+PROPERTY_ID = "3302000007"
+EXPIRED = {"/properties/v3/detail": -1, "/properties/v3/get-photos": -1}
+
+
+def _spec(server, tmp_path, output_format):
+    return RealtorAgentToolSpec(
+        "test-key", base_url=server.base_url, cache_path=str(tmp_path / "responses.sqlite"), cache_ttls=EXPIRED,
+        max_retries=0, output_format=output_format
+    )
+
+
+@pytest.mark.parametrize("output_format", ["dataframe", "python", "csv", "arrow"])
+def test_stale_fallback_is_shown_in_tool_output(server, tmp_path, output_format):
+    fresh = _spec(server, tmp_path, output_format)
+    details = fresh.get_listing_details_by_property_id(PROPERTY_ID)
+    photos = fresh.get_listing_photos_by_property_id(PROPERTY_ID)
+    assert "Note:" not in str(details)
+    assert "Note:" not in str(photos)
+
+    server.error_rate = 1.0
+    stale = _spec(server, tmp_path, output_format)
+    details = stale.get_listing_details_by_property_id(PROPERTY_ID)
+    photos = stale.get_listing_photos_by_property_id(PROPERTY_ID)
+
+    if output_format == "arrow":
+        assert b"previously cached data" in details.schema.metadata[b"notices"]
+    else:
+        assert str(details).startswith("Note: /properties/v3/detail unavailable")
+        assert "previously cached data" in str(details).splitlines()[0]
+    assert str(photos).startswith("Note: /properties/v3/get-photos unavailable")
+    assert stale.instrumentation.snapshot()["tools"]["get_listing_details_by_property_id"]["notices"] == 1
+
+
+def test_notice_does_not_stick_to_cached_results(server, tmp_path):
+    spec = _spec(server, tmp_path, "dataframe")
+    spec.get_listing_details_by_property_id(PROPERTY_ID)
+    server.error_rate = 1.0
+    noted = spec.get_listing_details_by_property_id(PROPERTY_ID, refresh=True)
+    server.error_rate = 0.0
+    cached = spec.get_listing_details_by_property_id(PROPERTY_ID)
+
+    assert noted.attrs["notices"]
+    assert "notices" not in cached.attrs
+    assert not str(cached).startswith("Note:")
+    assert type(noted.head()).__name__ == "DataFrame"
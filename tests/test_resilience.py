@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import pytest
+
+from src.errors import CircuitOpenError, RealtorAPIError
+from src.instrumentation import Instrumentation
+from src.resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.response_cache import ResponseCache
+from src.transport import RealtorTransport
+
+DETAIL_PATH = "/properties/v3/detail"
+PARAMS = {"property_id": "3302000007"}
+
+
+def _transport(server, **kwargs):
+    kwargs.setdefault("max_retries", 0)
+    return RealtorTransport("test-key", base_url=server.base_url, instrumentation=Instrumentation(), **kwargs)
+
+
+def _learned(transport, seconds=0.01):
+    """Give the transport enough latency samples of the detail endpoint to start hedging."""
+    for _ in range(transport.latencies.min_samples):
+        transport.latencies.observe(DETAIL_PATH, seconds)
+    return transport
+
+
+def test_slow_attempt_is_hedged(server):
+    transport = _learned(_transport(server, hedge=True, min_hedge_delay=0.05))
+    server.inject(delay=2.0)
+
+    started = time.perf_counter()
+    assert transport.get_json(DETAIL_PATH, PARAMS) is not None
+    elapsed = time.perf_counter() - started
+    transport.close()
+
+    assert elapsed < 1.5
+    endpoint = transport.instrumentation.snapshot()["endpoints"][DETAIL_PATH]
+    assert (endpoint["hedges"], endpoint["hedges_won"]) == (1, 1)
+
+
+def test_slow_async_attempt_is_hedged(server):
+    transport = _learned(_transport(server, hedge=True, min_hedge_delay=0.05))
+    server.inject(delay=2.0)
+
+    async def main():
+        try:
+            started = time.perf_counter()
+            await transport.aget_json(DETAIL_PATH, PARAMS)
+            return time.perf_counter() - started
+        finally:
+            await transport.aclose()
+
+    assert asyncio.run(main()) < 1.5
+    endpoint = transport.instrumentation.snapshot()["endpoints"][DETAIL_PATH]
+    assert (endpoint["hedges"], endpoint["hedges_won"]) == (1, 1)
+
+
+def test_no_hedge_until_latencies_are_learned(server):
+    transport = _transport(server, hedge=True, min_hedge_delay=0.01)
+    server.inject(delay=0.1)
+    transport.get_json(DETAIL_PATH, PARAMS)
+    transport.close()
+
+    assert server.snapshot()["requests"] == {DETAIL_PATH: 1}
+    assert transport.instrumentation.snapshot()["endpoints"][DETAIL_PATH]["hedges"] == 0
+
+
+def test_circuit_opens_fails_fast_and_closes_after_a_trial(server):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    transport = _transport(server, circuit_breaker=breaker)
+    server.inject(503, count=2)
+    for _ in range(2):
+        with pytest.raises(RealtorAPIError):
+            transport.get_json(DETAIL_PATH, PARAMS)
+
+    assert breaker.state(DETAIL_PATH) == OPEN
+    with pytest.raises(CircuitOpenError):
+        transport.get_json(DETAIL_PATH, PARAMS)
+    assert server.snapshot()["requests"] == {DETAIL_PATH: 2}
+
+    time.sleep(0.25)
+    assert breaker.state(DETAIL_PATH) == HALF_OPEN
+    assert transport.get_json(DETAIL_PATH, PARAMS) is not None
+    assert breaker.state(DETAIL_PATH) == CLOSED
+    transport.close()
+
+
+def test_failed_trial_reopens_the_circuit(server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    transport = _transport(server, circuit_breaker=breaker)
+    server.inject(503, count=2)
+    with pytest.raises(RealtorAPIError):
+        transport.get_json(DETAIL_PATH, PARAMS)
+    time.sleep(0.15)
+
+    with pytest.raises(RealtorAPIError):
+        transport.get_json(DETAIL_PATH, PARAMS)
+
+    assert breaker.state(DETAIL_PATH) == OPEN
+    transport.close()
+
+
+@pytest.mark.parametrize("failure", ["error", "circuit"])
+def test_expired_response_is_served_with_a_notice(server, tmp_path, failure):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttls={DETAIL_PATH: -1})
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    transport = _transport(server, response_cache=cache, circuit_breaker=breaker)
+    fresh = transport.get_json(DETAIL_PATH, PARAMS)
+    if failure == "circuit":
+        breaker.record_failure(DETAIL_PATH)
+    else:
+        server.inject(503)
+
+    stale = transport.instrumentation.track("details", {}, transport.get_json, DETAIL_PATH, PARAMS)
+    transport.close()
+
+    assert stale["data"] == fresh["data"]
+    (notice,) = stale["notices"]
+    assert notice.startswith(f"{DETAIL_PATH} unavailable")
+    assert server.snapshot()["requests"] == {DETAIL_PATH: 1 if failure == "circuit" else 2}
+
+
+def test_failure_without_a_cached_response_raises(server, tmp_path):
+    transport = _transport(server, response_cache=ResponseCache(str(tmp_path / "responses.sqlite")))
+    server.inject(503)
+
+    with pytest.raises(RealtorAPIError):
+        transport.get_json(DETAIL_PATH, PARAMS)
+    transport.close()
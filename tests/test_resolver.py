@@ -0,0 +1,46 @@
+from src.resolver import AddressIndex, canonicalize_address
+
+
+def _index():
+    index = AddressIndex()
+    index.add("2111 S 26th Ave, Hollywood, FL 33020", "1001")
+    index.add("100 Main St, Springfield, IL 62701", "2001")
+    return index
+
+
+def test_canonical_spellings_resolve():
+    index = _index()
+    assert index.lookup("2111 South 26th Avenue, Hollywood, Florida 33020-1234") == "1001"
+    assert index.lookup("2111 S 26th Ave Hollywood FL") == "1001"
+    assert index.lookup("2111 S 26th Ave FL 33020") == "1001"
+
+
+def test_different_directional_does_not_resolve():
+    assert _index().lookup("2111 N 26th Ave Hollywood FL 33020") is None
+
+
+def test_different_suffix_does_not_resolve():
+    assert _index().lookup("2111 S 26th St Hollywood FL") is None
+
+
+def test_different_city_does_not_resolve():
+    assert _index().lookup("2111 S 26th Ave Miami FL") is None
+
+
+def test_different_state_does_not_resolve():
+    assert _index().lookup("100 Main St Springfield MA") is None
+
+
+def test_missing_zip_with_two_candidates_does_not_resolve():
+    index = _index()
+    index.add("100 Main St, Springfield, IL 62702", "2002")
+    assert index.lookup("100 Main St Springfield IL") is None
+    assert index.lookup("100 Main St Springfield IL 62702") == "2002"
+
+
+def test_floor_and_court_do_not_read_as_states():
+    assert canonicalize_address("12 Oak Court Floor 2, Hartford, CT") == "12 OAK CT FLR 2 HARTFORD CT"
+    index = AddressIndex()
+    index.add("12 Oak Ct, Hartford, CT 06103", "3001")
+    assert index.lookup("12 Oak Court Hartford Connecticut") == "3001"
+    assert index.lookup("12 Oak Ct Hartford FL") is None
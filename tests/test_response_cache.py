@@ -0,0 +1,96 @@
+import random
+import sqlite3
+import string
+import zlib
+
+from src.jsoncodec import dumps
+from src.response_cache import ResponseCache, request_key
+
+PATH = "/properties/v3/detail"
+
+
+def _stored(cache):
+    """The stored byte total kept by the triggers, next to the one summed from the rows."""
+    with sqlite3.connect(cache.path) as connection:
+        summed = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    return cache.stats()["bytes"], summed
+
+
+def _body(n, size=2000):
+    # random text, so the compressed size grows with size
+    rng = random.Random(n)
+    return {"id": n, "text": "".join(rng.choice(string.ascii_letters) for _ in range(size))}
+
+
+def test_stored_bytes_follow_inserts_upserts_and_deletes(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    cache.set("a", PATH, _body(1))
+    cache.set("b", PATH, _body(2, 500))
+    total, summed = _stored(cache)
+    assert total == summed > 0
+
+    # an upsert changes the size in place rather than deleting and re-inserting the row
+    cache.set("a", PATH, _body(1, 50))
+    assert _stored(cache)[0] == _stored(cache)[1] < total
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert _stored(cache) == (0, 0)
+
+
+def test_stored_bytes_are_counted_for_an_existing_file(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path).set("a", PATH, _body(1))
+
+    reopened = ResponseCache(path)
+
+    assert reopened.stats()["bytes"] == _stored(reopened)[1] > 0
+
+
+def test_eviction_drops_expired_then_least_recently_read(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_bytes=10 ** 9)
+    cache.set("expired", PATH, _body(0), ttl=-1)
+    for n in range(1, 5):
+        cache.set(f"k{n}", PATH, _body(n))
+    cache.get("k1")
+    size = cache.stats()["bytes"] // 5
+
+    # room for about three entries: the expired one goes first, then k2, the least recently read
+    cache.max_bytes = int(size * 3.5)
+    cache.set("k5", PATH, _body(5))
+
+    assert cache.get("expired", allow_stale=True) is None
+    assert cache.get("k2") is None
+    assert all(cache.get(key) is not None for key in ("k1", "k4", "k5"))
+    total, summed = _stored(cache)
+    assert total == summed <= cache.max_bytes
+
+
+def test_upsert_over_budget_evicts(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    cache.set("a", PATH, _body(1, 100))
+    cache.set("b", PATH, _body(2, 1000))
+    grown = _body(1, 4000)
+    # eviction stops at 90% of max_bytes: room for the grown entry on its own, but not next to b
+    cache.max_bytes = int(len(zlib.compress(dumps(grown))) / 0.9) + 10
+
+    cache.set("a", PATH, grown)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert _stored(cache)[0] == _stored(cache)[1]
+
+
+def test_expired_entries_are_only_served_stale(tmp_path):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttls={PATH: -1})
+    cache.set("a", PATH, {"ok": True})
+
+    assert cache.get("a") is None
+    assert cache.get("a", allow_stale=True) == {"ok": True}
+
+
+def test_request_key_normalizes_params_and_separates_hosts():
+    key = request_key("get", PATH, {"property_id": "1", "unused": None}, base_url="https://a.example/")
+
+    assert key == request_key("GET", PATH, {"property_id": " 1 "}, base_url="https://a.example")
+    assert key != request_key("GET", PATH, {"property_id": "1"}, base_url="https://b.example")
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.singleflight import SingleFlight
+from src.transport import RealtorTransport
+
+
+def _until(condition):
+    while not condition():
+        time.sleep(0.001)
+
+
+def _lead(flights, key, fn):
+    """Start a thread leading key's flight and return once it is in flight."""
+    started = threading.Event()
+
+    def call():
+        started.set()
+        return fn()
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    leader = pool.submit(flights.do, key, call)
+    started.wait()
+    pool.shutdown(wait=False)
+    return leader
+
+
+def test_waiters_share_the_leaders_result():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        release.wait()
+        return {"value": 1}
+
+    leader = _lead(flights, "key", fetch)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        waiters = [pool.submit(flights.do, "key", fetch) for _ in range(4)]
+        _until(lambda: flights.stats()["coalesced"] == 4)
+        release.set()
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert calls == [1]
+    assert all(result is results[0] for result in results)
+    assert flights.stats() == {"led": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_waiters_share_the_leaders_error():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait()
+        raise ValueError("upstream failed")
+
+    leader = _lead(flights, "key", fail)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        waiter = pool.submit(flights.do, "key", lambda: "not called")
+        _until(lambda: flights.stats()["coalesced"] == 1)
+        release.set()
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            waiter.result()
+
+
+def test_waiter_times_out_without_ending_the_flight():
+    flights = SingleFlight()
+    release = threading.Event()
+    leader = _lead(flights, "key", lambda: release.wait() and "done")
+
+    with pytest.raises(TimeoutError):
+        flights.do("key", lambda: "not called", timeout=0.05)
+    release.set()
+
+    assert leader.result() == "done"
+
+
+def test_cancelled_async_leader_hands_the_call_to_a_waiter():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch(hang):
+        calls.append(hang)
+        if hang:
+            await asyncio.sleep(10)
+        return "fetched"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.ado("key", lambda: fetch(True)))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flights.ado("key", lambda: fetch(False)))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(main()) == "fetched"
+    assert calls == [True, False]
+    assert flights.stats() == {"led": 2, "coalesced": 1, "in_flight": 0}
+
+
+def test_cancelled_async_waiter_leaves_the_flight_running():
+    flights = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "fetched"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.ado("key", fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flights.ado("key", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await leader
+
+    assert asyncio.run(main()) == "fetched"
+
+
+def test_identical_requests_reach_the_server_once(server):
+    server.latency = 0.2
+    transport = RealtorTransport("test-key", base_url=server.base_url, max_retries=0)
+    params = {"property_id": "3302000007"}
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: transport.get_json("/properties/v3/detail", params), range(5)))
+    transport.close()
+
+    assert server.snapshot()["requests"] == {"/properties/v3/detail": 1}
+    assert all(result is results[0] for result in results)
+    assert transport.flights.stats()["coalesced"] == 4
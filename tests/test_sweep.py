@@ -0,0 +1,101 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.fake_realtor import FakeRealtorServer, SyntheticRealtor
+from src.detail import DETAIL_PATH
+from src.listing import LIST_PATH
+from src.sweep import SweepCheckpoint, _write_partition, run_sweep
+
+POSTAL_CODE = "33020"
+
+
+@pytest.fixture
+def server():
+    with FakeRealtorServer(synthetic=SyntheticRealtor(listings_per_postal_code=12)) as server:
+        yield server
+
+
+def _sweep(server, out_dir, postal_codes=(POSTAL_CODE,), **kwargs):
+    options = dict(processes=1, max_concurrency=1, base_url=server.base_url, rate_limit=1000, rate_burst=1000, max_retries=0, chunk_size=5)
+    options.update(kwargs)
+    return run_sweep(list(postal_codes), str(out_dir), "test-key", **options)
+
+
+def _stored_ids(out_dir, kind):
+    return pd.read_parquet(os.path.join(out_dir, kind), columns=["property_id"])["property_id"].astype(str).tolist()
+
+
+def test_sweep_writes_listing_and_detail_partitions(server, tmp_path):
+    totals = _sweep(server, tmp_path)
+
+    assert (totals["finished"], totals["failed"], totals["listings"], totals["details"]) == (1, 0, 12, 12)
+    assert os.path.isdir(tmp_path / "listings" / f"postal_code={POSTAL_CODE}")
+    assert sorted(_stored_ids(tmp_path, "details")) == sorted(_stored_ids(tmp_path, "listings"))
+    assert len(set(_stored_ids(tmp_path, "details"))) == 12
+
+
+def test_rerun_resumes_a_listed_postal_code_and_skips_fetched_properties(server, tmp_path):
+    # the list request goes through, then the first detail request fails
+    server.inject(None)
+    server.inject(503)
+    first = _sweep(server, tmp_path)
+    assert (first["finished"], first["failed"], first["details"], first["detail_errors"]) == (0, 1, 11, 1)
+
+    checkpoint = SweepCheckpoint(str(tmp_path / "checkpoint.db"))
+    assert checkpoint.listed(POSTAL_CODE)
+    assert checkpoint.unfinished([POSTAL_CODE]) == [POSTAL_CODE]
+    assert len(checkpoint.fetched(POSTAL_CODE)) == 11
+    checkpoint.close()
+
+    server.reset_stats()
+    second = _sweep(server, tmp_path)
+
+    assert (second["finished"], second["listings"], second["details"]) == (1, 0, 1)
+    assert server.snapshot()["requests"] == {DETAIL_PATH: 1}
+    details = _stored_ids(tmp_path, "details")
+    assert len(details) == len(set(details)) == 12
+
+
+def test_rerun_skips_finished_postal_codes(server, tmp_path):
+    _sweep(server, tmp_path, details=False)
+    server.reset_stats()
+
+    totals = _sweep(server, tmp_path, details=False)
+
+    assert totals["postal_codes"] == 0
+    assert server.snapshot()["requests"] == {}
+
+
+def test_worker_processes_share_one_governor(server, tmp_path):
+    totals = _sweep(server, tmp_path, postal_codes=["33020", "33021"], processes=2, details=False)
+
+    assert (totals["finished"], totals["listings"]) == (2, 24)
+    assert server.snapshot()["requests"] == {LIST_PATH: 2}
+    assert os.path.exists(tmp_path / "governor.json")
+
+
+def test_checkpoint_tracks_postal_codes_and_properties(tmp_path):
+    checkpoint = SweepCheckpoint(str(tmp_path / "checkpoint.db"))
+    checkpoint.mark_listed("33020", 2)
+    checkpoint.mark_fetched("33020", ["1", "2"])
+    checkpoint.mark_listed("33021", 0)
+    checkpoint.mark_finished("33021")
+
+    assert checkpoint.unfinished(["33021", "33020", "33020", "33022"]) == ["33020", "33022"]
+    assert checkpoint.listed("33020") and not checkpoint.listed("33022")
+    assert checkpoint.fetched("33020") == {"1", "2"}
+    assert checkpoint.fetched("33021") == set()
+    checkpoint.close()
+
+
+def test_write_partition_replaces_or_adds_files(tmp_path):
+    root = str(tmp_path / "listings")
+    _write_partition(pd.DataFrame({"property_id": ["1", "2"]}), root, POSTAL_CODE, "listings", replace=True)
+    _write_partition(pd.DataFrame({"property_id": ["3"]}), root, POSTAL_CODE, "listings", replace=True)
+    assert pd.read_parquet(root)["property_id"].tolist() == ["3"]
+
+    _write_partition(pd.DataFrame({"property_id": ["4"]}), root, POSTAL_CODE, "details-a")
+    _write_partition(pd.DataFrame({"property_id": ["4"]}), root, POSTAL_CODE, "details-a")
+    assert sorted(pd.read_parquet(root)["property_id"]) == ["3", "4"]
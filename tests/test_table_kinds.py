@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+
+from src.base import RealtorAgentToolSpec
+from src.projection import Rows
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ORIGIN = "3302000003"
+
+# runs the store-backed tools in python mode in a fresh interpreter and reports whether pandas got imported
+PROBE = f"""
+import sys
+from benchmarks.fake_realtor import FakeRealtorServer, SyntheticRealtor
+from src.base import RealtorAgentToolSpec
+
+with FakeRealtorServer(synthetic=SyntheticRealtor(listings_per_postal_code=30)) as server:
+    spec = RealtorAgentToolSpec("test-key", base_url=server.base_url, output_format="python", max_retries=0)
+    spec.query_listings(["33020"], limit=3)
+    spec.get_nearest_listings("{ORIGIN}", k=3)
+    spec.get_listings_within_radius("{ORIGIN}", radius_miles=3, limit=3)
+    spec.get_similar_listings_by_property_ids(["{ORIGIN}"], k=3, include_remote=True)
+print("pandas" in sys.modules)
+"""
+
+
+def test_store_backed_tools_stay_pandas_free_in_python_mode():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_store_backed_tools_return_rows_in_python_mode(server):
+    spec = RealtorAgentToolSpec("test-key", base_url=server.base_url, output_format="python", max_retries=0)
+
+    listings = spec.query_listings(["33020"], limit=5, sort_by="list_price", descending=False)
+    nearest = spec.get_nearest_listings(ORIGIN, k=5)
+    similar = spec.get_similar_listings_by_property_ids([ORIGIN], k=5)
+
+    assert all(isinstance(result, Rows) for result in (listings, nearest, similar))
+    prices = [row["list_price"] for row in listings]
+    assert prices == sorted(prices) and len(prices) == 5
+    assert all(isinstance(row["pool"], bool) for row in listings)
+    assert list(nearest[0])[:2] == ["property_id", "distance_miles"]
+    distances = [row["distance_miles"] for row in nearest]
+    assert distances == sorted(distances) and ORIGIN not in [row["property_id"] for row in nearest]
+    assert [row["seed_property_id"] for row in similar] == [ORIGIN] * 5
+    assert all(row["address"] for row in similar)
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.errors import DeadlineExceededError, RealtorAPIError
+from src.instrumentation import Instrumentation
+from src.resilience import deadline
+from src.transport import RealtorTransport
+
+DETAIL_PATH = "/properties/v3/detail"
+PARAMS = {"property_id": "3302000007"}
+
+
+@pytest.fixture
+def transport(server):
+    transport = RealtorTransport("test-key", base_url=server.base_url, max_retries=2, backoff_base=0.001, instrumentation=Instrumentation())
+    yield transport
+    transport.close()
+
+
+def test_retries_a_429_after_its_retry_after(server, transport):
+    server.retry_after = 0.3
+    server.inject(429)
+
+    started = time.perf_counter()
+    response = transport.get_json(DETAIL_PATH, PARAMS)
+
+    assert time.perf_counter() - started >= 0.3
+    assert response["data"]["home"]["property_id"] == PARAMS["property_id"]
+    assert server.snapshot()["statuses"] == {429: 1, 200: 1}
+    endpoint = transport.instrumentation.snapshot()["endpoints"][DETAIL_PATH]
+    assert endpoint["statuses"] == {"429": 1, "200": 1}
+    assert endpoint["retries"] == 1
+
+
+def test_retry_after_is_capped(server, transport):
+    server.retry_after = 60
+    transport.max_retry_after = 0.1
+    server.inject(503)
+    server.inject(429)
+
+    started = time.perf_counter()
+    assert transport.get_json(DETAIL_PATH, PARAMS) is not None
+    assert time.perf_counter() - started < 5
+
+
+def test_raises_once_retries_are_spent(server, transport):
+    server.inject(503, count=3)
+
+    with pytest.raises(RealtorAPIError) as raised:
+        transport.get_json(DETAIL_PATH, PARAMS)
+
+    assert raised.value.status_code == 503
+    assert server.snapshot()["statuses"] == {503: 3}
+
+
+def test_client_errors_are_not_retried(server, transport):
+    assert transport.get_json(DETAIL_PATH, {"property_id": "not-an-id"}) is None
+    assert server.snapshot()["statuses"] == {400: 1}
+
+
+def test_slow_responses_are_cut_off_at_the_deadline(server, transport):
+    server.latency = 1.0
+
+    started = time.perf_counter()
+    with deadline(0.2), pytest.raises(DeadlineExceededError):
+        transport.get_json(DETAIL_PATH, PARAMS)
+
+    assert time.perf_counter() - started < 0.9
+
+
+def test_each_event_loop_gets_its_own_client_closed_with_the_loop(transport):
+    async def fetch():
+        await transport.aget_json(DETAIL_PATH, PARAMS)
+        return await transport._get_async_client()
+
+    first = asyncio.run(fetch())
+    second = asyncio.run(fetch())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert len(transport._async_clients) == 1
+
+
+def test_aclose_closes_the_running_loops_client(transport):
+    async def main():
+        await transport.aget_json(DETAIL_PATH, PARAMS)
+        client = await transport._get_async_client()
+        await transport.aclose()
+        return client
+
+    assert asyncio.run(main()).is_closed
+    assert transport._async_clients == {}
+
+
+def test_aclose_leaves_other_loops_to_close_their_own_client(transport):
+    ready, done = threading.Event(), threading.Event()
+    clients = []
+
+    async def other_loop():
+        await transport.aget_json(DETAIL_PATH, PARAMS)
+        clients.append(await transport._get_async_client())
+        ready.set()
+        while not clients[0].is_closed:
+            await asyncio.sleep(0.01)
+        done.set()
+
+    thread = threading.Thread(target=asyncio.run, args=(other_loop(),))
+    thread.start()
+    ready.wait(5)
+    asyncio.run(transport.aclose())
+    thread.join(5)
+
+    assert done.is_set()